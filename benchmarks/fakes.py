@@ -0,0 +1,346 @@
+"""
+Local stand-ins for the services the chat API depends on, so it can be
+benchmarked without network access:
+
+- FakeModel: an Agents SDK model with configurable latency that calls the
+  agent's tools the way the real orchestrator would.
+- LatencyMemoryBackend: the SQLite memory backend behind a configurable
+  round-trip delay, standing in for Zep.
+- FakeBaseNode: a JSON-RPC server answering the Multicall3, Aave pool and
+  ERC-20 reads made by tools/aave.py.
+- write_scam_snapshot: a scam database snapshot for tools/fraud.py.
+"""
+import asyncio
+import itertools
+import json
+import re
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Union
+
+from aiohttp import web
+from eth_abi import decode, encode
+
+from agents import Model, ModelResponse, Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+)
+
+from src.memory_backends import LocalMemoryBackend, MemoryBackend
+from tools.scam_index import build_records
+
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-fA-F]{40}")
+
+# 4-byte selectors of the calls made by tools/aave.py
+AGGREGATE3 = "82ad56cb"
+GET_USER_ACCOUNT_DATA = "bf92857c"
+BALANCE_OF = "70a08231"
+DECIMALS = "313ce567"
+GET_BLOCK_NUMBER = "42cbb15c"
+
+
+class FakeModel(Model):
+    """
+    Model that answers after `latency` seconds without calling OpenAI.
+
+    On a new user message it calls at most one tool, picked from the message
+    the way the orchestrator would: Aave questions call fetch_aave_info,
+    messages with an address and "scam" call check_scam_address, messages
+    with addresses and "portfolio" call fetch_aave_portfolio, and
+    questions about the user call search_memory. Once the tool output is
+    back, it replies with a short text.
+    """
+
+    def __init__(self, latency: float = 0.0, name: str = "fake-model"):
+        self.latency = latency
+        self.name = name
+        self._ids = itertools.count()
+
+    def __str__(self) -> str:
+        return self.name
+
+    def _tool_call(self, text: str, tool_names: Iterable[str]) -> Optional[ResponseFunctionToolCall]:
+        lowered = text.lower()
+        address = ADDRESS_PATTERN.search(text)
+        if address and "scam" in lowered:
+            name, arguments = "check_scam_address", {"wallet_info": {"address": address.group(0)}}
+        elif address and "portfolio" in lowered:
+            name, arguments = "fetch_aave_portfolio", {"portfolio": {"wallets": ADDRESS_PATTERN.findall(text)}}
+        elif any(word in lowered for word in ("aave", "health", "borrow", "collateral")):
+            name, arguments = "fetch_aave_info", {}
+        elif any(word in lowered for word in ("remember", "my name", "about me")):
+            name, arguments = "search_memory", {"query": text}
+        else:
+            return None
+        if name not in tool_names:
+            return None
+        call_id = f"call_{next(self._ids)}"
+        return ResponseFunctionToolCall(
+            id=f"fc_{call_id}", call_id=call_id, name=name, arguments=json.dumps(arguments), type="function_call"
+        )
+
+    def _output(self, input: Union[str, List[Any]], tools: List[Any]) -> List[Any]:
+        items = [{"role": "user", "content": input}] if isinstance(input, str) else input
+        last = items[-1] if items else {}
+        if isinstance(last, dict) and last.get("type") == "function_call_output":
+            text = f"Here is what I found: {str(last.get('output'))[:200]}"
+        else:
+            content = last.get("content", "") if isinstance(last, dict) else ""
+            call = self._tool_call(content if isinstance(content, str) else "", [t.name for t in tools])
+            if call is not None:
+                return [call]
+            text = "Thanks, noted."
+        return [
+            ResponseOutputMessage(
+                id=f"msg_{next(self._ids)}",
+                content=[ResponseOutputText(text=text, type="output_text", annotations=[])],
+                role="assistant",
+                status="completed",
+                type="message",
+            )
+        ]
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> ModelResponse:
+        await asyncio.sleep(self.latency)
+        output = self._output(input, tools)
+        usage = Usage(requests=1, input_tokens=len(str(input)) // 4, output_tokens=16, total_tokens=len(str(input)) // 4 + 16)
+        return ModelResponse(output=output, usage=usage, response_id=None)
+
+    async def stream_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> AsyncIterator[Any]:
+        await asyncio.sleep(self.latency)
+        output = self._output(input, tools)
+        sequence = itertools.count()
+        for item in output:
+            if isinstance(item, ResponseOutputMessage):
+                for word in item.content[0].text.split(" "):
+                    yield ResponseTextDeltaEvent(
+                        type="response.output_text.delta",
+                        item_id=item.id,
+                        output_index=0,
+                        content_index=0,
+                        delta=word + " ",
+                        logprobs=[],
+                        sequence_number=next(sequence),
+                    )
+        response = Response(
+            id=f"resp_{next(self._ids)}",
+            created_at=0,
+            model=self.name,
+            object="response",
+            output=output,
+            parallel_tool_calls=False,
+            tool_choice="auto",
+            tools=[],
+        )
+        yield ResponseCompletedEvent(type="response.completed", response=response, sequence_number=next(sequence))
+
+
+class LatencyMemoryBackend(MemoryBackend):
+    """
+    LocalMemoryBackend with a fixed delay before every call, emulating the
+    round trip to a hosted memory service such as Zep.
+    """
+
+    def __init__(self, latency: float = 0.0, inner: Optional[MemoryBackend] = None):
+        self.latency = latency
+        self.inner = inner or LocalMemoryBackend()
+        self.calls: Dict[str, int] = {}
+
+    async def _delay(self, operation: str) -> None:
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        await asyncio.sleep(self.latency)
+
+    async def ensure_user(self, user_id, email=None, first_name=None, last_name=None) -> None:
+        await self._delay("ensure_user")
+        await self.inner.ensure_user(user_id, email, first_name, last_name)
+
+    async def create_session(self, session_id: str, user_id: str) -> None:
+        await self._delay("create_session")
+        await self.inner.create_session(session_id, user_id)
+
+    async def add_messages(self, session_id, messages, ignore_roles=None) -> None:
+        await self._delay("add_messages")
+        await self.inner.add_messages(session_id, messages, ignore_roles)
+
+    async def get_context(self, session_id: str) -> Optional[str]:
+        await self._delay("get_context")
+        return await self.inner.get_context(session_id)
+
+    async def search(self, user_id: str, query: str, limit: int = 5) -> List[str]:
+        await self._delay("search")
+        return await self.inner.search(user_id, query, limit)
+
+
+class FakeBaseNode:
+    """
+    Minimal Base JSON-RPC node on localhost.
+
+    Serves eth_chainId, eth_blockNumber, eth_call for Multicall3
+    aggregate3 and getBlockNumber, Aave's getUserAccountData and ERC-20 balanceOf/decimals,
+    and eth_getLogs over logs added with add_log(), with a configurable delay
+    per request. Every wallet gets the same account data and token balances
+    unless set in `accounts`, and calls to contracts in `failing` revert.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        block_number: int = 30_000_000,
+        account_data: Iterable[int] = (5 * 10**10, 10**10, 2 * 10**10, 8250, 7800, 3 * 10**18),
+        balance: int = 1_500_000,
+        decimals: int = 6,
+        max_logs: int = 10_000,
+    ):
+        """
+        Initialize the FakeBaseNode.
+
+        Args:
+            latency: Seconds to wait before answering each request.
+            block_number: Block number reported by eth_blockNumber.
+            account_data: The six uint256 values returned by getUserAccountData.
+            balance: Raw balance returned by balanceOf for every token.
+            decimals: Value returned by decimals() for every token.
+            max_logs: eth_getLogs fails above this many results, like hosted nodes do.
+        """
+        self.latency = latency
+        self.block_number = block_number
+        self.account_data = list(account_data)
+        # Lowercased wallet -> account data, for wallets that differ from the default
+        self.accounts: Dict[str, List[int]] = {}
+        self.balance = balance
+        self.decimals = decimals
+        self.max_logs = max_logs
+        # Lowercased contract addresses whose calls fail inside aggregate3 (success=False)
+        self.failing: Set[str] = set()
+        self.logs: List[Dict[str, Any]] = []
+        self.requests: Dict[str, int] = {}
+        self.handlers = {
+            "eth_chainId": lambda params: hex(8453),
+            "eth_blockNumber": lambda params: hex(self.block_number),
+            "eth_call": lambda params: "0x" + self.call(bytes.fromhex(params[0]["data"][2:])).hex(),
+            "eth_getLogs": lambda params: self.get_logs(params[0]),
+        }
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+    def call(self, data: bytes) -> bytes:
+        """
+        Execute a read-only call and return its ABI-encoded result.
+        """
+        selector, args = data[:4].hex(), data[4:]
+        if selector == AGGREGATE3:
+            (calls,) = decode(["(address,bool,bytes)[]"], args)
+            return encode(["(bool,bytes)[]"], [[
+                (False, b"") if target.lower() in self.failing else (True, self.call(call_data))
+                for target, _, call_data in calls
+            ]])
+        if selector == GET_USER_ACCOUNT_DATA:
+            (wallet,) = decode(["address"], args)
+            return encode(["uint256"] * 6, self.accounts.get(wallet.lower(), self.account_data))
+        if selector == BALANCE_OF:
+            return encode(["uint256"], [self.balance])
+        if selector == DECIMALS:
+            return encode(["uint8"], [self.decimals])
+        if selector == GET_BLOCK_NUMBER:
+            return encode(["uint256"], [self.block_number])
+        raise ValueError(f"Unsupported call selector 0x{selector}")
+
+    def add_log(self, address: str, topics: List[str], data: bytes = b"", block_number: Optional[int] = None) -> None:
+        """
+        Record an event log, by default in the current block.
+        """
+        block_number = self.block_number if block_number is None else block_number
+        index = len(self.logs)
+        self.logs.append({
+            "address": address.lower(),
+            "topics": [topic.lower() for topic in topics],
+            "data": "0x" + data.hex(),
+            "blockNumber": hex(block_number),
+            "blockHash": "0x" + f"{block_number:064x}",
+            "transactionHash": "0x" + f"{index + 1:064x}",
+            "transactionIndex": "0x0",
+            "logIndex": hex(index),
+            "removed": False,
+        })
+
+    def get_logs(self, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Filter the recorded logs like eth_getLogs: by address, block range and
+        topics (None matches anything, a list matches any of its entries).
+        """
+        from_block = int(query.get("fromBlock", "0x0"), 16)
+        to_block = int(query.get("toBlock", hex(self.block_number)), 16)
+        address = query.get("address")
+        addresses = {a.lower() for a in ([address] if isinstance(address, str) else address or [])}
+        matches = []
+        for log in self.logs:
+            if addresses and log["address"] not in addresses:
+                continue
+            if not from_block <= int(log["blockNumber"], 16) <= to_block:
+                continue
+            if all(
+                wanted is None
+                or (position < len(log["topics"])
+                    and log["topics"][position] in [w.lower() for w in (wanted if isinstance(wanted, list) else [wanted])])
+                for position, wanted in enumerate(query.get("topics") or [])
+            ):
+                matches.append(log)
+        if len(matches) > self.max_logs:
+            raise ValueError(f"query returned more than {self.max_logs} results")
+        return matches
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        batch = body if isinstance(body, list) else [body]
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        replies = []
+        for message in batch:
+            method = message["method"]
+            self.requests[method] = self.requests.get(method, 0) + 1
+            try:
+                result = self.handlers[method](message.get("params", []))
+                replies.append({"jsonrpc": "2.0", "id": message["id"], "result": result})
+            except Exception as e:
+                replies.append({"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32000, "message": str(e)}})
+        return web.json_response(replies if isinstance(body, list) else replies[0])
+
+    async def start(self) -> str:
+        """
+        Start serving on a free localhost port.
+
+        Returns:
+            The node's URL.
+        """
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def write_scam_snapshot(path: Union[str, Path], addresses: Iterable[str]) -> Path:
+    """
+    Write a scam index snapshot (see tools/scam_index.py) containing the addresses.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_records(addresses))
+    return path
@@ -0,0 +1,92 @@
+"""
+Measure the cold import cost of the API process with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.import_time                      # src.api.app, best of 5
+    python -m benchmarks.import_time --module src.agent --runs 3 --top 15
+    python -m benchmarks.import_time --budget 1.5         # exit 1 if slower (for CI)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def measure(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        The total import time in seconds and the cumulative time of every
+        imported module in seconds.
+    """
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumul, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; keep only the name
+        cumulative[name.strip()] = int(cumul) / 1e6
+    return cumulative.get(module, 0.0), cumulative
+
+
+def top_level(cumulative: Dict[str, float], count: int) -> List[Tuple[str, float]]:
+    """
+    The `count` slowest top-level packages, e.g. "agents" or "web3".
+    """
+    packages: Dict[str, float] = {}
+    for name, seconds in cumulative.items():
+        package = name.split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), seconds)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.api.app", help="Module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start; the best run is reported.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest packages to list.")
+    parser.add_argument("--budget", type=float, help="Fail if the best import time exceeds this many seconds.")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    best, cumulative = min(runs, key=lambda run: run[0])
+    slowest = top_level(cumulative, args.top)
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "best_seconds": round(best, 4),
+            "runs_seconds": [round(total, 4) for total, _ in runs],
+            "slowest_packages": {name: round(seconds, 4) for name, seconds in slowest},
+        }))
+    else:
+        print(f"import {args.module}: best {best:.3f}s over {args.runs} runs")
+        for name, seconds in slowest:
+            print(f"  {seconds:8.3f}s  {name}")
+
+    if args.budget is not None and best > args.budget:
+        print(f"Import time {best:.3f}s exceeds the budget of {args.budget:.3f}s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Offline load test of the chat API.
+
+Boots src.api.app in-process with the fakes from benchmarks/fakes.py (model,
+memory backend, Base JSON-RPC node and scam database), drives concurrent
+/create-session + /api/chat traffic through httpx's ASGI transport and
+reports throughput and latency percentiles. No network access is needed.
+
+Usage:
+    python -m benchmarks.load
+    python -m benchmarks.load --users 200 --turns 5 --concurrency 50 --llm-latency 0.2
+    python -m benchmarks.load --endpoint stream --json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from contextlib import ExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from unittest import mock
+
+import httpx
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+
+from .fakes import FakeBaseNode, FakeModel, LatencyMemoryBackend, write_scam_snapshot
+
+POOL_ADDRESS = "0xA238Dd80C259a72e81d7e4664a9801593F98d1c5"
+WALLET_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+SCAM_ADDRESSES = [f"0x{i:040x}" for i in range(1, 1001)]
+
+# A mix of turns with and without tool calls (see FakeModel for the routing)
+PROMPTS = [
+    "What is my Aave health factor?",
+    f"Is {SCAM_ADDRESSES[7]} a scam?",
+    "Hi, I am planning to lend some USDC on Base.",
+    f"Is 0x{'ab' * 20} a scam address?",
+    "Do you remember my name?",
+    "How much collateral do I have on Aave?",
+]
+
+
+@asynccontextmanager
+async def fake_app(
+    llm_latency: float = 0.0,
+    memory_latency: float = 0.0,
+    rpc_latency: float = 0.0,
+    router: bool = True,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run src.api.app (including its lifespan) against local fakes.
+
+    With `router` off, every turn goes through the (fake) orchestrator run
+    instead of the fast-path intent router for scam and health requests.
+
+    Yields:
+        A dict with the httpx `client` bound to the app and the fakes
+        (`model`, `memory`, `node`) so their call counts can be inspected.
+    """
+    node = FakeBaseNode(latency=rpc_latency)
+    await node.start()
+    memory = LatencyMemoryBackend(latency=memory_latency)
+    model = FakeModel(latency=llm_latency)
+    workdir = tempfile.TemporaryDirectory(prefix="agent-bench-")
+    snapshot = write_scam_snapshot(Path(workdir.name) / "scam_index.bin", SCAM_ADDRESSES)
+
+    env = {
+        "BASE_RPC_URL": node.url,
+        "POOL_ADDRESS": POOL_ADDRESS,
+        "WALLET_ADDRESS": WALLET_ADDRESS,
+        "SCAM_INDEX_PATH": str(snapshot),
+        "SCAM_DATABASE_URL": "",
+        "OPIK_TRACING": "false",
+        "PROMPT_TOKENIZER": "estimate",
+    }
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, env))
+
+        import src.agent
+        import src.memory
+        import src.prompt
+        import src.router
+        import tools.scam_index
+        from src.api.app import app
+
+        orchestrators = {
+            medieval: src.agent.get_orchestrator(medieval).clone(model=model) for medieval in (False, True)
+        }
+        stack.enter_context(
+            mock.patch.object(src.agent, "get_orchestrator", lambda medieval_mode=False: orchestrators[bool(medieval_mode)])
+        )
+        stack.enter_context(mock.patch.object(src.memory, "create_memory_backend", lambda: memory))
+        stack.enter_context(mock.patch.object(tools.scam_index, "_index", None))
+        stack.enter_context(mock.patch.object(src.router, "INTENT_ROUTER", router))
+        # Offline: never download the tokenizer
+        stack.enter_context(mock.patch.object(src.prompt, "PROMPT_TOKENIZER", "estimate"))
+        # Traces would otherwise be exported to OpenAI
+        agents = src.agent.agents_sdk()
+        agents.set_tracing_disabled(True)
+        stack.callback(agents.set_tracing_disabled, False)
+
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                    yield {"client": client, "model": model, "memory": memory, "node": node}
+        finally:
+            await node.stop()
+            workdir.cleanup()
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """
+    Nearest-rank p50/p90/p95/p99, mean and max of latencies, in milliseconds.
+    """
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+    return {
+        "count": len(ordered),
+        "mean": round(1000 * sum(ordered) / len(ordered), 2),
+        "p50": round(1000 * rank(0.50), 2),
+        "p90": round(1000 * rank(0.90), 2),
+        "p95": round(1000 * rank(0.95), 2),
+        "p99": round(1000 * rank(0.99), 2),
+        "max": round(1000 * ordered[-1], 2),
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    users: int = 20,
+    turns: int = 3,
+    concurrency: int = 10,
+    endpoint: str = "chat",
+    prompts: Sequence[str] = PROMPTS,
+) -> Dict[str, Any]:
+    """
+    Simulate `users` users, at most `concurrency` at a time, each creating a
+    session and sending `turns` chat messages one after another.
+
+    Args:
+        client: Client bound to the API.
+        users: Number of simulated users (one session each).
+        turns: Chat turns per user.
+        concurrency: Users active at the same time.
+        endpoint: "chat" for /api/chat or "stream" for /api/chat/stream.
+        prompts: User messages, used round-robin.
+
+    Returns:
+        Throughput, latency percentiles per request type and error counts.
+    """
+    path = "/api/chat" if endpoint == "chat" else "/api/chat/stream"
+    latencies: Dict[str, List[float]] = {"create_session": [], endpoint: []}
+    errors: Dict[str, int] = {}
+    prompt_cycle = itertools.cycle(prompts)
+    run_id = f"{time.time_ns():x}"
+    gate = asyncio.Semaphore(concurrency)
+
+    async def timed(kind: str, url: str, body: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            response = await client.post(url, json=body)
+            status = response.status_code
+            if status == 200 and kind == "chat" and response.json().get("status") == "error":
+                status = "error"
+            elif status == 200 and kind == "stream" and "event: error" in response.text:
+                status = "error"
+        except Exception as e:
+            status = type(e).__name__
+        latencies[kind].append(time.perf_counter() - started)
+        if status != 200:
+            key = f"{kind}:{status}"
+            errors[key] = errors.get(key, 0) + 1
+
+    async def user(index: int) -> None:
+        async with gate:
+            session_id = f"bench-{run_id}-{index}"
+            await timed("create_session", f"/create-session/{session_id}", {"user_id": f"bench-user-{index}"})
+            for _ in range(turns):
+                body = {"session_id": session_id, "user_input": next(prompt_cycle)}
+                await timed(endpoint, path, body)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "users": users,
+        "turns": turns,
+        "concurrency": concurrency,
+        "endpoint": endpoint,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies[endpoint]) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {kind: percentiles(values) for kind, values in latencies.items()},
+        "errors": errors,
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    async with fake_app(args.llm_latency, args.memory_latency, args.rpc_latency, args.router) as fakes:
+        report = await run_load(fakes["client"], args.users, args.turns, args.concurrency, args.endpoint)
+        report["rpc_requests"] = dict(fakes["node"].requests)
+        report["memory_calls"] = dict(fakes["memory"].calls)
+        report["server"] = (await fakes["client"].get("/api/stats")).json()
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['users']} users x {report['turns']} turns, concurrency {report['concurrency']}, "
+        f"endpoint {report['endpoint']}: {report['throughput_rps']} turns/s over {report['duration_s']}s"
+    )
+    print(f"{'request':<16}{'count':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for kind, stats in report["latency_ms"].items():
+        if stats:
+            print(
+                f"{kind:<16}{stats['count']:>7}" + "".join(f"{stats[k]:>10.1f}" for k in ("mean", "p50", "p90", "p95", "p99", "max"))
+            )
+    print(f"errors: {report['errors'] or 'none'}")
+    print(f"rpc requests: {report['rpc_requests']}")
+    print(f"memory backend calls: {report['memory_calls']}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Simulated users, one session each.")
+    parser.add_argument("--turns", type=int, default=4, help="Chat turns per user.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Users active at the same time.")
+    parser.add_argument("--endpoint", choices=["chat", "stream"], default="chat")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake model call.")
+    parser.add_argument("--memory-latency", type=float, default=0.02, help="Seconds per fake memory call.")
+    parser.add_argument("--rpc-latency", type=float, default=0.01, help="Seconds per fake RPC request.")
+    parser.add_argument("--no-router", dest="router", action="store_false",
+                        help="Send every turn to the orchestrator, bypassing the intent router.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(benchmark(args))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
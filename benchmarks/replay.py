@@ -0,0 +1,252 @@
+"""
+Replay a JSONL request log against the chat API as an open-loop load profile.
+
+Each line is a JSON object. Recognised fields (all optional except the text):
+    user_input | body | text | query   the chat message
+    session_id | user_id | request_id  session the message belongs to
+    timestamp | ts | offset             arrival time (epoch seconds, ISO 8601 or
+                                        seconds from the start of the log)
+    endpoint                           "chat" (default) or "stream"
+    medieval_mode                      persona flag
+
+So a log in the shape of the repo's requests.jsonl (request_id, title, body)
+replays as one single-turn session per line. Requests are sent at their
+recorded times divided by --speed, or at a fixed --rate when the log has no
+timestamps, whether or not earlier requests have finished (open loop);
+--concurrency only caps the requests in flight. The first request of each
+session creates it, timed separately (setup_ms) from the chat request
+(latency_ms). Per-request results go to --output as JSONL or CSV.
+
+Usage:
+    python -m benchmarks.replay requests.jsonl --rate 20 --output results.csv
+    python -m benchmarks.replay traffic.jsonl --speed 4 --concurrency 64 --output results.jsonl
+    python -m benchmarks.replay traffic.jsonl --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+import httpx
+
+from .load import fake_app, percentiles
+
+TEXT_FIELDS = ("user_input", "body", "text", "query")
+SESSION_FIELDS = ("session_id", "user_id", "request_id")
+TIME_FIELDS = ("timestamp", "ts", "offset")
+RESULT_FIELDS = [
+    "index", "request_id", "session_id", "endpoint", "scheduled_s", "started_s",
+    "queue_ms", "setup_ms", "latency_ms", "status", "error",
+]
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def load_records(path: Union[str, Path], rate: float = 10.0, speed: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Read a JSONL log into replay records sorted by arrival offset.
+
+    Args:
+        path: JSONL file.
+        rate: Requests per second used when the log has no timestamps.
+        speed: Time scale for recorded timestamps; 2.0 replays twice as fast.
+
+    Returns:
+        Dicts with `index`, `request_id`, `session_id`, `user_input`, `endpoint`,
+        `medieval_mode` and `offset` (seconds from the start of the replay).
+    """
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            text = next((entry[k] for k in TEXT_FIELDS if entry.get(k)), None)
+            if text is None:
+                continue
+            index = len(records)
+            session = next((str(entry[k]) for k in SESSION_FIELDS if entry.get(k)), f"replay-{index}")
+            records.append({
+                "index": index,
+                "request_id": str(entry.get("request_id", index)),
+                "session_id": session,
+                "user_input": str(text),
+                "endpoint": entry.get("endpoint", "chat"),
+                "medieval_mode": bool(entry.get("medieval_mode", False)),
+                "time": next((_parse_time(entry[k]) for k in TIME_FIELDS if k in entry), None),
+            })
+
+    if records and all(r["time"] is not None for r in records):
+        start = min(r["time"] for r in records)
+        for r in records:
+            r["offset"] = (r.pop("time") - start) / speed
+    else:
+        for r in records:
+            r.pop("time")
+            r["offset"] = r["index"] / rate
+    return sorted(records, key=lambda r: (r["offset"], r["index"]))
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: Sequence[Dict[str, Any]],
+    concurrency: int = 32,
+    run_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Send the records at their offsets, open loop, with at most `concurrency` in flight.
+
+    Args:
+        client: Client bound to the API.
+        records: Output of load_records().
+        concurrency: Maximum number of requests in flight.
+        run_id: Suffix added to session ids so repeated replays don't collide.
+
+    Returns:
+        One result per record, with the fields in RESULT_FIELDS.
+    """
+    run_id = run_id or f"{time.time_ns():x}"
+    gate = asyncio.Semaphore(concurrency)
+    # The first request of a session creates it; later ones wait for that
+    created: Dict[str, asyncio.Task] = {}
+    results: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+
+    async def create_session(session_id: str, user_id: str) -> None:
+        response = await client.post(f"/create-session/{session_id}", json={"user_id": user_id})
+        if response.status_code not in (200, 400):
+            raise RuntimeError(f"create-session returned {response.status_code}")
+
+    async def send(record: Dict[str, Any]) -> None:
+        await asyncio.sleep(max(0.0, start + record["offset"] - time.perf_counter()))
+        scheduled = start + record["offset"]
+        session_id = f"{record['session_id']}-{run_id}"
+        result = {
+            "index": record["index"],
+            "request_id": record["request_id"],
+            "session_id": session_id,
+            "endpoint": record["endpoint"],
+            "scheduled_s": round(record["offset"], 4),
+            "error": "",
+        }
+        async with gate:
+            started = sent = time.perf_counter()
+            try:
+                if session_id not in created:
+                    created[session_id] = asyncio.create_task(create_session(session_id, record["session_id"]))
+                await created[session_id]
+                sent = time.perf_counter()
+                path = "/api/chat/stream" if record["endpoint"] == "stream" else "/api/chat"
+                response = await client.post(path, json={
+                    "session_id": session_id,
+                    "user_input": record["user_input"],
+                    "medieval_mode": record["medieval_mode"],
+                })
+                result["status"] = response.status_code
+                if response.status_code == 200 and path == "/api/chat" and response.json().get("status") == "error":
+                    result["error"] = str(response.json().get("response"))[:200]
+                elif response.status_code == 200 and "event: error" in response.text:
+                    result["error"] = "stream error event"
+                elif response.status_code != 200:
+                    result["error"] = response.text[:200]
+            except Exception as e:
+                result["status"] = 0
+                result["error"] = f"{type(e).__name__}: {e}"[:200]
+            finished = time.perf_counter()
+        result["started_s"] = round(started - start, 4)
+        result["queue_ms"] = round(1000 * max(0.0, started - scheduled), 2)
+        result["setup_ms"] = round(1000 * (sent - started), 2)
+        result["latency_ms"] = round(1000 * (finished - sent), 2)
+        results.append(result)
+
+    await asyncio.gather(*(send(record) for record in records))
+    return sorted(results, key=lambda r: r["index"])
+
+
+def write_results(path: Union[str, Path], results: Sequence[Dict[str, Any]]) -> None:
+    """
+    Write results as CSV if the path ends in .csv, else as JSONL.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+def summarize(results: Sequence[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == 200 and not r["error"]]
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(results) / duration, 2) if duration else 0.0,
+        "latency_ms": percentiles([r["latency_ms"] / 1000 for r in ok]),
+        "queue_ms": percentiles([r["queue_ms"] / 1000 for r in results]),
+    }
+
+
+@asynccontextmanager
+async def target(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+            yield client
+    else:
+        async with fake_app(args.llm_latency, args.memory_latency, args.rpc_latency, args.router) as fakes:
+            yield fakes["client"]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    records = load_records(args.log, rate=args.rate, speed=args.speed)
+    if args.limit:
+        records = records[:args.limit]
+    async with target(args) as client:
+        started = time.perf_counter()
+        results = await replay(client, records, concurrency=args.concurrency)
+        duration = time.perf_counter() - started
+    if args.output:
+        write_results(args.output, results)
+    return summarize(results, duration)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="JSONL request log.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Requests per second when the log has no timestamps.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed-up for recorded timestamps.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maximum requests in flight.")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests.")
+    parser.add_argument("--output", help="Per-request results file (.csv or .jsonl).")
+    parser.add_argument("--url", help="Replay against a running server instead of the in-process fakes.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake model call.")
+    parser.add_argument("--memory-latency", type=float, default=0.02, help="Seconds per fake memory call.")
+    parser.add_argument("--rpc-latency", type=float, default=0.01, help="Seconds per fake RPC request.")
+    parser.add_argument("--no-router", dest="router", action="store_false",
+                        help="Send every turn to the orchestrator, bypassing the intent router.")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
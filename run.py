@@ -1,6 +1,7 @@
 """
 Dev launcher: `python run.py` starts uvicorn with hot-reload.
 Prod: gunicorn -k uvicorn.workers.UvicornWorker -w 4 app:app  :contentReference[oaicite:5]{index=5}
+With several workers set SESSION_REGISTRY=sqlite so any worker can serve any session.
 """
 
 import os, uvicorn
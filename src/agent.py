@@ -1,17 +1,93 @@
 import asyncio
-from agents import Agent, Runner, set_trace_processors, set_default_openai_key
-from tools import fetch_aave_info, check_scam_address, get_search_memory_tool, web_search_preview
 from .memory import AsyncZepMemoryManager
-from .utils import load_yaml
-from opik.integrations.openai.agents import OpikTracingProcessor
+from .metrics import CHAT_PHASE_SECONDS, run_hooks
+from .prompt import build_turn_input, static_instructions
+from .router import route
+from .utils import get_config
 from dotenv import load_dotenv
-from typing import Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple
 import time 
 import os 
+import uuid
+
+if TYPE_CHECKING:
+    from agents import Agent
 
 load_dotenv()
-set_default_openai_key(os.environ.get("OPENAI_API_KEY"))
-config = load_yaml("config.yaml")
+config = get_config()
+
+
+@lru_cache(maxsize=1)
+def agents_sdk() -> ModuleType:
+    """
+    Import the OpenAI Agents SDK on first use and configure its API key.
+
+    The SDK takes seconds to import, so it is kept off the module import path;
+    the API warms it up in the background once the worker is serving.
+    """
+    import agents
+
+    agents.set_default_openai_key(os.environ.get("OPENAI_API_KEY"))
+    return agents
+
+
+@dataclass
+class ChatContext:
+    """
+    Per-run state passed to the shared orchestrator agents through Runner.run(context=...).
+
+    `run_id` identifies the run, e.g. for run-scoped tool memoization (tools/memoize.py).
+    `prompt_tokens` holds the token counts of the turn's prompt parts (src/prompt.py).
+    """
+    memory_manager: AsyncZepMemoryManager
+    memory_context: str
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    prompt_tokens: Dict[str, int] = field(default_factory=dict)
+
+
+def _persona(medieval_mode: bool) -> str:
+    return "medieval_instructions" if medieval_mode else "instructions"
+
+
+@lru_cache(maxsize=None)
+def get_orchestrator(medieval_mode: bool = False) -> "Agent[ChatContext]":
+    """
+    Return the shared, immutable orchestrator agent for a persona.
+
+    One agent per persona is built per process. Everything session-specific
+    (memory context, the memory manager used by search_memory) comes from the
+    ChatContext of each run, so concurrent sessions never mutate shared state.
+    """
+    # Tool modules pull in web3 and the OpenAI client, so they are imported on first use
+    from tools import (
+        fetch_aave_info,
+        fetch_aave_portfolio,
+        fetch_aave_history,
+        check_scam_address,
+        check_scam_addresses,
+        search_memory,
+        web_search_preview,
+    )
+
+    persona = _persona(medieval_mode)
+    return agents_sdk().Agent[ChatContext](
+        name="Orchestrator Agent wth Memory",
+        model=config["orchestrator_agent"]["model"],
+        # Static so every turn shares the cacheable prefix; the memory context is part of the turn input
+        instructions=static_instructions(persona),
+        tools=[
+            fetch_aave_info,
+            fetch_aave_portfolio,
+            fetch_aave_history,
+            check_scam_address,
+            check_scam_addresses,
+            search_memory,
+            web_search_preview,
+        ]
+    )
 
 class AsyncZepMemoryAgent:
     """
@@ -41,32 +117,88 @@ class AsyncZepMemoryAgent:
         self.memory_manager = AsyncZepMemoryManager(
             session_id, user_id, email, first_name, last_name, ignore_assistant
         )
-        self.agent = None
+        self.initialized = False
 
-    async def initialize(self):
+    async def initialize(self, resume: bool = False):
         """
-        Initialize the AsyncZep memory manager and create OpenAI agent with tools.
+        Initialize the AsyncZep memory manager. The OpenAI agents themselves are shared, see get_orchestrator().
+
+        Args:
+            resume: Reattach to the existing memory session instead of creating a new one.
         """
         # Initialize the AsyncZep memory manager
-        await self.memory_manager.initialize()
-
-        search_memory = get_search_memory_tool(self.memory_manager)
-
-        # Get memory context to include in the system message
-        memory_context = await self.memory_manager.get_memory()
-
-        # Create the agent with memory tools and context-enhanced system message
-        self.agent = Agent(
-            name="Orchestrator Agent wth Memory",
-            model=config["orchestrator_agent"]["model"],
-            instructions=(config["orchestrator_agent"]["instructions"] + "\n" + f"Memory Context: {memory_context}"),
-            tools=[
-                fetch_aave_info,
-                check_scam_address,
-                search_memory,
-                web_search_preview,
-            ]
+        await self.memory_manager.initialize(resume=resume)
+
+        # Prefetch the memory context in the background; the first chat turn picks it up
+        if self.memory_manager.backend:
+            self.memory_manager.refresh_context()
+
+        self.initialized = True
+
+    def session_metadata(self) -> Dict[str, Any]:
+        """
+        Return what is needed to rebuild this agent later with rehydrate().
+        """
+        manager = self.memory_manager
+        return {
+            "session_id": manager.session_id,
+            "user_id": manager.user_id,
+            "email": manager.email,
+            "first_name": manager.first_name,
+            "last_name": manager.last_name,
+            "ignore_assistant": manager.ignore_assistant,
+        }
+
+    @classmethod
+    async def rehydrate(cls, metadata: Dict[str, Any]) -> "AsyncZepMemoryAgent":
+        """
+        Rebuild an agent for an existing memory session from session_metadata().
+        """
+        agent = cls(**metadata)
+        await agent.initialize(resume=True)
+        return agent
+
+    async def close(self) -> None:
+        """
+        Flush pending memory writes and release the memory backend.
+        """
+        await self.memory_manager.close()
+
+    def _not_ready_error(self) -> Optional[str]:
+        # Check if agent and memory manager are initialized
+        if not self.initialized:
+            return "Error: Agent not initialized. Please check your OpenAI API key."
+
+        if not self.memory_manager.backend:
+            return "Error: Memory backend not initialized. Please set the ZEP_API_KEY environment variable or MEMORY_BACKEND=local."
+
+        return None
+
+    async def _start_turn(self, user_input: str, medieval_mode) -> Tuple[ChatContext, List[Dict[str, str]]]:
+        # Queue the user message for Zep memory (written behind, off the latency path)
+        with CHAT_PHASE_SECONDS.labels("user_message").time():
+            await self.memory_manager.add_message({"role": "user", "content": user_input})
+
+        # The last known memory context, refreshed in the background after writes
+        with CHAT_PHASE_SECONDS.labels("context_fetch").time():
+            memory_context = await self.memory_manager.get_context()
+
+        # The memory context goes in the turn input, after the static system prompt
+        turn_input, prompt_tokens = build_turn_input(user_input, memory_context, _persona(bool(medieval_mode)))
+        context = ChatContext(
+            memory_manager=self.memory_manager, memory_context=memory_context, prompt_tokens=prompt_tokens
         )
+        return context, turn_input
+
+    async def _fast_reply(self, user_input: str, medieval_mode) -> Optional[str]:
+        # Trivial requests are answered by the intent router without an orchestrator run;
+        # the exchange is still written to memory like any other turn
+        with CHAT_PHASE_SECONDS.labels("router").time():
+            reply = await route(user_input, bool(medieval_mode))
+        if reply is not None:
+            with CHAT_PHASE_SECONDS.labels("user_message").time():
+                await self.memory_manager.add_message({"role": "user", "content": user_input})
+        return reply
 
     async def chat(self, user_input: str, medieval_mode) -> str:
         """
@@ -78,38 +210,91 @@ class AsyncZepMemoryAgent:
         Returns:
             The agent's response.
         """
-        # Check if agent and memory manager are initialized
-        if not self.agent:
-            return "Error: Agent not initialized. Please check your OpenAI API key."
+        error = self._not_ready_error()
+        if error:
+            return error
 
-        if not self.memory_manager.zep_client:
-            return "Error: AsyncZep client not initialized. Please set the ZEP_API_KEY environment variable."
+        with CHAT_PHASE_SECONDS.labels("turn").time():
+            agent_response = await self._fast_reply(user_input, medieval_mode)
+            if agent_response is None:
+                context, turn_input = await self._start_turn(user_input, medieval_mode)
 
-        # Store the user message in Zep memory
-        await self.memory_manager.add_message({"role": "user", "content": user_input})
+                # Run the agent with the user input directly
+                with CHAT_PHASE_SECONDS.labels("runner").time():
+                    result = await agents_sdk().Runner.run(
+                        get_orchestrator(bool(medieval_mode)), turn_input, context=context, hooks=run_hooks()
+                    )
 
-        # Update the agent's instructions with the latest memory context
-        memory_context = await self.memory_manager.get_memory()
-        if medieval_mode:
-            self.agent.instructions = (
-                config["orchestrator_agent"]["medieval_instructions"] + "\n" + f"Memory Context: {memory_context}"
-            )
-        else:
-            self.agent.instructions = (
-                config["orchestrator_agent"]["instructions"] + "\n" + f"Memory Context: {memory_context}"
-            )
-        # Run the agent with the user input directly
-        result = await Runner.run(self.agent, user_input)
+                # Extract the agent's response
+                agent_response = result.final_output
 
-        # Extract the agent's response
-        agent_response = result.final_output
+            # Queue the agent's response for Zep memory
+            with CHAT_PHASE_SECONDS.labels("assistant_message").time():
+                await self.memory_manager.add_message(
+                    {"role": "assistant", "content": agent_response}
+                )
+
+        return agent_response
+
+    async def chat_stream(self, user_input: str, medieval_mode) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Chat with the agent, yielding progress events as the run streams.
+
+        Args:
+            user_input: The user's input message.
 
-        # Store the agent's response in Zep memory
-        await self.memory_manager.add_message(
-            {"role": "assistant", "content": agent_response}
+        Yields:
+            Dicts with an `event` name ("delta", "tool_call", "tool_output", "done" or "error")
+            and a `data` payload. The assistant reply is stored in memory after "done".
+        """
+        error = self._not_ready_error()
+        if error:
+            yield {"event": "error", "data": {"response": error}}
+            return
+
+        turn_started = time.perf_counter()
+        agent_response = await self._fast_reply(user_input, medieval_mode)
+        if agent_response is not None:
+            CHAT_PHASE_SECONDS.labels("first_delta").observe(time.perf_counter() - turn_started)
+            yield {"event": "delta", "data": {"text": agent_response}}
+            yield {"event": "done", "data": {"response": agent_response}}
+            with CHAT_PHASE_SECONDS.labels("assistant_message").time():
+                await self.memory_manager.add_message({"role": "assistant", "content": agent_response})
+            CHAT_PHASE_SECONDS.labels("turn").observe(time.perf_counter() - turn_started)
+            return
+
+        context, turn_input = await self._start_turn(user_input, medieval_mode)
+
+        runner_started = time.perf_counter()
+        first_delta = True
+        result = agents_sdk().Runner.run_streamed(
+            get_orchestrator(bool(medieval_mode)), turn_input, context=context, hooks=run_hooks()
         )
+        async for event in result.stream_events():
+            if event.type == "raw_response_event":
+                if getattr(event.data, "type", None) == "response.output_text.delta":
+                    if first_delta:
+                        first_delta = False
+                        CHAT_PHASE_SECONDS.labels("first_delta").observe(time.perf_counter() - turn_started)
+                    yield {"event": "delta", "data": {"text": event.data.delta}}
+            elif event.type == "run_item_stream_event":
+                raw_item = event.item.raw_item
+                call_id = raw_item.get("call_id") if isinstance(raw_item, dict) else getattr(raw_item, "call_id", None)
+                if event.name == "tool_called":
+                    yield {"event": "tool_call", "data": {"name": getattr(raw_item, "name", None), "call_id": call_id}}
+                elif event.name == "tool_output":
+                    yield {"event": "tool_output", "data": {"call_id": call_id}}
 
-        return agent_response
+        CHAT_PHASE_SECONDS.labels("runner").observe(time.perf_counter() - runner_started)
+        agent_response = result.final_output
+        yield {"event": "done", "data": {"response": agent_response}}
+
+        # Persist only once the reply has been sent
+        with CHAT_PHASE_SECONDS.labels("assistant_message").time():
+            await self.memory_manager.add_message(
+                {"role": "assistant", "content": agent_response}
+            )
+        CHAT_PHASE_SECONDS.labels("turn").observe(time.perf_counter() - turn_started)
 
 
 async def run_agent(
@@ -157,6 +342,7 @@ async def run_agent(
 
         # Check for exit commands
         if user_input.lower() in ["exit", "quit", "bye"]:
+            await memory_agent.memory_manager.close()
             print("\nExiting interactive mode. Goodbye!")
             break
 
@@ -190,5 +376,6 @@ async def main():
     )
     
 if __name__ == "__main__":
-    set_trace_processors(processors=[OpikTracingProcessor()])
+    from opik.integrations.openai.agents import OpikTracingProcessor
+    agents_sdk().set_trace_processors(processors=[OpikTracingProcessor()])
     asyncio.run(main())
\ No newline at end of file
@@ -1,23 +1,66 @@
 import os
+import sys
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from opik.integrations.openai.agents import OpikTracingProcessor
-from agents import set_trace_processors, set_default_openai_key
 from .routes import router as chat_router
+from ..agent import agents_sdk
+from ..memory import flush_all_memory
+from ..prompt import load_token_encoding
+from .session_store import sessions
 from contextlib import asynccontextmanager
+import asyncio
 
 load_dotenv()
-set_default_openai_key(os.environ["OPENAI_API_KEY"])
 
-# Tracing is performed by using Opik
+
+def warm_up() -> None:
+    """
+    Import the Agents SDK and, if enabled, Opik tracing (performed by using Opik).
+
+    Runs in a thread after startup so the worker accepts requests immediately;
+    a chat turn arriving earlier just waits on the import lock.
+    """
+    agents = agents_sdk()
+    if os.environ.get("OPIK_TRACING", "true").lower() == "true":
+        try:
+            from opik.integrations.openai.agents import OpikTracingProcessor
+            agents.set_trace_processors(processors=[OpikTracingProcessor()])
+        except Exception as e:
+            print(f"Error enabling Opik tracing: {e}")
+
+
+async def run_aave_indexer() -> None:
+    """
+    Keep the local Aave event index of the tracked wallets up to date.
+    """
+    from tools.aave_indexer import AaveEventIndexer, get_event_store, tracked_wallets
+
+    indexer = AaveEventIndexer(get_event_store(), tracked_wallets())
+    await indexer.run_forever()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    set_trace_processors(processors=[OpikTracingProcessor()])
+    # Loaded before serving (only with PROMPT_TOKENIZER=tiktoken) so every turn is budgeted the same way
+    await asyncio.to_thread(load_token_encoding)
+    warm = asyncio.create_task(asyncio.to_thread(warm_up))
+    reaper = asyncio.create_task(sessions.reap_forever())
+    background = [reaper]
+    if os.environ.get("AAVE_INDEXER", "false").lower() == "true":
+        background.append(asyncio.create_task(run_aave_indexer()))
     yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(warm, *background, return_exceptions=True)
+    await sessions.close_all()
+    await flush_all_memory()
+    # Only close the RPC pool if an on-chain tool was used in this worker
+    if "tools.rpc" in sys.modules:
+        await sys.modules["tools.rpc"].close_web3()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:8080",
@@ -32,4 +75,4 @@ app.add_middleware(
     allow_headers=["*"],  # allow all request headers
 )
 
-app.include_router(chat_router)
\ No newline at end of file
+app.include_router(chat_router)
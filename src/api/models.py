@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, Dict
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, List
+
+from tools.scam_limits import SCAM_SCREEN_MAX_ADDRESSES
 
 class CreateSessionRequest(BaseModel):
     user_id:         Optional[str] = None
@@ -16,4 +18,7 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     response:         str
     status:           str
-    original_payload: Dict
\ No newline at end of file
+    original_payload: Dict
+
+class ScamScreenRequest(BaseModel):
+    addresses: List[str] = Field(..., max_length=SCAM_SCREEN_MAX_ADDRESSES)
@@ -1,20 +1,32 @@
+import asyncio
+import json
+import sys
+
 from fastapi import APIRouter, HTTPException
-from .models import CreateSessionRequest, ChatRequest, ChatResponse
-from .session_store import agents as _agents 
-from ..utils  import load_yaml
-from .utils import llm_response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from .models import CreateSessionRequest, ChatRequest, ChatResponse, ScamScreenRequest
+from .session_store import sessions
+from .scheduler import SchedulerOverloaded, scheduler
+from .utils import DEMO_MODE_REPLY, demo_mode, llm_response, sse_event
 from ..agent import AsyncZepMemoryAgent
-
-config = load_yaml("config.yaml")
+from ..metrics import render_metrics
 
 router = APIRouter(tags=["chat"])
 
+def overloaded_response(e: SchedulerOverloaded) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(e.retry_after)},
+        content={"detail": str(e)},
+    )
+
 @router.post("/create-session/{session_id}")
 async def create_session(
     session_id: str,
     payload: CreateSessionRequest
 ):
-    if session_id in _agents:
+    if await sessions.exists(session_id):
         raise HTTPException(400, f"Session {session_id!r} already exists.")
     
     agent = AsyncZepMemoryAgent(
@@ -26,27 +38,123 @@ async def create_session(
         ignore_assistant=payload.ignore_assistant,
     )
     await agent.initialize()
-    _agents[session_id] = agent
+    await sessions.add(session_id, agent)
     return {"message": f"Session {session_id!r} created."}
 
 @router.post("/api/chat", response_model=ChatResponse)
 @llm_response
 async def chat(payload: ChatRequest):
-    agent = _agents.get(payload.session_id)
+    agent = await sessions.get(payload.session_id)
     if not agent:
         raise HTTPException(404, f"Session {payload.session_id!r} not found.")
     
-    reply = await agent.chat(payload.user_input, payload.medieval_mode)
+    try:
+        async with scheduler.slot(payload.session_id):
+            reply = await agent.chat(payload.user_input, payload.medieval_mode)
+    except SchedulerOverloaded as e:
+        return overloaded_response(e)
     return {
         "response": reply,
         "status": "success",
         "original_payload": payload.dict(),
     }
 
+@router.post("/api/chat/stream")
+async def chat_stream(payload: ChatRequest):
+    # Same demo mode as /api/chat (see llm_response), as a stream
+    if demo_mode():
+        demo_events = sse_event("delta", {"text": DEMO_MODE_REPLY}) + sse_event(
+            "done", {"response": DEMO_MODE_REPLY, "status": "warning"}
+        )
+        return StreamingResponse(iter([demo_events]), media_type="text/event-stream")
+
+    agent = await sessions.get(payload.session_id)
+    if not agent:
+        raise HTTPException(404, f"Session {payload.session_id!r} not found.")
+
+    # Admission happens before the response starts so overload can still be a 429
+    try:
+        started_at = await scheduler.acquire(payload.session_id)
+    except SchedulerOverloaded as e:
+        return overloaded_response(e)
+
+    released = False
+
+    def release() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            scheduler.release(payload.session_id, started_at)
+
+    async def events():
+        try:
+            async for event in agent.chat_stream(payload.user_input, payload.medieval_mode):
+                yield sse_event(event["event"], event["data"])
+        except Exception as e:
+            yield sse_event("error", {"response": f"Error: {str(e)}"})
+        finally:
+            release()
+
+    # If the client disconnects before the body is first iterated, the generator
+    # never starts and its finally never runs; the background task still releases
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(release),
+    )
+
+@router.post("/api/scam/screen")
+async def screen_addresses(payload: ScamScreenRequest):
+    """
+    Screen many addresses against the scam index, streaming one NDJSON line
+    per address ({"address", "is_scam"}; is_scam is null for invalid input).
+    """
+    # Imported here so workers that never screen addresses don't load numpy
+    from tools.scam_index import get_scam_index
+    from tools.scam_limits import SCAM_SCREEN_CHUNK_SIZE
+
+    try:
+        index = await asyncio.to_thread(get_scam_index)
+    except Exception as e:
+        raise HTTPException(503, f"Scam index unavailable: {e}")
+
+    async def verdicts():
+        addresses = payload.addresses
+        for start in range(0, len(addresses), SCAM_SCREEN_CHUNK_SIZE):
+            chunk = addresses[start:start + SCAM_SCREEN_CHUNK_SIZE]
+            results = await asyncio.to_thread(index.screen, chunk)
+            yield "".join(
+                json.dumps({"address": address, "is_scam": verdict}) + "\n"
+                for address, verdict in zip(chunk, results)
+            )
+
+    return StreamingResponse(verdicts(), media_type="application/x-ndjson")
+
 @router.get("/memory/{session_id}")
 async def read_memory(session_id: str):
-    agent = _agents.get(session_id)
+    agent = await sessions.get(session_id)
     if not agent:
         raise HTTPException(404, f"Session {session_id!r} not found.")
     mem = await agent.memory_manager.get_memory()
     return {"memory": mem}
+
+
+@router.get("/api/stats")
+async def stats():
+    stats = {"scheduler": scheduler.stats(), "sessions": sessions.stats()}
+    # Only report the tool cache once a tool has been loaded in this worker
+    if "tools.memoize" in sys.modules:
+        stats["tool_cache"] = sys.modules["tools.memoize"].tool_cache_stats()
+    if "tools.aave" in sys.modules:
+        stats["aave_cache"] = sys.modules["tools.aave"].aave_cache_stats()
+    index = getattr(sys.modules.get("tools.scam_index"), "_index", None)
+    if index is not None:
+        stats["scam_index"] = index.stats()
+    return stats
+
+
+@router.get("/metrics")
+async def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
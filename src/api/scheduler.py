@@ -0,0 +1,156 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+from ..metrics import CHAT_IN_FLIGHT, CHAT_QUEUE_DEPTH, CHAT_QUEUE_WAIT_SECONDS, CHAT_REJECTED
+
+CHAT_MAX_CONCURRENCY = int(os.environ.get("CHAT_MAX_CONCURRENCY", 32))
+CHAT_MAX_QUEUE = int(os.environ.get("CHAT_MAX_QUEUE", 128))
+
+
+class SchedulerOverloaded(Exception):
+    """
+    Raised when the admission queue is full; the request should be retried later.
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Too many chat requests in flight, retry after {retry_after}s.")
+        self.retry_after = retry_after
+
+
+class ChatScheduler:
+    """
+    Admission control for chat turns.
+
+    Turns for the same session run one at a time in arrival order (asyncio.Lock
+    wakes waiters FIFO). At most `max_concurrency` turns run at once across all
+    sessions, and at most `max_queue` may wait; beyond that requests are rejected
+    immediately so latency degrades predictably under bursts.
+    """
+
+    def __init__(self, max_concurrency: int = CHAT_MAX_CONCURRENCY, max_queue: int = CHAT_MAX_QUEUE):
+        """
+        Initialize the ChatScheduler.
+
+        Args:
+            max_concurrency: Maximum number of turns running at once.
+            max_queue: Maximum number of turns waiting for a slot.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # session_id -> [lock, number of requests holding or waiting for it]
+        self._session_locks: Dict[str, List[Any]] = {}
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.run_seconds_total = 0.0
+        self.completed = 0
+
+    def retry_after(self) -> int:
+        """
+        Estimate how long until a slot frees up, from the average turn duration.
+        """
+        average_run = self.run_seconds_total / self.completed if self.completed else 1.0
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(average_run * backlog))
+
+    async def acquire(self, session_id: str) -> float:
+        """
+        Wait for this session's turn and a global slot.
+
+        Returns:
+            The start time of the turn, to be passed to release().
+
+        Raises:
+            SchedulerOverloaded: If the queue is full.
+        """
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            CHAT_REJECTED.inc()
+            raise SchedulerOverloaded(self.retry_after())
+
+        entry = self._session_locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        self.waiting += 1
+        CHAT_QUEUE_DEPTH.inc()
+        queued_at = time.monotonic()
+        lock_acquired = False
+        try:
+            await entry[0].acquire()
+            lock_acquired = True
+            await self._semaphore.acquire()
+        except BaseException:
+            if lock_acquired:
+                entry[0].release()
+            self._drop_session_ref(session_id, entry)
+            raise
+        finally:
+            self.waiting -= 1
+            CHAT_QUEUE_DEPTH.dec()
+
+        started_at = time.monotonic()
+        waited = started_at - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        CHAT_QUEUE_WAIT_SECONDS.observe(waited)
+        self.admitted += 1
+        self.running += 1
+        CHAT_IN_FLIGHT.inc()
+        return started_at
+
+    def release(self, session_id: str, started_at: float) -> None:
+        """
+        Finish a turn started with acquire().
+        """
+        self.running -= 1
+        CHAT_IN_FLIGHT.dec()
+        self.completed += 1
+        self.run_seconds_total += time.monotonic() - started_at
+        self._semaphore.release()
+        entry = self._session_locks[session_id]
+        entry[0].release()
+        self._drop_session_ref(session_id, entry)
+
+    def is_busy(self, session_id: str) -> bool:
+        """
+        True while a turn for the session is running or waiting for its turn.
+        """
+        return session_id in self._session_locks
+
+    def _drop_session_ref(self, session_id: str, entry: List[Any]) -> None:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._session_locks[session_id]
+
+    @asynccontextmanager
+    async def slot(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Context manager around acquire()/release().
+        """
+        started_at = await self.acquire(session_id)
+        try:
+            yield
+        finally:
+            self.release(session_id, started_at)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_avg": round(self.wait_seconds_total / self.admitted, 4) if self.admitted else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 4),
+        }
+
+
+scheduler = ChatScheduler()
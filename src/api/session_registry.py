@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+
+class SessionRegistry(ABC):
+    """
+    Stores the metadata needed to rebuild an AsyncZepMemoryAgent for a session
+    (see AsyncZepMemoryAgent.session_metadata), so any worker can serve it.
+    """
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the session's metadata, or None if the session is unknown.
+        """
+
+    @abstractmethod
+    async def put(self, session_id: str, metadata: Dict[str, Any]) -> None:
+        """
+        Store the session's metadata, replacing any previous entry.
+        """
+
+    async def touch(self, session_id: str) -> None:
+        """
+        Record that the session is still in use, so it isn't expired while active.
+        """
+
+    async def exists(self, session_id: str) -> bool:
+        return await self.get(session_id) is not None
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """
+    Process-local registry; sessions are only visible to the worker that created them.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._entries.get(session_id)
+
+    async def put(self, session_id: str, metadata: Dict[str, Any]) -> None:
+        self._entries[session_id] = metadata
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def touch(self, session_id: str) -> None:
+        if session_id in self._entries:
+            self._entries.move_to_end(session_id)
+
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """
+    Registry in a SQLite file (WAL mode) shared by every worker on the host,
+    so requests for a session can land on any gunicorn worker.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the SQLiteSessionRegistry.
+
+        Args:
+            path: SQLite database file.
+            ttl: Seconds after its last use (see touch()) that a session is forgotten.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS session_registry (
+                    session_id TEXT PRIMARY KEY,
+                    metadata TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    async def _run(self, func):
+        def locked():
+            with self._lock, self._conn:
+                return func()
+
+        return await asyncio.to_thread(locked)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._run(
+            lambda: self._conn.execute(
+                "SELECT metadata FROM session_registry WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl),
+            ).fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    async def put(self, session_id: str, metadata: Dict[str, Any]) -> None:
+        now = time.time()
+
+        def upsert():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO session_registry (session_id, metadata, updated_at) VALUES (?, ?, ?)",
+                (session_id, json.dumps(metadata), now),
+            )
+            self._conn.execute("DELETE FROM session_registry WHERE updated_at < ?", (now - self.ttl,))
+
+        await self._run(upsert)
+
+    async def touch(self, session_id: str) -> None:
+        await self._run(
+            lambda: self._conn.execute(
+                "UPDATE session_registry SET updated_at = ? WHERE session_id = ?", (time.time(), session_id)
+            )
+        )
+
+
+def create_session_registry() -> SessionRegistry:
+    """
+    Build the registry selected by SESSION_REGISTRY ("memory" or "sqlite").
+    """
+    if os.environ.get("SESSION_REGISTRY", "memory").lower() == "sqlite":
+        return SQLiteSessionRegistry(
+            os.environ.get("SESSION_REGISTRY_PATH", ".cache/sessions.sqlite3"),
+            ttl=float(os.environ.get("SESSION_REGISTRY_TTL", 7 * 24 * 3600)),
+        )
+    return InMemorySessionRegistry()
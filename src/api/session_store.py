@@ -1,4 +1,185 @@
-from typing import Dict
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 from ..agent import AsyncZepMemoryAgent
+from .scheduler import scheduler
+from .session_registry import SessionRegistry, create_session_registry
 
-agents: Dict[str, AsyncZepMemoryAgent] = {}
\ No newline at end of file
+SESSION_MAX = int(os.environ.get("SESSION_MAX", 1000))
+SESSION_IDLE_TTL = float(os.environ.get("SESSION_IDLE_TTL", 1800))
+SESSION_REAP_INTERVAL = float(os.environ.get("SESSION_REAP_INTERVAL", 60))
+# How often a live session's last use is written to the registry, which expires unused sessions
+SESSION_TOUCH_INTERVAL = float(os.environ.get("SESSION_TOUCH_INTERVAL", 300))
+
+
+class SessionStore:
+    """
+    LRU-bounded store of live AsyncZepMemoryAgent sessions.
+
+    Sessions are closed (flushing memory and releasing their memory client)
+    when they are evicted for space or have been idle longer than `idle_ttl`.
+    Sessions with a turn in flight are never evicted; the store may briefly
+    exceed `max_sessions` when all of them are busy.
+    Session metadata is kept in a SessionRegistry, so a request for a session
+    that was evicted, or created by another worker, transparently rehydrates
+    it from the memory backend.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX,
+        idle_ttl: float = SESSION_IDLE_TTL,
+        registry: Optional[SessionRegistry] = None,
+        is_busy: Optional[Callable[[str], bool]] = None,
+        touch_interval: float = SESSION_TOUCH_INTERVAL,
+    ):
+        """
+        Initialize the SessionStore.
+
+        Args:
+            max_sessions: Maximum number of live agents kept in memory.
+            idle_ttl: Seconds after which an unused session is closed.
+            registry: Where session metadata is kept. Defaults to the one selected by SESSION_REGISTRY.
+            is_busy: Tells whether a session has a turn in flight, which pins it. Defaults to the chat scheduler.
+            touch_interval: Minimum seconds between registry touches of a session in use.
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.registry = registry or create_session_registry()
+        self.is_busy = is_busy or scheduler.is_busy
+        self.touch_interval = touch_interval
+        # session_id -> when the registry last recorded the session as used
+        self._touched_at: Dict[str, float] = {}
+        self._agents: "OrderedDict[str, Tuple[AsyncZepMemoryAgent, float]]" = OrderedDict()
+        self._rehydrating: Dict[str, asyncio.Task] = {}
+        # Close tasks of evicted sessions, referenced until they finish
+        self._background: Set[asyncio.Task] = set()
+        self.evictions = 0
+        self.rehydrations = 0
+
+    async def exists(self, session_id: str) -> bool:
+        """
+        True if the session is live here or known to the registry.
+        """
+        return session_id in self._agents or await self.registry.exists(session_id)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    async def add(self, session_id: str, agent: AsyncZepMemoryAgent) -> None:
+        """
+        Register a new session, evicting the least recently used ones over capacity.
+        """
+        await self.registry.put(session_id, agent.session_metadata())
+        self._touched_at[session_id] = time.monotonic()
+        self._keep(session_id, agent)
+
+    def _keep(self, session_id: str, agent: AsyncZepMemoryAgent) -> None:
+        self._agents[session_id] = (agent, time.monotonic())
+        self._agents.move_to_end(session_id)
+        excess = len(self._agents) - self.max_sessions
+        if excess > 0:
+            # Oldest first, skipping the session just used and any with a turn in flight
+            idle = [sid for sid in self._agents if sid != session_id and not self.is_busy(sid)]
+            for evicted_id in idle[:excess]:
+                self._evict(evicted_id)
+
+    async def get(self, session_id: str) -> Optional[AsyncZepMemoryAgent]:
+        """
+        Return the agent for a session, rehydrating it if it was evicted.
+        Returns None for unknown sessions.
+        """
+        entry = self._agents.get(session_id)
+        if entry is not None:
+            now = time.monotonic()
+            self._agents[session_id] = (entry[0], now)
+            self._agents.move_to_end(session_id)
+            if now - self._touched_at.get(session_id, 0.0) >= self.touch_interval:
+                self._touched_at[session_id] = now
+                await self.registry.touch(session_id)
+            return entry[0]
+
+        # Concurrent requests for the same evicted session share one rehydration
+        task = self._rehydrating.get(session_id)
+        if task is None:
+            task = asyncio.create_task(self._rehydrate(session_id))
+            self._rehydrating[session_id] = task
+            task.add_done_callback(lambda done: self._rehydrated(session_id, done))
+        # Shielded so a caller that disconnects doesn't cancel the rehydration for the others
+        return await asyncio.shield(task)
+
+    def _rehydrated(self, session_id: str, task: asyncio.Task) -> None:
+        del self._rehydrating[session_id]
+        # Retrieve the exception so it isn't reported as unhandled when every caller left
+        if not task.cancelled():
+            task.exception()
+
+    async def _rehydrate(self, session_id: str) -> Optional[AsyncZepMemoryAgent]:
+        metadata = await self.registry.get(session_id)
+        if metadata is None:
+            return None
+        agent = await AsyncZepMemoryAgent.rehydrate(metadata)
+        await self.registry.touch(session_id)
+        self._touched_at[session_id] = time.monotonic()
+        self.rehydrations += 1
+        self._keep(session_id, agent)
+        return agent
+
+    def _evict(self, session_id: str) -> None:
+        agent, _ = self._agents.pop(session_id)
+        self._touched_at.pop(session_id, None)
+        self.evictions += 1
+        # Closing flushes memory writes; don't make the current request wait for it.
+        # The task is kept referenced until done so it can't be garbage-collected mid-flush
+        task = asyncio.create_task(self._close(agent))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _close(self, agent: AsyncZepMemoryAgent) -> None:
+        try:
+            await agent.close()
+        except Exception as e:
+            print(f"Error closing session: {e}")
+
+    def evict_idle(self) -> int:
+        """
+        Close every session idle for longer than idle_ttl. Returns how many were closed.
+        """
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = [
+            sid for sid, (_, last_used) in self._agents.items()
+            if last_used < cutoff and not self.is_busy(sid)
+        ]
+        for session_id in idle:
+            self._evict(session_id)
+        return len(idle)
+
+    async def reap_forever(self, interval: float = SESSION_REAP_INTERVAL) -> None:
+        """
+        Periodically close idle sessions; run as a background task.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def close_all(self) -> None:
+        """
+        Close every live session, e.g. on shutdown.
+        """
+        agents = [agent for agent, _ in self._agents.values()]
+        self._agents.clear()
+        # Also wait for sessions evicted earlier whose close is still running
+        await asyncio.gather(*(self._close(agent) for agent in agents), *list(self._background))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live": len(self._agents),
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+        }
+
+
+sessions = SessionStore()
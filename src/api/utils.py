@@ -1,22 +1,37 @@
 from functools import wraps
+from typing import Any
+import json
 import os
 
+DEMO_MODE_REPLY = (
+    "I'm currently in demo mode. Please connect an LLM agent "
+    "to enable full functionality. In the meantime, I can show "
+    "you how the interface works!"
+)
+
+def demo_mode() -> bool:
+    """
+    True when no LLM is configured (OPENAI_API_KEY unset or empty).
+    """
+    return not os.getenv("OPENAI_API_KEY")
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Format one Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 def llm_response(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
+        payload = kwargs.get("payload")
+        original_payload = payload.dict() if payload is not None else {}
         try:
-            # True only if OPENAI_API_KEY is set and nonempty
-            has_llm = bool(os.getenv("OPENAI_API_KEY"))
-
-            if not has_llm:
+            if demo_mode():
                 return {
-                    "response": (
-                        "I'm currently in demo mode. Please connect an LLM agent "
-                        "to enable full functionality. In the meantime, I can show "
-                        "you how the interface works!"
-                    ),
+                    "response": DEMO_MODE_REPLY,
                     "status": "warning",
-                    "original_payload": kwargs.get("payload", {}),
+                    "original_payload": original_payload,
                 }
 
             # Otherwise call your real handler
@@ -26,7 +41,7 @@ def llm_response(func):
             return {
                 "response": f"Error: {str(e)}",
                 "status": "error",
-                "original_payload": kwargs.get("payload", {}),
+                "original_payload": original_payload,
             }
 
     return wrapper
\ No newline at end of file
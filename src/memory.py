@@ -1,19 +1,34 @@
+import asyncio
 import os
 import time
-from typing import Dict, List, Optional, Any
+import weakref
+from typing import Dict, List, Optional, Set, Any
 import uuid
 import dotenv
 
-from zep_cloud.client import AsyncZep
-from zep_cloud.types import Message as ZepMessage
-from zep_cloud import NotFoundError
+from .memory_backends import MemoryBackend, create_memory_backend
+from .metrics import time_backend_call
 
 dotenv.load_dotenv()
-ZEP_API_KEY = os.environ.get("ZEP_API_KEY")
+# Write-behind buffer: messages are sent to the backend in one call once this
+# many are pending, or after this many seconds, whichever comes first.
+MEMORY_FLUSH_SIZE = int(os.environ.get("MEMORY_FLUSH_SIZE", 8))
+MEMORY_FLUSH_INTERVAL = float(os.environ.get("MEMORY_FLUSH_INTERVAL", 2.0))
+# How old (in seconds) a cached memory context may be before chat() waits for a fresh one
+MEMORY_CONTEXT_MAX_STALENESS = float(os.environ.get("MEMORY_CONTEXT_MAX_STALENESS", 60.0))
+
+# Users this process has already created or seen, so session creation can skip the lookup
+_known_users: set = set()
+
+# Managers with a live buffer, so pending messages can be flushed on shutdown
+_active_managers: "weakref.WeakSet[AsyncZepMemoryManager]" = weakref.WeakSet()
 
 class AsyncZepMemoryManager:
     """
     A class to manage memory using AsyncZep for the OpenAI Agents SDK.
+
+    Storage goes through a MemoryBackend: Zep by default, or the local
+    SQLite backend when MEMORY_BACKEND=local.
     """
 
     def __init__(
@@ -24,6 +39,7 @@ class AsyncZepMemoryManager:
         first_name: Optional[str] = None,
         last_name: Optional[str] = None,
         ignore_assistant: bool = False,
+        backend: Optional[MemoryBackend] = None,
     ):
         """
         Initialize the AsyncZepMemoryManager.
@@ -34,6 +50,7 @@ class AsyncZepMemoryManager:
             email: Optional email address for the user.
             first_name: Optional first name for the user.
             last_name: Optional last name for the user.
+            backend: Optional memory backend. If not provided, one is created from the environment on initialize().
         """
         self.session_id = session_id or str(uuid.uuid4())
         self.user_id = user_id or f"user-{str(uuid.uuid4())[:8]}"
@@ -41,49 +58,63 @@ class AsyncZepMemoryManager:
         self.first_name = first_name
         self.last_name = last_name
         self.ignore_assistant = ignore_assistant
-        self.zep_client: AsyncZep | None = None
+        self.backend: Optional[MemoryBackend] = backend
+        self._pending: List[Dict[str, str]] = []
+        self._flush_timer: Optional[asyncio.Task] = None
+        # Flushes triggered by buffer size, referenced until done so close() can wait for them
+        self._size_flushes: Set[asyncio.Task] = set()
+        self._flush_lock = asyncio.Lock()
+        self._context: Optional[str] = None
+        self._context_fetched_at = 0.0
+        self._context_refresh: Optional[asyncio.Task] = None
 
-    async def initialize(self):
+    async def initialize(self, resume: bool = False):
         """
-        Initialize the AsyncZep client, create or get the user, and create a new memory session.
+        Initialize the memory backend, create or get the user, and create a new memory session.
+
+        Args:
+            resume: Reattach to the existing session `session_id` instead of creating a new one.
         """
-        if not ZEP_API_KEY:
-            print(
-                "Error: ZEP_API_KEY environment variable not set. Cannot initialize AsyncZep client."
-            )
+        if self.backend is None:
+            self.backend = create_memory_backend()
+        if self.backend is None or resume:
             return
 
-        self.zep_client = AsyncZep(api_key=ZEP_API_KEY)
-
-        # Create or get the user
-        try:
-            # Try to get the user first
-            await self.zep_client.user.get(self.user_id)
-            print(f"Using existing user: {self.user_id}")
-
-        except NotFoundError:
-            await self.zep_client.user.add(
-                user_id=self.user_id,
-                first_name=self.first_name,
-                last_name=self.last_name,
-                email=self.email,
-            )
-            print(f"Created new user with ID: {self.user_id}")
-
         # Generate a timestamp-based session ID for a new session each time
         timestamp = int(time.time())
         self.session_id = f"{self.session_id}-{timestamp}"
         print(f"Creating new session with ID: {self.session_id}")
 
-        # Always create a new memory session with the user ID
-        await self.zep_client.memory.add_session(
-            session_id=self.session_id,
-            user_id=self.user_id,
+        if self.user_id in _known_users:
+            # Always create a new memory session with the user ID
+            await self.backend.create_session(self.session_id, self.user_id)
+            return
+
+        # Create or get the user while optimistically creating the session. For an
+        # existing user that is a single round trip; for a new one the session is
+        # retried once the user exists.
+        user_result, session_result = await asyncio.gather(
+            self.backend.ensure_user(
+                self.user_id,
+                email=self.email,
+                first_name=self.first_name,
+                last_name=self.last_name,
+            ),
+            self.backend.create_session(self.session_id, self.user_id),
+            return_exceptions=True,
         )
+        if isinstance(user_result, BaseException):
+            raise user_result
+        _known_users.add(self.user_id)
+        if isinstance(session_result, BaseException):
+            await self.backend.create_session(self.session_id, self.user_id)
 
     async def add_message(self, message: dict) -> None:
         """
-        Add a message to Zep memory.
+        Queue a message for Zep memory.
+
+        Messages are buffered per session and written behind in batches, so this
+        returns without waiting on Zep. Call flush() to force the write.
 
         Args:
             message: The message to add to memory.
@@ -97,7 +128,7 @@ class AsyncZepMemoryManager:
             if self.last_name:
                 zep_message_role += " " + self.last_name
 
-        zep_message = ZepMessage(
+        zep_message = dict(
             role=zep_message_role
             if zep_message_role
             else "assistant",  # role in Zep is the name of the user
@@ -105,15 +136,67 @@ class AsyncZepMemoryManager:
             content=message.get("content", ""),
         )
 
-        # Add message to Zep memory using AsyncZep client
-        if not self.zep_client:
-            raise ValueError("Zep client not initialized")
+        if not self.backend:
+            raise ValueError("Memory backend not initialized")
 
-        await self.zep_client.memory.add(
-            session_id=self.session_id,
-            messages=[zep_message],
-            ignore_roles=["assistant"] if self.ignore_assistant else None,
-        )
+        self._pending.append(zep_message)
+        _active_managers.add(self)
+        if len(self._pending) >= MEMORY_FLUSH_SIZE:
+            task = asyncio.create_task(self._flush_later(0))
+            self._size_flushes.add(task)
+            task.add_done_callback(self._size_flushes.discard)
+        elif self._flush_timer is None or self._flush_timer.done():
+            self._flush_timer = asyncio.create_task(self._flush_later(MEMORY_FLUSH_INTERVAL))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            # Shielded so close() cancelling the timer doesn't interrupt a write in progress
+            await asyncio.shield(self.flush())
+        except Exception:
+            # Already logged by flush(); the messages stay buffered for the next attempt
+            pass
+
+    async def flush(self) -> None:
+        """
+        Send all buffered messages to the backend in a single call.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            try:
+                with time_backend_call("add_messages"):
+                    await self.backend.add_messages(
+                        self.session_id,
+                        batch,
+                        ignore_roles=["assistant"] if self.ignore_assistant else None,
+                    )
+            except BaseException as e:
+                # Keep the messages (in order) for the next flush, also when cancelled
+                self._pending = batch + self._pending
+                if isinstance(e, Exception):
+                    print(f"Error flushing messages to memory: {e}")
+                raise
+        # The backend has new messages, so refresh the cached context in the background
+        self.refresh_context()
+
+    async def close(self) -> None:
+        """
+        Stop the flush timer, write out anything still buffered and close the backend.
+        """
+        if self._flush_timer and not self._flush_timer.done():
+            self._flush_timer.cancel()
+        if self._context_refresh and not self._context_refresh.done():
+            self._context_refresh.cancel()
+        _active_managers.discard(self)
+        if self._size_flushes:
+            await asyncio.gather(*list(self._size_flushes))
+        if self.backend:
+            try:
+                await self.flush()
+            finally:
+                await self.backend.close()
 
     async def get_memory(self) -> str:
         """
@@ -123,24 +206,56 @@ class AsyncZepMemoryManager:
             A string containing the memory context from Zep.
         """
         try:
-            if not self.zep_client:
-                raise ValueError("Zep client not initialized")
+            if not self.backend:
+                raise ValueError("Memory backend not initialized")
 
-            # Use memory.get to retrieve memory context for the session
-            memory = await self.zep_client.memory.get(session_id=self.session_id)
-
-            # Use the context string provided by Zep instead of creating a summary
-            if memory.context:
-                return memory.context
-
-            return "No conversation history yet."
-        except NotFoundError:
-            print("Session not found.")
-            raise
+            # Use the context string provided by the backend instead of creating a summary
+            with time_backend_call("get_context"):
+                context = await self.backend.get_context(self.session_id) or "No conversation history yet."
+            self._context = context
+            self._context_fetched_at = time.monotonic()
+            return context
         except Exception as e:
             print(f"Error getting memory context: {e}")
             raise
 
+    async def get_context(self) -> str:
+        """
+        Get the memory context for a chat turn without a Zep round trip when possible.
+
+        Returns the cached context if it is younger than MEMORY_CONTEXT_MAX_STALENESS
+        (the cache is refreshed in the background after every flush), otherwise
+        fetches it from Zep.
+
+        Returns:
+            A string containing the memory context.
+        """
+        if (
+            self._context is not None
+            and time.monotonic() - self._context_fetched_at <= MEMORY_CONTEXT_MAX_STALENESS
+        ):
+            return self._context
+        if self._context_refresh and not self._context_refresh.done():
+            context = await asyncio.shield(self._context_refresh)
+            if context is not None:
+                return context
+        return await self.get_memory()
+
+    def refresh_context(self) -> None:
+        """
+        Re-fetch the memory context in the background, unless a refresh is already running.
+        """
+        if self._context_refresh and not self._context_refresh.done():
+            return
+        self._context_refresh = asyncio.create_task(self._refresh_context())
+
+    async def _refresh_context(self) -> Optional[str]:
+        try:
+            return await self.get_memory()
+        except Exception:
+            # get_memory() already logged it; callers fall back to the last known context
+            return self._context
+
     async def search_memory(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
         Search Zep memory for relevant facts based on a query.
@@ -154,38 +269,37 @@ class AsyncZepMemoryManager:
             A list of relevant facts.
         """
 
-        formatted_messages = []
-        # First try to use graph.search to find relevant information
         try:
-            # Check if zep_client is initialized
-            if not self.zep_client:
-                raise ValueError("Zep client not initialized")
+            if not self.backend:
+                raise ValueError("Memory backend not initialized")
 
             # Use the user_id property directly instead of getting it from the session
-            if self.user_id:
-                # Use graph.search to find relevant edges. Facts reside on graph edges
-                search_response = await self.zep_client.graph.search(
-                    query=query, user_id=self.user_id, scope="edges", limit=limit
-                )
-
-                if search_response and search_response.edges:
-                    # Convert graph search results to the expected format
-                    formatted_messages = [
-                        {
-                            "role": "assistant",  # These are facts, so mark them as from the assistant
-                            "content": edge.fact,
-                        }
-                        for edge in search_response.edges[:limit]
-                    ]
-                    print(
-                        f"Memory search found {len(formatted_messages)} relevant facts from graph search"
-                    )
-                    return formatted_messages
-        except NotFoundError:
-            print("User not found.")
-            raise
+            with time_backend_call("search"):
+                facts = await self.backend.search(self.user_id, query, limit=limit)
         except Exception as search_error:
-            print(f"Graph search error: {search_error}")
+            print(f"Memory search error: {search_error}")
             raise
 
+        # Convert search results to the expected format
+        formatted_messages = [
+            {
+                "role": "assistant",  # These are facts, so mark them as from the assistant
+                "content": fact,
+            }
+            for fact in facts
+        ]
+        if formatted_messages:
+            print(f"Memory search found {len(formatted_messages)} relevant facts")
         return formatted_messages
+
+
+async def flush_all_memory() -> None:
+    """
+    Flush the write-behind buffers of every live memory manager, e.g. on shutdown.
+    """
+    results = await asyncio.gather(
+        *(manager.close() for manager in list(_active_managers)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Error flushing memory on shutdown: {result}")
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import dotenv
+
+dotenv.load_dotenv()
+
+
+class MemoryBackend(ABC):
+    """
+    Storage interface used by AsyncZepMemoryManager.
+
+    Messages are plain dicts with `role` (display name), `role_type`
+    (user/assistant) and `content` keys.
+    """
+
+    @abstractmethod
+    async def ensure_user(
+        self,
+        user_id: str,
+        email: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+    ) -> None:
+        """
+        Create the user if it does not exist yet.
+        """
+
+    @abstractmethod
+    async def create_session(self, session_id: str, user_id: str) -> None:
+        """
+        Create a new memory session for the user.
+        """
+
+    @abstractmethod
+    async def add_messages(
+        self, session_id: str, messages: List[Dict[str, str]], ignore_roles: Optional[List[str]] = None
+    ) -> None:
+        """
+        Append a batch of messages to the session.
+        """
+
+    @abstractmethod
+    async def get_context(self, session_id: str) -> Optional[str]:
+        """
+        Return the memory context string for the session, or None if there is none yet.
+        """
+
+    @abstractmethod
+    async def search(self, user_id: str, query: str, limit: int = 5) -> List[str]:
+        """
+        Return up to `limit` facts about the user relevant to the query.
+        """
+
+    async def close(self) -> None:
+        """
+        Release any client resources held by the backend.
+        """
+
+
+class LocalMemoryBackend(MemoryBackend):
+    """
+    In-process memory backend on SQLite with FTS5 full-text search.
+
+    Needs no network access, which makes it suitable for single-node
+    deployments, load tests and CI, and as a latency baseline for Zep.
+    The context is the user's most recent messages across sessions and
+    search ranks the user's own messages with BM25. Like Zep, messages of
+    ignored roles are kept in the history but not indexed for search.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", context_messages: int = 20):
+        """
+        Initialize the LocalMemoryBackend.
+
+        Args:
+            path: SQLite database file, or ":memory:" for a process-local store.
+            context_messages: Number of recent messages included in the context.
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.context_messages = context_messages
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id TEXT PRIMARY KEY,
+                    email TEXT,
+                    first_name TEXT,
+                    last_name TEXT
+                );
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    role TEXT,
+                    role_type TEXT,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS messages_user ON messages (user_id, id);
+                CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+                    USING fts5(content, content='messages', content_rowid='id');
+                -- Messages are indexed by add_messages, which skips ignored roles
+                DROP TRIGGER IF EXISTS messages_ai;
+                """
+            )
+
+    async def _run(self, func, *args):
+        def locked():
+            with self._lock, self._conn:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def ensure_user(self, user_id, email=None, first_name=None, last_name=None) -> None:
+        await self._run(
+            lambda: self._conn.execute(
+                "INSERT OR IGNORE INTO users (user_id, email, first_name, last_name) VALUES (?, ?, ?, ?)",
+                (user_id, email, first_name, last_name),
+            )
+        )
+
+    async def create_session(self, session_id: str, user_id: str) -> None:
+        await self._run(
+            lambda: self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, user_id) VALUES (?, ?)",
+                (session_id, user_id),
+            )
+        )
+
+    def _session_user(self, session_id: str) -> str:
+        row = self._conn.execute(
+            "SELECT user_id FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Session {session_id!r} not found.")
+        return row[0]
+
+    async def add_messages(self, session_id, messages, ignore_roles=None) -> None:
+        def insert():
+            user_id = self._session_user(session_id)
+            now = time.time()
+            for m in messages:
+                cursor = self._conn.execute(
+                    "INSERT INTO messages (session_id, user_id, role, role_type, content, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (session_id, user_id, m.get("role"), m.get("role_type"), m.get("content", ""), now),
+                )
+                if m.get("role_type") not in (ignore_roles or []):
+                    self._conn.execute(
+                        "INSERT INTO messages_fts (rowid, content) VALUES (?, ?)",
+                        (cursor.lastrowid, m.get("content", "")),
+                    )
+
+        await self._run(insert)
+
+    async def get_context(self, session_id: str) -> Optional[str]:
+        def recent():
+            user_id = self._session_user(session_id)
+            return self._conn.execute(
+                "SELECT role_type, content FROM messages WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, self.context_messages),
+            ).fetchall()
+
+        rows = await self._run(recent)
+        if not rows:
+            return None
+        return "\n".join(f"- {role}: {content}" for role, content in reversed(rows))
+
+    async def search(self, user_id: str, query: str, limit: int = 5) -> List[str]:
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        # Quote each term so user input can't inject FTS5 query syntax
+        match = " OR ".join(f'"{term}"' for term in terms)
+        rows = await self._run(
+            lambda: self._conn.execute(
+                "SELECT m.content FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ? AND m.user_id = ? AND m.role_type = 'user' "
+                "ORDER BY bm25(messages_fts) LIMIT ?",
+                (match, user_id, limit),
+            ).fetchall()
+        )
+        return [row[0] for row in rows]
+
+    async def close(self) -> None:
+        # The connection is shared by every session using this backend
+        pass
+
+
+_local_backend: Optional[LocalMemoryBackend] = None
+
+
+def create_memory_backend() -> Optional[MemoryBackend]:
+    """
+    Build the memory backend selected by MEMORY_BACKEND ("zep" or "local").
+
+    Returns:
+        The backend, or None if Zep is selected but ZEP_API_KEY is not set.
+    """
+    global _local_backend
+    if os.environ.get("MEMORY_BACKEND", "zep").lower() == "local":
+        if _local_backend is None:
+            _local_backend = LocalMemoryBackend(os.environ.get("MEMORY_LOCAL_PATH", ":memory:"))
+        return _local_backend
+
+    api_key = os.environ.get("ZEP_API_KEY")
+    if not api_key:
+        print(
+            "Error: ZEP_API_KEY environment variable not set. Cannot initialize AsyncZep client."
+        )
+        return None
+    # zep_cloud is only imported when the Zep backend is actually used
+    from .zep_backend import ZepMemoryBackend
+
+    return ZepMemoryBackend(api_key)
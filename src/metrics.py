@@ -0,0 +1,227 @@
+"""
+Prometheus metrics for chat turns and their scheduling, tools, model calls and the memory backend.
+
+Everything is kept in-process and exposed by the API on GET /metrics, so no
+external collector is needed. When several workers run under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR to a shared empty directory and /metrics aggregates
+all of them.
+"""
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+# LLM turns take seconds; cached tools and memory lookups take milliseconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+CHAT_PHASE_SECONDS = Histogram(
+    "chat_phase_seconds",
+    "Duration of each phase of a chat turn.",
+    ["phase"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_SECONDS = Histogram(
+    "tool_seconds",
+    "Duration of agent tool calls.",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+)
+TOOL_CALLS = Counter(
+    "tool_calls_total",
+    "Agent tool calls by outcome (ok or error).",
+    ["tool", "outcome"],
+)
+TOOL_CACHE_LOOKUPS = Counter(
+    "tool_cache_lookups_total",
+    "Memoized tool calls by result (hit or miss), see tools/memoize.py.",
+    ["tool", "result"],
+)
+# Gauges are summed over live workers when PROMETHEUS_MULTIPROC_DIR is set
+CHAT_QUEUE_DEPTH = Gauge(
+    "chat_queue_depth",
+    "Chat turns waiting for their session's turn or a scheduler slot.",
+    multiprocess_mode="livesum",
+)
+CHAT_IN_FLIGHT = Gauge(
+    "chat_in_flight",
+    "Chat turns currently running.",
+    multiprocess_mode="livesum",
+)
+CHAT_QUEUE_WAIT_SECONDS = Histogram(
+    "chat_queue_wait_seconds",
+    "Time chat turns waited in the scheduler before starting.",
+    buckets=LATENCY_BUCKETS,
+)
+CHAT_REJECTED = Counter(
+    "chat_rejected_total",
+    "Chat turns rejected because the scheduler queue was full.",
+)
+ROUTED_TURNS = Counter(
+    "routed_turns_total",
+    "Chat turns answered by the fast-path intent router without the orchestrator.",
+    ["intent"],
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds",
+    "Duration of model requests made by the agent runner.",
+    ["model"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "Model requests made by the agent runner.",
+    ["model"],
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens used by the agent runner's model requests.",
+    ["model", "kind"],
+)
+PROMPT_TOKENS = Histogram(
+    "prompt_tokens",
+    "Tokens per chat turn in each part of the orchestrator prompt (see src/prompt.py).",
+    ["part"],
+    buckets=TOKEN_BUCKETS,
+)
+PROMPT_TRUNCATIONS = Counter(
+    "prompt_truncations_total",
+    "Prompt parts cut to fit their token budget.",
+    ["part"],
+)
+MEMORY_BACKEND_SECONDS = Histogram(
+    "memory_backend_seconds",
+    "Duration of memory backend calls.",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+MEMORY_BACKEND_ERRORS = Counter(
+    "memory_backend_errors_total",
+    "Failed memory backend calls.",
+    ["operation"],
+)
+
+
+@contextmanager
+def time_backend_call(operation: str) -> Iterator[None]:
+    """
+    Time a memory backend call and count it as an error if it raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        MEMORY_BACKEND_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        MEMORY_BACKEND_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+
+def instrument_tool(func: Callable) -> Callable:
+    """
+    Record the duration and outcome of a tool function.
+
+    Apply it below @function_tool so exceptions are seen before the Agents SDK
+    turns them into an error message for the model:
+
+        @function_tool
+        @instrument_tool
+        async def my_tool(...): ...
+    """
+    name = func.__name__
+
+    def record(started: float, outcome: str) -> None:
+        TOOL_SECONDS.labels(name).observe(time.perf_counter() - started)
+        TOOL_CALLS.labels(name, outcome).inc()
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                record(started, "error")
+                raise
+            record(started, "ok")
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            record(started, "error")
+            raise
+        record(started, "ok")
+        return result
+
+    return wrapper
+
+
+@lru_cache(maxsize=1)
+def _model_hooks_class() -> type:
+    # Only built once a run starts, when the Agents SDK is already loaded
+    from agents import RunHooks
+
+    class ModelMetricsHooks(RunHooks):
+        def __init__(self):
+            self._started = {}
+
+        async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+            self._started[agent.name] = time.perf_counter()
+
+        async def on_llm_end(self, context, agent, response) -> None:
+            model = str(agent.model or "default")
+            started = self._started.pop(agent.name, None)
+            if started is not None:
+                LLM_REQUEST_SECONDS.labels(model).observe(time.perf_counter() - started)
+            LLM_REQUESTS.labels(model).inc()
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                LLM_TOKENS.labels(model, "input").inc(usage.input_tokens or 0)
+                # Input tokens served from the provider's prompt cache
+                details = getattr(usage, "input_tokens_details", None)
+                LLM_TOKENS.labels(model, "cached_input").inc(getattr(details, "cached_tokens", 0) or 0)
+                LLM_TOKENS.labels(model, "output").inc(usage.output_tokens or 0)
+
+    return ModelMetricsHooks
+
+
+def run_hooks() -> Any:
+    """
+    Return fresh RunHooks recording model request counts, latency and token
+    usage for one Runner run. Hooks keep per-run state, so use one per run.
+    """
+    return _model_hooks_class()()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        The payload and its content type.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,183 @@
+"""
+Prompt assembly for the orchestrator.
+
+The system prompt is a static prefix (persona plus tool instructions) that is
+byte-identical on every turn and for every session, so provider-side prompt
+caching can reuse it. Per-turn data follows it: the memory context goes in its
+own message ahead of the user's message, cut to a token budget by relevance
+to that message. search_memory results are budgeted the same way.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .metrics import PROMPT_TOKENS, PROMPT_TRUNCATIONS
+from .utils import get_config
+
+load_dotenv()
+
+MEMORY_CONTEXT_TOKEN_BUDGET = int(os.environ.get("MEMORY_CONTEXT_TOKEN_BUDGET", 1500))
+SEARCH_MEMORY_TOKEN_BUDGET = int(os.environ.get("SEARCH_MEMORY_TOKEN_BUDGET", 600))
+# "tiktoken" counts prompt tokens exactly; "estimate" (the default) uses ~4 characters per token
+PROMPT_TOKENIZER = os.environ.get("PROMPT_TOKENIZER", "estimate").lower()
+# Encoding of the orchestrator model family, used with PROMPT_TOKENIZER=tiktoken
+PROMPT_ENCODING = os.environ.get("PROMPT_ENCODING", "o200k_base")
+
+TERM_PATTERN = re.compile(r"\w{3,}")
+
+
+_encoding: Optional[Any] = None
+
+
+def load_token_encoding() -> Optional[Any]:
+    """
+    Load the tiktoken encoding used by count_tokens() when PROMPT_TOKENIZER=tiktoken.
+
+    tiktoken downloads the encoding unless it is already in TIKTOKEN_CACHE_DIR,
+    so deployments that enable it should pre-seed that directory. The API
+    loads it before serving, so token budgets don't change mid-process.
+
+    Returns:
+        The encoding, or None when disabled or unavailable (counts are then estimated).
+    """
+    global _encoding
+    if _encoding is None and PROMPT_TOKENIZER == "tiktoken":
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding(PROMPT_ENCODING)
+        except Exception as e:
+            print(f"Tokenizer unavailable, estimating token counts: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text (about 4 characters per token without the tokenizer).
+    """
+    if _encoding is None:
+        return (len(text) + 3) // 4
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """
+    Cut a text to at most `budget` tokens.
+    """
+    if _encoding is None:
+        return text[:budget * 4]
+    tokens = _encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= budget else _encoding.decode(tokens[:budget])
+
+
+def _terms(text: str) -> set:
+    return set(TERM_PATTERN.findall(text.lower()))
+
+
+def _select(lines: List[str], budget: int, query: str, prefer_recent: bool) -> set:
+    query_terms = _terms(query)
+    ranked = sorted(
+        range(len(lines)),
+        key=lambda i: (-len(query_terms & _terms(lines[i])), -i if prefer_recent else i),
+    )
+    kept, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(lines[i]) + 1
+        if used + cost <= budget:
+            kept.add(i)
+            used += cost
+    return kept
+
+
+def fit_lines(lines: List[str], budget: int, query: str = "", prefer_recent: bool = False) -> List[str]:
+    """
+    Keep the lines most relevant to `query` that fit in `budget` tokens.
+
+    Relevance is the number of query terms a line shares; ties go to earlier
+    lines, or to later ones with `prefer_recent` (for oldest-first histories).
+    The kept lines stay in their original order.
+
+    Args:
+        lines: Candidate lines.
+        budget: Token budget for the kept lines, one newline each included.
+        query: Text the lines should be relevant to.
+        prefer_recent: Break ties in favour of later lines.
+
+    Returns:
+        The kept lines.
+    """
+    kept = _select(lines, budget, query, prefer_recent)
+    return [line for i, line in enumerate(lines) if i in kept]
+
+
+def fit_context(context: str, budget: int = MEMORY_CONTEXT_TOKEN_BUDGET, query: str = "") -> str:
+    """
+    Fit a memory context to a token budget.
+
+    Bullet lines ("- ...", the facts or messages) are dropped least relevant
+    first; other lines (headers and section tags of Zep contexts) are kept.
+    A context without enough bullets to drop is truncated.
+
+    Args:
+        context: Memory context text.
+        budget: Token budget.
+        query: The user's message, for relevance.
+
+    Returns:
+        The context, unchanged if it already fits.
+    """
+    if count_tokens(context) <= budget:
+        return context
+    PROMPT_TRUNCATIONS.labels("memory_context").inc()
+    lines = context.splitlines()
+    bullets = [i for i, line in enumerate(lines) if line.lstrip().startswith("- ")]
+    fixed = sum(count_tokens(line) + 1 for line in lines) - sum(count_tokens(lines[i]) + 1 for i in bullets)
+    kept = _select([lines[i] for i in bullets], budget - fixed, query, prefer_recent=True)
+    dropped = {line_index for position, line_index in enumerate(bullets) if position not in kept}
+    fitted = "\n".join(line for i, line in enumerate(lines) if i not in dropped)
+    return truncate_to_tokens(fitted, budget)
+
+
+@lru_cache(maxsize=None)
+def static_instructions(persona: str) -> str:
+    """
+    The orchestrator's system prompt for a persona: persona text plus tool instructions.
+    Built once per process and never varies between turns or sessions.
+    """
+    agent_config = get_config()["orchestrator_agent"]
+    return agent_config[persona].rstrip() + "\n\n" + agent_config["tool_instructions"].rstrip()
+
+
+def build_turn_input(
+    user_input: str,
+    memory_context: Optional[str],
+    persona: str = "instructions",
+    budget: int = MEMORY_CONTEXT_TOKEN_BUDGET,
+) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Assemble the dynamic part of a turn's prompt and record its token counts.
+
+    Args:
+        user_input: The user's message.
+        memory_context: The session's memory context, if any.
+        persona: Persona whose static prefix the turn is sent with.
+        budget: Token budget of the memory context.
+
+    Returns:
+        The Runner input items (memory context message, then the user's
+        message) and the token counts per prompt part.
+    """
+    items: List[Dict[str, str]] = []
+    tokens = {"instructions": count_tokens(static_instructions(persona))}
+    if memory_context:
+        context = fit_context(memory_context, budget, query=user_input)
+        items.append({"role": "developer", "content": f"Memory Context:\n{context}"})
+        tokens["memory_context"] = count_tokens(context)
+    items.append({"role": "user", "content": user_input})
+    tokens["user_input"] = count_tokens(user_input)
+    for part, count in tokens.items():
+        PROMPT_TOKENS.labels(part).observe(count)
+    return items, tokens
@@ -0,0 +1,170 @@
+"""
+Fast-path intent router.
+
+Short, closed requests such as "is 0xabc... a scam?" or "show my health
+factor" need exactly one deterministic tool call, so they are answered here
+from a template instead of a full orchestrator run. Everything else, and any
+request the router is unsure about, goes to the agent as before.
+"""
+import asyncio
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .metrics import ROUTED_TURNS
+from .utils import get_config
+
+load_dotenv()
+
+INTENT_ROUTER = os.environ.get("INTENT_ROUTER", "true").lower() == "true"
+# Longer messages are treated as open-ended whatever their keywords
+ROUTER_MAX_WORDS = int(os.environ.get("ROUTER_MAX_WORDS", 16))
+
+ADDRESS_PATTERN = re.compile(r"\b0x[0-9a-fA-F]{40}\b")
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+# Keyword weights of the two intents; a message needs INTENT_THRESHOLD to be routed
+SCAM_CUES = {
+    "scam": 3.0, "scammer": 3.0, "scams": 3.0, "fraud": 3.0, "fraudulent": 3.0, "phishing": 3.0,
+    "malicious": 3.0, "blacklisted": 3.0, "flagged": 2.0, "legit": 2.0, "legitimate": 2.0,
+    "safe": 1.5, "suspicious": 2.0, "check": 0.5, "address": 0.5,
+}
+HEALTH_CUES = {
+    "health": 2.0, "factor": 1.0, "hf": 2.5, "collateral": 2.0, "debt": 2.0, "aave": 1.0,
+    "position": 1.0, "liquidation": 1.0, "my": 0.5, "show": 0.5, "check": 0.5,
+}
+# Words that make a request open-ended: advice, explanations, hypotheticals, comparisons
+OPEN_ENDED_CUES = {
+    "why", "should", "explain", "recommend", "advice", "advise", "strategy", "compare", "predict",
+    "if", "would", "could", "best", "improve", "increase", "reduce", "avoid", "history", "trend",
+    "also", "then", "send", "swap", "borrow", "repay", "withdraw", "deposit",
+    "mean", "means", "meaning", "define", "definition", "calculate", "calculated", "computed", "report",
+}
+# "how do/is/..." asks how something works or how to do it ("how much"/"how many" stay closed)
+HOW_TO_CUES = {"do", "does", "did", "to", "can", "is", "are", "should", "would", "works"}
+# "what is/are/does ..." is a definition unless it asks about the user's own position
+DEFINITION_CUES = {("what", "is"), ("what", "are"), ("what", "does"), ("what's",)}
+# Health questions must be about the user's own position
+FIRST_PERSON = {"my", "i", "me", "mine", "i'm", "i've"}
+INTENT_THRESHOLD = 2.5
+
+
+@dataclass
+class Intent:
+    """
+    A request the router can answer itself.
+
+    Attributes:
+        name: "scam_check" or "health".
+        addresses: Addresses mentioned in the request.
+    """
+    name: str
+    addresses: List[str] = field(default_factory=list)
+
+
+def _score(words: List[str], cues: Dict[str, float]) -> float:
+    return sum(cues.get(word, 0.0) for word in words)
+
+
+def _is_open_ended(words: List[str]) -> bool:
+    if any(word in OPEN_ENDED_CUES for word in words):
+        return True
+    for i, word in enumerate(words):
+        following = words[i + 1:]
+        if word == "how" and following and following[0] in HOW_TO_CUES:
+            return True
+        for cue in DEFINITION_CUES:
+            if tuple(words[i:i + len(cue)]) == cue:
+                subject = words[i + len(cue):i + len(cue) + 1]
+                if not subject or subject[0] not in FIRST_PERSON:
+                    return True
+    return False
+
+
+def classify(text: str) -> Optional[Intent]:
+    """
+    Classify a chat message as a fast-path intent, or None for the full agent.
+    """
+    addresses = list(dict.fromkeys(ADDRESS_PATTERN.findall(text)))
+    words = WORD_PATTERN.findall(ADDRESS_PATTERN.sub(" ", text).lower())
+    if len(words) > ROUTER_MAX_WORDS or _is_open_ended(words):
+        return None
+
+    scam, health = _score(words, SCAM_CUES), _score(words, HEALTH_CUES)
+    if addresses and scam >= INTENT_THRESHOLD and scam > health:
+        return Intent("scam_check", addresses)
+    # Health questions are about the user's own wallet; other wallets go to the agent
+    first_person = any(word in FIRST_PERSON for word in words)
+    if not addresses and first_person and health >= INTENT_THRESHOLD and health > scam:
+        return Intent("health")
+    return None
+
+
+def _templates(medieval_mode: bool) -> Dict[str, str]:
+    persona = "medieval_instructions" if medieval_mode else "instructions"
+    return get_config()["router"]["templates"][persona]
+
+
+def _money(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+async def _scam_reply(intent: Intent, templates: Dict[str, str]) -> str:
+    from tools.scam_index import get_scam_index
+
+    index = await asyncio.to_thread(get_scam_index)
+    verdicts = index.screen(intent.addresses)
+    keys = {True: "scam", False: "clean", None: "invalid"}
+    return "\n".join(
+        templates[keys[verdict]].format(address=address) for address, verdict in zip(intent.addresses, verdicts)
+    )
+
+
+async def _health_reply(templates: Dict[str, str]) -> Optional[str]:
+    if not os.environ.get("WALLET_ADDRESS"):
+        return None
+    from tools.aave import account_summary
+
+    summary = await account_summary()
+    # Without debt Aave reports uint256 max, which is not a useful number to show
+    health_factor = f"{summary['health_factor']:.2f}" if summary["debt_usd"] else "∞ (no debt)"
+    return templates["health"].format(
+        health_factor=health_factor,
+        collateral_usd=_money(summary["collateral_usd"]),
+        debt_usd=_money(summary["debt_usd"]),
+        available_borrow_usd=_money(summary["available_borrow_usd"]),
+    )
+
+
+async def route(text: str, medieval_mode: bool = False) -> Optional[str]:
+    """
+    Answer a chat message on the fast path if it is a routable intent.
+
+    Args:
+        text: The user's message.
+        medieval_mode: Use the medieval persona's templates.
+
+    Returns:
+        The reply, or None if the message should go to the orchestrator,
+        including when the tool call fails.
+    """
+    if not INTENT_ROUTER:
+        return None
+    intent = classify(text)
+    if intent is None:
+        return None
+    templates = _templates(medieval_mode)
+    try:
+        if intent.name == "scam_check":
+            reply = await _scam_reply(intent, templates)
+        else:
+            reply = await _health_reply(templates)
+    except Exception as e:
+        print(f"Fast path for {intent.name} failed, using the agent: {e}")
+        return None
+    if reply is not None:
+        ROUTED_TURNS.labels(intent.name).inc()
+    return reply
@@ -1,4 +1,5 @@
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Union
 
@@ -12,4 +13,13 @@ def load_yaml(path: Union[str, Path]) -> Dict[str, Any]:
         raise FileNotFoundError(f"YAML file not found: {file_path}")
     with file_path.open('r', encoding='utf-8') as f:
         data = yaml.safe_load(f)
-    return data if isinstance(data, dict) else {}
\ No newline at end of file
+    return data if isinstance(data, dict) else {}
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.yaml"
+
+@lru_cache(maxsize=None)
+def get_config(path: Union[str, Path] = CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Return the parsed application config. The file is read once per process.
+    """
+    return load_yaml(path)
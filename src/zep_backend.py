@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+import httpx
+
+from zep_cloud.client import AsyncZep
+from zep_cloud.types import Message as ZepMessage
+from zep_cloud import NotFoundError
+
+from .memory_backends import MemoryBackend
+
+
+class ZepMemoryBackend(MemoryBackend):
+    """
+    Memory backend using Zep Cloud through AsyncZep.
+    """
+
+    def __init__(self, api_key: str):
+        # Own the HTTP client so close() can release its connections
+        self._http = httpx.AsyncClient(timeout=httpx.Timeout(30.0))
+        self.client = AsyncZep(api_key=api_key, httpx_client=self._http)
+
+    async def ensure_user(self, user_id, email=None, first_name=None, last_name=None) -> None:
+        try:
+            # Try to get the user first
+            await self.client.user.get(user_id)
+            print(f"Using existing user: {user_id}")
+
+        except NotFoundError:
+            await self.client.user.add(
+                user_id=user_id,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+            )
+            print(f"Created new user with ID: {user_id}")
+
+    async def create_session(self, session_id: str, user_id: str) -> None:
+        await self.client.memory.add_session(
+            session_id=session_id,
+            user_id=user_id,
+        )
+
+    async def add_messages(self, session_id, messages, ignore_roles=None) -> None:
+        await self.client.memory.add(
+            session_id=session_id,
+            messages=[ZepMessage(**message) for message in messages],
+            ignore_roles=ignore_roles,
+        )
+
+    async def get_context(self, session_id: str) -> Optional[str]:
+        try:
+            memory = await self.client.memory.get(session_id=session_id)
+        except NotFoundError:
+            print("Session not found.")
+            raise
+        return memory.context
+
+    async def search(self, user_id: str, query: str, limit: int = 5) -> List[str]:
+        try:
+            # Use graph.search to find relevant edges. Facts reside on graph edges
+            search_response = await self.client.graph.search(
+                query=query, user_id=user_id, scope="edges", limit=limit
+            )
+        except NotFoundError:
+            print("User not found.")
+            raise
+        if not search_response or not search_response.edges:
+            return []
+        return [edge.fact for edge in search_response.edges[:limit]]
+
+    async def close(self) -> None:
+        await self._http.aclose()
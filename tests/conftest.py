@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# Tests run from a clean checkout without a .env file
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+# Token counts are estimated; the tokenizer would need a network download
+os.environ["PROMPT_TOKENIZER"] = "estimate"
@@ -0,0 +1,64 @@
+import asyncio
+
+from benchmarks.fakes import FakeBaseNode
+from tools.cache import AsyncTTLCache
+from tools.rpc import close_web3
+
+POOL_ADDRESS = "0xA238Dd80C259a72e81d7e4664a9801593F98d1c5"
+TOKENS = {
+    "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+    "WETH": "0x4200000000000000000000000000000000000006",
+}
+WALLET = "0x" + "11" * 20
+
+
+def test_cached_snapshot_costs_one_round_trip_and_is_reused(monkeypatch):
+    from tools.aave import fetch_cached_account_snapshot
+
+    node = FakeBaseNode(block_number=1_234)
+    monkeypatch.setattr("tools.aave._snapshot_cache", AsyncTTLCache(ttl=30))
+
+    async def scenario():
+        monkeypatch.setenv("BASE_RPC_URL", await node.start())
+        monkeypatch.setenv("POOL_ADDRESS", POOL_ADDRESS)
+        try:
+            first = await fetch_cached_account_snapshot(WALLET, TOKENS)
+            # Later blocks don't invalidate the entry; AAVE_CACHE_TTL does
+            node.block_number += 5
+            second = await fetch_cached_account_snapshot(WALLET.upper().replace("0X", "0x"), TOKENS)
+            return first, second
+        finally:
+            await close_web3()
+            await node.stop()
+
+    first, second = asyncio.run(scenario())
+
+    assert first["block_number"] == 1_234 and second is first
+    assert node.requests.get("eth_call") == 1 and "eth_blockNumber" not in node.requests
+
+
+def test_account_snapshot_skips_tokens_whose_calls_fail(monkeypatch):
+    from tools.aave import fetch_account_snapshot
+
+    tokens = dict(TOKENS, cbBTC="0xcbB7C0000aB88B473b1f5aFd9ef808440eed33Bf")
+    node = FakeBaseNode(balance=2_500_000)
+    node.failing.add(tokens["WETH"].lower())
+    monkeypatch.setattr("tools.aave._decimals_cache", {})
+
+    async def scenario():
+        monkeypatch.setenv("BASE_RPC_URL", await node.start())
+        monkeypatch.setenv("POOL_ADDRESS", POOL_ADDRESS)
+        try:
+            first = await fetch_account_snapshot(WALLET, tokens)
+            # Decimals are cached now except WETH's, so the batch layout differs
+            second = await fetch_account_snapshot(WALLET, tokens)
+            return first, second
+        finally:
+            await close_web3()
+            await node.stop()
+
+    first, second = asyncio.run(scenario())
+
+    assert first["account_data"] == tuple(node.account_data)
+    assert first["assets"] == [{"symbol": "USDC", "balance": 2.5}, {"symbol": "cbBTC", "balance": 2.5}]
+    assert second == first
@@ -0,0 +1,60 @@
+import asyncio
+
+from eth_abi import encode
+
+from benchmarks.fakes import FakeBaseNode
+from tools.rpc import close_web3
+
+POOL_ADDRESS = "0xA238Dd80C259a72e81d7e4664a9801593F98d1c5"
+USDC = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
+WALLET = "0x00000000000000000000000000000000000000a1"
+OTHER = "0x00000000000000000000000000000000000000b2"
+
+
+def test_indexer_stores_wallet_events_once_and_snapshots_accounts(monkeypatch):
+    from tools.aave_indexer import POOL_EVENTS, AaveEventIndexer, AaveEventStore, _topic, wallet_topic
+
+    topics = {name: _topic(signature) for name, (signature, *_) in POOL_EVENTS.items()}
+    # One log per eth_getLogs response forces the indexer to split its block ranges
+    node = FakeBaseNode(block_number=1_000, decimals=6, max_logs=1)
+    node.add_log(POOL_ADDRESS, [topics["Supply"], wallet_topic(USDC), wallet_topic(WALLET), "0x" + "0" * 64],
+                 encode(["address", "uint256"], [WALLET, 250 * 10**6]), block_number=900)
+    node.add_log(POOL_ADDRESS, [topics["Borrow"], wallet_topic(USDC), wallet_topic(WALLET), "0x" + "0" * 64],
+                 encode(["address", "uint256", "uint8", "uint256"], [WALLET, 100 * 10**6, 2, 10**25]),
+                 block_number=950)
+    node.add_log(POOL_ADDRESS, [topics["LiquidationCall"], wallet_topic(USDC), wallet_topic(USDC), wallet_topic(WALLET)],
+                 encode(["uint256", "uint256", "address", "bool"], [10**6, 2 * 10**6, OTHER, False]),
+                 block_number=990)
+    # Another wallet's event and an event past the confirmation depth are not indexed
+    node.add_log(POOL_ADDRESS, [topics["Supply"], wallet_topic(USDC), wallet_topic(OTHER), "0x" + "0" * 64],
+                 encode(["address", "uint256"], [OTHER, 10**6]), block_number=920)
+    node.add_log(POOL_ADDRESS, [topics["Repay"], wallet_topic(USDC), wallet_topic(WALLET), wallet_topic(WALLET)],
+                 encode(["uint256", "bool"], [10**6, False]), block_number=999)
+
+    store = AaveEventStore(":memory:")
+
+    async def scenario():
+        monkeypatch.setenv("BASE_RPC_URL", await node.start())
+        monkeypatch.setenv("POOL_ADDRESS", POOL_ADDRESS)
+        try:
+            indexer = AaveEventIndexer(store, [WALLET], block_range=200, confirmations=5, lookback=500)
+            first = await indexer.sync_once()
+            second = await indexer.sync_once()
+            node.block_number = 1_010
+            third = await indexer.sync_once()
+            return first, second, third, await store.checkpoints([WALLET]), await store.history(WALLET)
+        finally:
+            await close_web3()
+            await node.stop()
+
+    first, second, third, checkpoints, history = asyncio.run(scenario())
+
+    assert (first, second, third) == (3, 0, 1)
+    assert checkpoints == {WALLET.lower(): 1_005}
+    events = history["events"]
+    assert [event["event"] for event in events] == ["Repay", "LiquidationCall", "Borrow", "Supply"]
+    assert events[2]["amount"] == 100.0
+    assert events[2]["details"]["interestRateMode"] == "2"
+    assert events[1]["details"]["liquidator"].lower() == OTHER
+    assert [snapshot["block_number"] for snapshot in history["snapshots"]] == [1_005, 995]
+    assert history["snapshots"][0]["health_factor"] == 3.0
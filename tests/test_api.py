@@ -0,0 +1,168 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.agent as agent_module
+from src.memory_backends import LocalMemoryBackend
+
+
+class FakeStreamResult:
+    final_output = "Your health factor is 2.0"
+
+    async def stream_events(self):
+        yield SimpleNamespace(
+            type="run_item_stream_event",
+            name="tool_called",
+            item=SimpleNamespace(raw_item=SimpleNamespace(name="fetch_aave_info", call_id="c1")),
+        )
+        yield SimpleNamespace(
+            type="run_item_stream_event", name="tool_output", item=SimpleNamespace(raw_item={"call_id": "c1"})
+        )
+        for text in ("Your health ", "factor is 2.0"):
+            yield SimpleNamespace(
+                type="raw_response_event", data=SimpleNamespace(type="response.output_text.delta", delta=text)
+            )
+
+
+@pytest.fixture
+def client(monkeypatch):
+    backend = LocalMemoryBackend()
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: backend)
+    from src.api.app import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n")
+        events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_chat_stream_sends_tool_progress_and_deltas(client, monkeypatch):
+    monkeypatch.setattr(agent_module.agents_sdk().Runner, "run_streamed", lambda agent, user_input, **kwargs: FakeStreamResult())
+    assert client.post("/create-session/stream-1", json={"user_id": "u-stream"}).status_code == 200
+
+    response = client.post("/api/chat/stream", json={"session_id": "stream-1", "user_input": "health factor?"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_sse(response.text) == [
+        ("tool_call", {"name": "fetch_aave_info", "call_id": "c1"}),
+        ("tool_output", {"call_id": "c1"}),
+        ("delta", {"text": "Your health "}),
+        ("delta", {"text": "factor is 2.0"}),
+        ("done", {"response": "Your health factor is 2.0"}),
+    ]
+
+
+def test_chat_stream_honours_demo_mode(client, monkeypatch):
+    monkeypatch.setattr(agent_module.agents_sdk().Runner, "run_streamed", lambda *args, **kwargs: 1 / 0)
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    client.post("/create-session/demo-1", json={"user_id": "u-demo"})
+
+    response = client.post("/api/chat/stream", json={"session_id": "demo-1", "user_input": "hi"})
+
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["delta", "done"]
+    assert events[-1][1]["status"] == "warning"
+    assert events[-1][1]["response"] == client.post(
+        "/api/chat", json={"session_id": "demo-1", "user_input": "hi"}
+    ).json()["response"]
+
+
+def test_chat_stream_unknown_session(client):
+    response = client.post("/api/chat/stream", json={"session_id": "missing", "user_input": "hi"})
+    assert response.status_code == 404
+
+
+def test_chat_returns_429_when_overloaded(client, monkeypatch):
+    from src.api.scheduler import SchedulerOverloaded, scheduler
+
+    async def overloaded(session_id):
+        raise SchedulerOverloaded(retry_after=3)
+
+    monkeypatch.setattr(scheduler, "acquire", overloaded)
+    client.post("/create-session/busy", json={"user_id": "u-busy"})
+
+    response = client.post("/api/chat", json={"session_id": "busy", "user_input": "hi"})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert "scheduler" in client.get("/api/stats").json()
+
+
+def test_stats_reports_the_aave_snapshot_cache(client):
+    import tools.aave  # noqa: F401
+
+    assert set(client.get("/api/stats").json()["aave_cache"]) >= {"hits", "misses"}
+
+
+def test_metrics_expose_turn_phases(client, monkeypatch):
+    monkeypatch.setattr(agent_module.agents_sdk().Runner, "run_streamed", lambda agent, user_input, **kwargs: FakeStreamResult())
+    client.post("/create-session/metrics-1", json={"user_id": "u-metrics"})
+    client.post("/api/chat/stream", json={"session_id": "metrics-1", "user_input": "health factor?"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    for phase in ("user_message", "context_fetch", "runner", "first_delta", "assistant_message", "turn"):
+        assert f'chat_phase_seconds_count{{phase="{phase}"}}' in response.text
+
+
+def test_scam_screen_streams_one_verdict_per_address(client, monkeypatch, tmp_path):
+    from tools.scam_index import ScamIndex, build_records
+
+    scam = "0x" + "ab" * 20
+    snapshot = tmp_path / "index.bin"
+    snapshot.write_bytes(build_records([scam]))
+    monkeypatch.setattr("tools.scam_index._index", ScamIndex(snapshot_path=snapshot))
+    monkeypatch.setattr("tools.scam_limits.SCAM_SCREEN_CHUNK_SIZE", 2)
+
+    addresses = [scam, "0x" + "cd" * 20, "nope"]
+    response = client.post("/api/scam/screen", json={"addresses": addresses})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"address": addresses[0], "is_scam": True},
+        {"address": addresses[1], "is_scam": False},
+        {"address": addresses[2], "is_scam": None},
+    ]
+    assert client.get("/api/stats").json()["scam_index"]["addresses"] == 1
+
+
+def test_scam_screen_rejects_too_many_addresses(client):
+    from tools.scam_limits import SCAM_SCREEN_MAX_ADDRESSES
+
+    response = client.post("/api/scam/screen", json={"addresses": ["0x"] * (SCAM_SCREEN_MAX_ADDRESSES + 1)})
+    assert response.status_code == 422
+
+
+def test_chat_stream_releases_its_slot_when_the_body_never_starts(client):
+    import asyncio
+
+    from src.api.models import ChatRequest
+    from src.api.routes import chat_stream
+    from src.api.scheduler import scheduler
+
+    client.post("/create-session/gone", json={"user_id": "u-gone"})
+
+    async def disconnect_before_streaming():
+        response = await chat_stream(ChatRequest(session_id="gone", user_input="hi"))
+        # The server runs the background task even if the generator never starts
+        await response.background()
+        await response.background()
+        running = scheduler.running
+        # The session lock is free again: the next turn is admitted immediately
+        started_at = await asyncio.wait_for(scheduler.acquire("gone"), timeout=1)
+        scheduler.release("gone", started_at)
+        return running
+
+    assert asyncio.run(disconnect_before_streaming()) == 0
+    assert scheduler.running == 0
@@ -0,0 +1,44 @@
+import asyncio
+
+from benchmarks.load import fake_app, run_load
+
+
+def test_load_harness_runs_offline():
+    async def scenario():
+        async with fake_app() as fakes:
+            report = await run_load(fakes["client"], users=4, turns=3, concurrency=2)
+            return report, dict(fakes["node"].requests)
+
+    report, rpc_requests = asyncio.run(scenario())
+
+    assert report["errors"] == {}
+    assert report["latency_ms"]["create_session"]["count"] == 4
+    assert report["latency_ms"]["chat"]["count"] == 12
+    # The Aave prompt went through the fake node via Multicall3
+    assert rpc_requests["eth_call"] >= 1
+
+
+def test_replay_keeps_log_timing_and_writes_results(tmp_path):
+    from benchmarks.replay import load_records, replay, write_results
+
+    log = tmp_path / "traffic.jsonl"
+    log.write_text(
+        '{"request_id": "a", "session_id": "s1", "ts": 100.0, "user_input": "What is my Aave health factor?"}\n'
+        '{"request_id": "b", "session_id": "s1", "ts": 100.5, "user_input": "thanks"}\n'
+        '{"request_id": "c", "body": "hello", "ts": 101.0}\n'
+    )
+    records = load_records(log, speed=10)
+    assert [r["offset"] for r in records] == [0.0, 0.05, 0.1]
+    assert records[2]["session_id"] == "c"
+
+    async def scenario():
+        async with fake_app() as fakes:
+            return await replay(fakes["client"], records, concurrency=4)
+
+    results = asyncio.run(scenario())
+    assert [r["status"] for r in results] == [200, 200, 200]
+    assert len({r["session_id"] for r in results}) == 2
+
+    write_results(tmp_path / "out.csv", results)
+    lines = (tmp_path / "out.csv").read_text().splitlines()
+    assert lines[0].startswith("index,request_id,session_id") and len(lines) == 4
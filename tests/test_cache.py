@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from tools.cache import AsyncTTLCache
+
+
+def test_single_flight_and_stats():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "snapshot"
+
+    async def main():
+        cache = AsyncTTLCache(maxsize=2, ttl=60)
+        results = await asyncio.gather(*(cache.get_or_fetch(("0xabc", 1), fetch) for _ in range(5)))
+        return cache, results
+
+    cache, results = asyncio.run(main())
+    assert results == ["snapshot"] * 5
+    assert calls == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 4
+
+
+def test_lru_eviction_and_ttl():
+    cache = AsyncTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+    cache.set("expired", 4, ttl=-1)
+    assert cache.get("expired") == (False, None)
+
+
+def test_failed_fetch_is_not_cached():
+    async def boom():
+        raise RuntimeError("rpc down")
+
+    async def main():
+        cache = AsyncTTLCache()
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", boom)
+        return len(cache)
+
+    assert asyncio.run(main()) == 0
+
+
+def test_cancelling_the_first_caller_does_not_cancel_other_waiters():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "snapshot"
+
+    async def main():
+        cache = AsyncTTLCache(maxsize=2, ttl=60)
+        first = asyncio.create_task(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_fetch("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return cache, results
+
+    cache, results = asyncio.run(main())
+    assert results == ["snapshot"] * 3
+    assert calls == 1
+    assert cache.get("key") == (True, "snapshot")
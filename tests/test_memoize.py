@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from agents import function_tool
+from agents.tool_context import ToolContext
+
+from tools.cache import AsyncTTLCache
+from tools.memoize import TOOL_ERROR_MESSAGE, ToolCachePolicy, memoize_tool
+
+
+def make_tool(calls, fail_first=False):
+    @function_tool
+    async def lookup(address: str) -> str:
+        """Look up an address."""
+        calls.append(address)
+        await asyncio.sleep(0.01)
+        if fail_first and len(calls) == 1:
+            raise RuntimeError("node down")
+        return f"checked {address}"
+
+    return lookup
+
+
+def invoke(tool, context, address):
+    arguments = json.dumps({"address": address})
+    ctx = ToolContext(context=context, tool_name=tool.name, tool_call_id="call", tool_arguments=arguments)
+    return tool.on_invoke_tool(ctx, arguments)
+
+
+def run_context(run_id, session_id="s1"):
+    return SimpleNamespace(run_id=run_id, memory_manager=SimpleNamespace(session_id=session_id))
+
+
+def test_identical_calls_in_a_run_are_collapsed():
+    calls = []
+    tool = memoize_tool(make_tool(calls), ToolCachePolicy(ttl=60), cache=AsyncTTLCache())
+    context = run_context("run-1")
+
+    async def scenario():
+        first = await asyncio.gather(invoke(tool, context, "0xABC"), invoke(tool, context, " 0xabc "))
+        later = await invoke(tool, context, "0xabc")
+        other_run = await invoke(tool, run_context("run-2"), "0xabc")
+        return first, later, other_run
+
+    first, later, other_run = asyncio.run(scenario())
+
+    assert first == ["checked 0xABC", "checked 0xABC"]
+    assert later == "checked 0xABC"
+    assert other_run == "checked 0xabc"
+    assert calls == ["0xABC", "0xabc"]
+
+
+def test_session_scope_spans_runs_and_failures_are_not_cached():
+    calls = []
+    tool = memoize_tool(make_tool(calls, fail_first=True), ToolCachePolicy(ttl=60, scope="session"), cache=AsyncTTLCache())
+
+    async def scenario():
+        failed = await invoke(tool, run_context("run-1"), "0xabc")
+        ok = await invoke(tool, run_context("run-2"), "0xabc")
+        cached = await invoke(tool, run_context("run-3"), "0xabc")
+        return failed, ok, cached
+
+    failed, ok, cached = asyncio.run(scenario())
+
+    assert failed == TOOL_ERROR_MESSAGE
+    assert ok == cached == "checked 0xabc"
+    assert len(calls) == 2
+
+
+def test_registry_exports_never_shadow_submodules():
+    import importlib
+
+    import tools
+    from agents import FunctionTool
+
+    for name, module in tools._REGISTRY.items():
+        assert module.lstrip(".") != name
+        importlib.import_module(f"tools{module}")
+        assert isinstance(getattr(tools, name), FunctionTool)
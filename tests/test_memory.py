@@ -0,0 +1,216 @@
+import asyncio
+
+import pytest
+
+import src.memory as memory
+from src.memory import AsyncZepMemoryManager
+from src.memory_backends import LocalMemoryBackend, MemoryBackend
+
+
+class FakeBackend(MemoryBackend):
+    def __init__(self, contexts=()):
+        self.calls = []
+        self.contexts = iter(contexts)
+        self.closed = False
+
+    async def ensure_user(self, user_id, email=None, first_name=None, last_name=None):
+        pass
+
+    async def create_session(self, session_id, user_id):
+        pass
+
+    async def add_messages(self, session_id, messages, ignore_roles=None):
+        self.calls.append((session_id, [m["content"] for m in messages]))
+
+    async def get_context(self, session_id):
+        return next(self.contexts)
+
+    async def search(self, user_id, query, limit=5):
+        return []
+
+    async def close(self):
+        self.closed = True
+
+
+def make_manager(backend=None):
+    return AsyncZepMemoryManager(
+        session_id="s1", user_id="u1", first_name="Ada", backend=backend or FakeBackend()
+    )
+
+
+def test_messages_are_batched_and_flushed_on_close(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 60)
+
+    async def main():
+        manager = make_manager()
+        await manager.add_message({"role": "user", "content": "hi"})
+        await manager.add_message({"role": "assistant", "content": "hello"})
+        assert manager.backend.calls == []
+        await memory.flush_all_memory()
+        return manager.backend
+
+    backend = asyncio.run(main())
+    assert backend.calls == [("s1", ["hi", "hello"])]
+    assert backend.closed
+
+
+def test_size_threshold_triggers_flush(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_SIZE", 2)
+
+    async def main():
+        manager = make_manager()
+        for content in ("a", "b", "c"):
+            await manager.add_message({"role": "user", "content": content})
+        await asyncio.sleep(0.01)
+        return manager.backend.calls
+
+    # Everything pending when the size-triggered flush runs goes out in one call
+    assert asyncio.run(main()) == [("s1", ["a", "b", "c"])]
+
+
+def test_size_triggered_flush_is_tracked_and_awaited_on_close(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_SIZE", 2)
+
+    async def main():
+        manager = make_manager()
+        for content in ("a", "b"):
+            await manager.add_message({"role": "user", "content": content})
+        tracked = len(manager._size_flushes)
+        await manager.close()
+        return tracked, len(manager._size_flushes), manager.backend.calls
+
+    assert asyncio.run(main()) == (1, 0, [("s1", ["a", "b"])])
+
+
+def test_close_during_a_timed_flush_keeps_the_batch(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 0)
+
+    class SlowBackend(FakeBackend):
+        async def add_messages(self, session_id, messages, ignore_roles=None):
+            await asyncio.sleep(0.05)
+            await super().add_messages(session_id, messages, ignore_roles)
+
+    async def main():
+        manager = make_manager(SlowBackend())
+        await manager.add_message({"role": "user", "content": "a"})
+        await asyncio.sleep(0.01)
+        await manager.close()
+        return manager.backend.calls, manager._pending
+
+    assert asyncio.run(main()) == ([("s1", ["a"])], [])
+
+
+def test_cancelled_flush_keeps_the_batch(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 60)
+
+    class HangingBackend(FakeBackend):
+        async def add_messages(self, session_id, messages, ignore_roles=None):
+            await asyncio.sleep(10)
+
+    async def main():
+        manager = make_manager(HangingBackend())
+        await manager.add_message({"role": "user", "content": "a"})
+        flush = asyncio.create_task(manager.flush())
+        await asyncio.sleep(0.01)
+        flush.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+        manager._flush_timer.cancel()
+        return [m["content"] for m in manager._pending]
+
+    assert asyncio.run(main()) == ["a"]
+
+
+def test_context_is_cached_and_refreshed_after_writes(monkeypatch):
+    monkeypatch.setattr(memory, "MEMORY_FLUSH_INTERVAL", 60)
+
+    async def main():
+        manager = make_manager(FakeBackend(contexts=["facts v1", "facts v2"]))
+        first = await manager.get_context()
+        cached = await manager.get_context()
+        await manager.add_message({"role": "user", "content": "I hold WETH"})
+        await manager.flush()
+        await manager._context_refresh
+        return first, cached, await manager.get_context()
+
+    assert asyncio.run(main()) == ("facts v1", "facts v1", "facts v2")
+
+
+def test_local_backend_round_trip():
+    async def main():
+        manager = make_manager(LocalMemoryBackend())
+        await manager.initialize()
+        assert await manager.get_memory() == "No conversation history yet."
+        await manager.add_message({"role": "user", "content": "My wallet holds mostly WETH"})
+        await manager.add_message({"role": "assistant", "content": "Noted!"})
+        await manager.flush()
+        context = await manager.get_memory()
+        facts = await manager.search_memory("which tokens are in my wallet?")
+        return context, facts
+
+    context, facts = asyncio.run(main())
+    assert context == "- user: My wallet holds mostly WETH\n- assistant: Noted!"
+    assert facts == [{"role": "assistant", "content": "My wallet holds mostly WETH"}]
+
+
+def test_local_backend_keeps_ignored_roles_out_of_search_only():
+    async def main():
+        backend = LocalMemoryBackend()
+        await backend.ensure_user("u1")
+        await backend.create_session("s1", "u1")
+        await backend.add_messages(
+            "s1",
+            [{"role": "Ada", "role_type": "user", "content": "hi"},
+             {"role": "assistant", "role_type": "assistant", "content": "hello Ada"}],
+            ignore_roles=["assistant"],
+        )
+        await backend.add_messages(
+            "s1", [{"role": "Ada", "role_type": "user", "content": "my vault uses WETH"}], ignore_roles=["user"]
+        )
+        return await backend.get_context("s1"), await backend.search("u1", "hi vault WETH")
+
+    context, facts = asyncio.run(main())
+    assert context == "- user: hi\n- assistant: hello Ada\n- user: my vault uses WETH"
+    assert facts == ["hi"]
+
+
+def test_initialize_overlaps_user_and_session_creation(monkeypatch):
+    monkeypatch.setattr(memory, "_known_users", set())
+
+    class StrictBackend(FakeBackend):
+        def __init__(self):
+            super().__init__()
+            self.users, self.sessions, self.log = set(), [], []
+
+        async def ensure_user(self, user_id, **kwargs):
+            self.log.append("ensure_user")
+            await asyncio.sleep(0.01)
+            self.users.add(user_id)
+
+        async def create_session(self, session_id, user_id):
+            self.log.append("create_session")
+            if user_id not in self.users:
+                raise LookupError("user does not exist yet")
+            self.sessions.append(session_id)
+
+    async def main():
+        backend = StrictBackend()
+        await make_manager(backend).initialize()
+        await make_manager(backend).initialize()
+        return backend
+
+    backend = asyncio.run(main())
+    # New user: lookup and session run together, session retried; known user: session only
+    assert backend.log == ["ensure_user", "create_session", "create_session", "create_session"]
+    assert len(backend.sessions) == 2
+
+
+def test_memory_backend_requires_the_whole_interface():
+    class Partial(MemoryBackend):
+        async def get_context(self, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
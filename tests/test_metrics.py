@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from src.metrics import TOOL_CALLS, instrument_tool
+
+
+def calls(tool, outcome):
+    return TOOL_CALLS.labels(tool, outcome)._value.get()
+
+
+def test_instrument_tool_counts_outcomes():
+    @instrument_tool
+    async def flaky_tool(fail: bool) -> str:
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    asyncio.run(flaky_tool(False))
+    with pytest.raises(ValueError):
+        asyncio.run(flaky_tool(True))
+
+    assert calls("flaky_tool", "ok") == 1
+    assert calls("flaky_tool", "error") == 1
+
+
+def test_instrumented_tool_keeps_function_tool_schema():
+    from agents import function_tool
+
+    @function_tool
+    @instrument_tool
+    def lookup(address: str) -> bool:
+        """Look up an address."""
+        return address.startswith("0x")
+
+    assert lookup.name == "lookup"
+    assert lookup.description == "Look up an address."
+    assert list(lookup.params_json_schema["properties"]) == ["address"]
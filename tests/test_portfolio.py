@@ -0,0 +1,45 @@
+import asyncio
+import math
+
+from benchmarks.fakes import FakeBaseNode
+from tools.rpc import close_web3
+
+POOL_ADDRESS = "0xA238Dd80C259a72e81d7e4664a9801593F98d1c5"
+TOKENS = {
+    "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+    "WETH": "0x4200000000000000000000000000000000000006",
+}
+
+
+def test_scan_portfolio_batches_wallets_into_few_round_trips(monkeypatch):
+    from tools.portfolio import portfolio_totals, scan_portfolio
+
+    wallets = [f"0x{i:040x}" for i in range(1, 121)]
+    node = FakeBaseNode(account_data=[2 * 10**10, 10**10, 0, 8000, 7500, 16 * 10**17], balance=3 * 10**6)
+    # No debt: Aave reports uint256 max as the health factor
+    node.accounts[wallets[0]] = [10**10, 0, 5 * 10**9, 8000, 7500, 2**256 - 1]
+
+    async def scenario():
+        monkeypatch.setenv("BASE_RPC_URL", await node.start())
+        monkeypatch.setenv("POOL_ADDRESS", POOL_ADDRESS)
+        try:
+            return await scan_portfolio(wallets + wallets[:5], TOKENS, calls_per_batch=200, max_concurrency=2)
+        finally:
+            await close_web3()
+            await node.stop()
+
+    frame = asyncio.run(scenario())
+
+    assert len(frame) == 120
+    assert list(frame.columns[-2:]) == ["USDC", "WETH"]
+    assert frame["collateral_usd"].iloc[1] == 200.0
+    assert frame["health_factor"].iloc[1] == 1.6
+    assert math.isinf(frame["health_factor"].iloc[0])
+    # 120 wallets x 3 calls in batches of 66 wallets, plus at most one decimals lookup
+    assert node.requests["eth_call"] <= 3
+
+    totals = portfolio_totals(frame)
+    assert totals["collateral_usd"] == 119 * 200.0 + 100.0
+    assert totals["debt_usd"] == 119 * 100.0
+    assert totals["wallets_at_risk"] == 0
+    assert totals["balances"]["USDC"] == 120 * 3.0
@@ -0,0 +1,38 @@
+from src.prompt import build_turn_input, count_tokens, fit_context, fit_lines, static_instructions
+
+ZEP_CONTEXT = "\n".join(
+    ["FACTS and ENTITIES represent relevant context to the current conversation.", "<FACTS>"]
+    + [f"  - The user mentioned unrelated topic number {i} at some length" for i in range(200)]
+    + ["  - The user keeps their USDC collateral on Aave", "</FACTS>"]
+)
+
+
+def test_fit_context_keeps_structure_and_relevant_facts_within_budget():
+    fitted = fit_context(ZEP_CONTEXT, budget=100, query="How much USDC collateral do I have?")
+
+    assert count_tokens(fitted) <= 100
+    lines = fitted.splitlines()
+    assert lines[:2] == ZEP_CONTEXT.splitlines()[:2] and lines[-1] == "</FACTS>"
+    assert "  - The user keeps their USDC collateral on Aave" in lines
+    # Ties are broken towards the most recent lines
+    assert "topic number 199" in fitted and "topic number 0 " not in fitted
+    assert fit_context("short context", budget=100) == "short context"
+
+
+def test_fit_lines_keeps_order_of_the_most_relevant_lines():
+    lines = ["- likes hiking", "- lives in Lisbon", "- prefers stablecoins like USDC"]
+    assert fit_lines(lines, budget=14, query="which stablecoins?") == ["- likes hiking", "- prefers stablecoins like USDC"]
+
+
+def test_turn_input_keeps_the_system_prompt_static():
+    first, tokens = build_turn_input("hi", "- name: Ada")
+    second, _ = build_turn_input("what is my health factor?", None)
+
+    assert first == [
+        {"role": "developer", "content": "Memory Context:\n- name: Ada"},
+        {"role": "user", "content": "hi"},
+    ]
+    assert second == [{"role": "user", "content": "what is my health factor?"}]
+    assert set(tokens) == {"instructions", "memory_context", "user_input"}
+    assert static_instructions("instructions").startswith("You are an orchestrator agent")
+    assert "check_scam_addresses" in static_instructions("medieval_instructions")
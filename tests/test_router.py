@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from src.router import classify, route
+
+SCAM = "0x" + "ab" * 20
+CLEAN = "0x" + "cd" * 20
+
+
+@pytest.mark.parametrize(
+    "text, intent",
+    [
+        (f"is {SCAM} a scam?", "scam_check"),
+        (f"Check {SCAM} and {CLEAN}, phishing?", "scam_check"),
+        ("show my health factor", "health"),
+        ("What is my Aave health factor?", "health"),
+        (f"Should I send 1 ETH to {SCAM}? Is it a scam?", None),
+        ("Why did my health factor drop?", None),
+        ("How can I improve my health factor?", None),
+        (f"What is the health factor of {SCAM}?", None),
+        ("Hi, I am planning to lend some USDC on Base.", None),
+        ("What does health factor mean?", None),
+        ("How is the health factor calculated?", None),
+        ("What is collateral and debt in Aave?", None),
+        ("show health factor", None),
+        (f"How do I report {SCAM} as a scam?", None),
+        ("how much debt do I have on aave?", "health"),
+    ],
+)
+def test_classify(text, intent):
+    result = classify(text)
+    assert (result.name if result else None) == intent
+
+
+def test_route_answers_scam_checks_from_templates(monkeypatch, tmp_path):
+    from tools.scam_index import ScamIndex, build_records
+
+    snapshot = tmp_path / "index.bin"
+    snapshot.write_bytes(build_records([SCAM]))
+    monkeypatch.setattr("tools.scam_index._index", ScamIndex(snapshot_path=snapshot))
+
+    reply = asyncio.run(route(f"are {SCAM} and {CLEAN} scams?"))
+    assert reply.splitlines()[0].startswith(f"Warning: {SCAM} is flagged")
+    assert reply.splitlines()[1].startswith(f"{CLEAN} is not in the scam database")
+    assert asyncio.run(route("tell me about Aave")) is None
+
+
+def test_route_falls_back_when_the_tool_fails(monkeypatch):
+    async def broken():
+        raise ConnectionError("node down")
+
+    monkeypatch.setenv("WALLET_ADDRESS", CLEAN)
+    monkeypatch.setattr("tools.aave.account_summary", broken)
+    assert asyncio.run(route("show my health factor")) is None
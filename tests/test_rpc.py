@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientResponseError
+
+import tools.rpc as rpc
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    # Stand in for the pooled provider so no session is opened
+    monkeypatch.setattr(rpc, "_web3", object())
+    monkeypatch.setattr(rpc, "_semaphore", asyncio.Semaphore(2))
+    monkeypatch.setattr(rpc, "RPC_BACKOFF", 0.5)
+    delays = []
+
+    def uniform(low, high):
+        delays.append((low, high))
+        return 0.0
+
+    monkeypatch.setattr(rpc.random, "uniform", uniform)
+    return delays
+
+
+def test_call_with_retry_backs_off_on_timeouts_and_server_errors(limits):
+    attempts = []
+
+    async def flaky():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(1)
+        if len(attempts) == 2:
+            raise ClientResponseError(None, (), status=503, message="Service Unavailable")
+        return "0x1"
+
+    assert asyncio.run(rpc.call_with_retry(flaky, retries=3, timeout=0.01)) == "0x1"
+    assert len(attempts) == 3
+    # Full jitter: each delay is drawn from [0, backoff * 2 ** attempt]
+    assert limits == [(0, 0.5), (0, 1.0)]
+
+
+def test_call_with_retry_gives_up_after_the_last_attempt(limits):
+    attempts = []
+
+    async def down():
+        attempts.append(1)
+        raise ConnectionRefusedError("node down")
+
+    with pytest.raises(ConnectionRefusedError):
+        asyncio.run(rpc.call_with_retry(down, retries=2))
+    assert len(attempts) == 3 and len(limits) == 2
+
+
+def test_call_with_retry_does_not_retry_other_errors(limits):
+    attempts = []
+
+    async def reverted():
+        attempts.append(1)
+        raise ValueError("execution reverted")
+
+    with pytest.raises(ValueError):
+        asyncio.run(rpc.call_with_retry(reverted))
+    assert len(attempts) == 1 and limits == []
+
+
+def test_call_with_retry_caps_concurrent_calls(limits):
+    running, peak = [0], [0]
+
+    async def call():
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return True
+
+    async def main():
+        return await asyncio.gather(*(rpc.call_with_retry(call) for _ in range(8)))
+
+    assert all(asyncio.run(main()))
+    assert peak[0] == 2
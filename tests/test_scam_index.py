@@ -0,0 +1,101 @@
+from tools.scam_index import ScamIndex, build_records
+
+SCAM = "0x" + "ab" * 20
+CLEAN = "0x" + "cd" * 20
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self._payload
+
+
+def test_build_records_sorts_and_dedupes():
+    records = build_records([SCAM, SCAM.upper().replace("0X", "0x"), "not-an-address", "0x" + "01" * 20])
+    assert len(records) == 40
+    assert records[:20] == bytes.fromhex("01" * 20)
+
+
+def test_lookup_and_conditional_refresh(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_get(url, headers=None, timeout=None):
+        calls.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, {"address": [SCAM]}, {"ETag": '"v1"'})
+
+    monkeypatch.setattr("tools.scam_index.requests.get", fake_get)
+    index = ScamIndex(url="http://scam-db", snapshot_path=tmp_path / "index.bin")
+    index.ensure_loaded()
+
+    assert index.contains(SCAM)
+    assert index.contains(SCAM.upper().replace("0X", "0x"))
+    assert not index.contains(CLEAN)
+    assert index.refresh() is False
+    assert calls[-1] == {"If-None-Match": '"v1"'}
+
+    # A second worker starts warm from the snapshot without any request
+    warm = ScamIndex(url="http://scam-db", snapshot_path=tmp_path / "index.bin")
+    warm.ensure_loaded()
+    assert len(calls) == 2
+    assert warm.contains(SCAM)
+
+
+def test_workers_sharing_a_snapshot_pick_up_each_others_downloads(tmp_path, monkeypatch):
+    versions = {'"v1"': [SCAM], '"v2"': [SCAM, CLEAN]}
+    current = ['"v1"']
+
+    def fake_get(url, headers=None, timeout=None):
+        if headers.get("If-None-Match") == current[0]:
+            return FakeResponse(304)
+        return FakeResponse(200, {"address": versions[current[0]]}, {"ETag": current[0]})
+
+    monkeypatch.setattr("tools.scam_index.requests.get", fake_get)
+    worker_1 = ScamIndex(url="http://scam-db", snapshot_path=tmp_path / "index.bin")
+    worker_2 = ScamIndex(url="http://scam-db", snapshot_path=tmp_path / "index.bin")
+    worker_1.ensure_loaded()
+    worker_2.ensure_loaded()
+
+    current[0] = '"v2"'
+    assert worker_1.refresh() is True
+    # worker_2 sends the v2 ETag from the shared metadata and gets a 304
+    assert worker_2.refresh() is True
+    assert worker_1.contains(CLEAN) and worker_2.contains(CLEAN)
+    assert worker_2.refresh() is False
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    import numpy as np
+
+    from tools.bloom import BloomFilter
+
+    rng = np.random.default_rng(7)
+    members = rng.integers(0, 256, size=(20_000, 20), dtype=np.uint8)
+    others = rng.integers(0, 256, size=(20_000, 20), dtype=np.uint8)
+    bloom = BloomFilter.from_records(members.tobytes(), fp_rate=0.01)
+
+    assert bloom.might_contain_many(members).all()
+    assert all(bloom.might_contain(row.tobytes()) for row in members[:500])
+    false_positives = bloom.might_contain_many(others)
+    assert false_positives.mean() < 0.02
+    # The scalar and vectorized paths agree
+    assert [bloom.might_contain(row.tobytes()) for row in others[:500]] == false_positives[:500].tolist()
+    assert bloom.nbytes < members.nbytes
+
+
+def test_screen_matches_single_lookups(tmp_path):
+    scams = [f"0x{i:040x}" for i in range(1, 1001)]
+    snapshot = tmp_path / "index.bin"
+    snapshot.write_bytes(build_records(scams))
+    index = ScamIndex(snapshot_path=snapshot)
+    index.ensure_loaded()
+
+    batch = [scams[0], CLEAN, "not-an-address", scams[-1].upper().replace("0X", "0x"), SCAM]
+    assert index.screen(batch) == [True, False, None, True, False]
+    assert index.screen([]) == []
+    assert index.stats()["addresses"] == 1000
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from src.api.scheduler import ChatScheduler, SchedulerOverloaded
+
+
+def test_same_session_runs_in_fifo_order():
+    order = []
+
+    async def turn(scheduler, n):
+        async with scheduler.slot("s1"):
+            order.append(("start", n))
+            await asyncio.sleep(0.01)
+            order.append(("end", n))
+
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=4, max_queue=10)
+        await asyncio.gather(*(turn(scheduler, n) for n in range(3)))
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert order == [("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert scheduler._session_locks == {}
+    assert scheduler.stats()["admitted"] == 3
+
+
+def test_rejects_when_queue_is_full():
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=1, max_queue=1)
+        running = await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloaded) as excinfo:
+            await scheduler.acquire("c")
+        scheduler.release("a", running)
+        scheduler.release("b", await waiter)
+        return scheduler.stats(), excinfo.value.retry_after
+
+    stats, retry_after = asyncio.run(main())
+    assert retry_after >= 1
+    assert stats["rejected"] == 1
+    assert stats["running"] == 0 and stats["waiting"] == 0
+
+
+def test_queue_depth_in_flight_and_wait_are_exported():
+    from prometheus_client import REGISTRY
+
+    def sample(name):
+        return REGISTRY.get_sample_value(name) or 0.0
+
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=1, max_queue=4)
+        before = sample("chat_queue_wait_seconds_count")
+        running = await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        during = sample("chat_queue_depth"), sample("chat_in_flight")
+        scheduler.release("a", running)
+        scheduler.release("b", await waiter)
+        after = sample("chat_queue_depth"), sample("chat_in_flight")
+        return during, after, sample("chat_queue_wait_seconds_count") - before
+
+    assert asyncio.run(main()) == ((1.0, 1.0), (0.0, 0.0), 2.0)
@@ -0,0 +1,152 @@
+import asyncio
+
+from src.agent import AsyncZepMemoryAgent
+from src.api.session_registry import InMemorySessionRegistry, SQLiteSessionRegistry
+from src.api.session_store import SessionStore
+from src.memory_backends import LocalMemoryBackend
+
+
+def test_lru_eviction_closes_and_rehydrates(monkeypatch):
+    backend = LocalMemoryBackend()
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: backend)
+
+    async def main():
+        store = SessionStore(max_sessions=2, idle_ttl=3600, registry=InMemorySessionRegistry())
+        for session_id in ("a", "b", "c"):
+            agent = AsyncZepMemoryAgent(session_id=session_id, user_id="u1")
+            await agent.initialize()
+            await store.add(session_id, agent)
+        await asyncio.sleep(0)
+
+        assert len(store) == 2
+        assert await store.exists("a")
+        original_session = (await store.registry.get("a"))["session_id"]
+        rehydrated = await store.get("a")
+        assert rehydrated.memory_manager.session_id == original_session
+        assert await store.get("unknown") is None
+        return store.stats()
+
+    stats = asyncio.run(main())
+    assert stats["evictions"] == 2
+    assert stats["rehydrations"] == 1
+    assert stats["live"] == 2
+
+
+def test_idle_sessions_are_reaped(monkeypatch):
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: LocalMemoryBackend())
+
+    async def main():
+        store = SessionStore(max_sessions=10, idle_ttl=-1, registry=InMemorySessionRegistry())
+        agent = AsyncZepMemoryAgent(session_id="idle", user_id="u2")
+        await agent.initialize()
+        await store.add("idle", agent)
+        return store.evict_idle(), len(store), await store.exists("idle")
+
+    assert asyncio.run(main()) == (1, 0, True)
+
+
+def test_sessions_are_shared_between_workers(tmp_path, monkeypatch):
+    backend = LocalMemoryBackend()
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: backend)
+
+    async def main():
+        worker_1 = SessionStore(registry=SQLiteSessionRegistry(tmp_path / "sessions.sqlite3"))
+        worker_2 = SessionStore(registry=SQLiteSessionRegistry(tmp_path / "sessions.sqlite3"))
+        agent = AsyncZepMemoryAgent(session_id="shared", user_id="u3")
+        await agent.initialize()
+        await worker_1.add("shared", agent)
+
+        other = await worker_2.get("shared")
+        return agent.memory_manager.session_id, other.memory_manager.session_id
+
+    created, rehydrated = asyncio.run(main())
+    assert created == rehydrated
+
+
+def test_close_all_waits_for_evicted_sessions(monkeypatch):
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: LocalMemoryBackend())
+    closed = []
+
+    async def slow_close(self):
+        await asyncio.sleep(0.05)
+        closed.append(self.memory_manager.session_id)
+
+    monkeypatch.setattr(AsyncZepMemoryAgent, "close", slow_close)
+
+    async def main():
+        store = SessionStore(max_sessions=10, idle_ttl=-1, registry=InMemorySessionRegistry())
+        agent = AsyncZepMemoryAgent(session_id="evicted", user_id="u3")
+        await agent.initialize()
+        await store.add("evicted", agent)
+        store.evict_idle()
+        assert len(store._background) == 1
+        await store.close_all()
+        return len(store._background)
+
+    assert asyncio.run(main()) == 0
+    assert len(closed) == 1 and closed[0].startswith("evicted")
+
+
+def test_sessions_with_a_turn_in_flight_are_not_evicted(monkeypatch):
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: LocalMemoryBackend())
+    busy = {"a"}
+
+    async def main():
+        store = SessionStore(max_sessions=1, idle_ttl=-1, registry=InMemorySessionRegistry(), is_busy=busy.__contains__)
+        live = []
+        for session_id in ("a", "b", "c"):
+            agent = AsyncZepMemoryAgent(session_id=session_id, user_id="u1")
+            await agent.initialize()
+            await store.add(session_id, agent)
+            live.append(sorted(store._agents))
+        live.append(store.evict_idle())
+        await store.close_all()
+        return live
+
+    # "a" stays pinned; the next-oldest idle session is evicted instead
+    assert asyncio.run(main()) == [["a"], ["a", "b"], ["a", "c"], 1]
+
+
+def test_a_cancelled_caller_does_not_cancel_a_shared_rehydration(monkeypatch):
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: LocalMemoryBackend())
+
+    async def main():
+        store = SessionStore(max_sessions=10, idle_ttl=3600, registry=InMemorySessionRegistry())
+        agent = AsyncZepMemoryAgent(session_id="r", user_id="u3")
+        await agent.initialize()
+        await store.add("r", agent)
+        store._evict("r")
+
+        first = asyncio.create_task(store.get("r"))
+        second = asyncio.create_task(store.get("r"))
+        await asyncio.sleep(0)
+        first.cancel()
+        rehydrated = await second
+        await store.close_all()
+        return first.cancelled(), rehydrated is not None, store.rehydrations
+
+    assert asyncio.run(main()) == (True, True, 1)
+
+
+def test_registry_ttl_counts_from_last_use(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.memory.create_memory_backend", lambda: LocalMemoryBackend())
+
+    async def main():
+        path = tmp_path / "sessions.sqlite3"
+        worker_1 = SessionStore(registry=SQLiteSessionRegistry(path, ttl=0.3), touch_interval=0)
+        worker_2 = SessionStore(registry=SQLiteSessionRegistry(path, ttl=0.3))
+        agent = AsyncZepMemoryAgent(session_id="active", user_id="u4")
+        await agent.initialize()
+        await worker_1.add("active", agent)
+        for _ in range(3):
+            await asyncio.sleep(0.15)
+            await worker_1.get("active")
+        # Created more than a TTL ago, but used since
+        active = await worker_2.get("active")
+        await asyncio.sleep(0.35)
+        expired = await worker_2.registry.get("active")
+        await worker_1.close_all()
+        await worker_2.close_all()
+        return active is not None, expired
+
+    assert asyncio.run(main()) == (True, None)
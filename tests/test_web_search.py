@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+import tools.web_search as web_search
+
+
+def test_prefilter_matches_vocabulary_and_addresses():
+    assert web_search.is_obviously_blockchain("What is Aave v3?")
+    assert web_search.is_obviously_blockchain("base chain gas fees today")
+    assert web_search.is_obviously_blockchain("who owns 0x" + "ab" * 20)
+    assert not web_search.is_obviously_blockchain("weather in Warsaw")
+    # Everyday words that crypto also uses are left to the classifier
+    assert not web_search.is_obviously_blockchain("how to lower natural gas fees at home")
+    assert not web_search.is_obviously_blockchain("polygon area formula")
+    assert not web_search.is_obviously_blockchain("best leather wallet brands")
+
+
+def test_search_is_cancelled_when_classifier_rejects(monkeypatch):
+    cancelled = []
+
+    async def reject(query):
+        await asyncio.sleep(0.01)
+        return False
+
+    async def slow_search(query):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+
+    monkeypatch.setattr(web_search, "is_blockchain_related", reject)
+    monkeypatch.setattr(web_search, "search", slow_search)
+
+    async def main():
+        with pytest.raises(ValueError):
+            await web_search.guarded_search("weather in Warsaw")
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == ["weather in Warsaw"]
+
+
+def test_obvious_queries_skip_the_classifier(monkeypatch):
+    async def classifier(query):
+        raise AssertionError("classifier should not run")
+
+    async def fake_search(query):
+        return f"answer for {query}"
+
+    monkeypatch.setattr(web_search, "is_blockchain_related", classifier)
+    monkeypatch.setattr(web_search, "search", fake_search)
+
+    assert asyncio.run(web_search.guarded_search("what is aave")) == "answer for what is aave"
+
+
+def test_search_cache_normalizes_and_matches_similar_queries(tmp_path):
+    from tools.search_cache import SearchCache
+
+    cache = SearchCache(tmp_path / "cache.sqlite3", ttl=60, max_entries=2)
+    cache.put("What is Aave v3?", "a lending protocol", embedding=[1.0, 0.0])
+    assert cache.get("  what is aave V3 ") == "a lending protocol"
+    assert cache.get("explain aave 3", embedding=[0.99, 0.05]) == "a lending protocol"
+    assert cache.get("explain uniswap", embedding=[0.0, 1.0]) is None
+
+    cache.put("q2", "a2")
+    cache.put("q3", "a3")
+    assert cache.get("q3") == "a3"
+    assert cache.get("what is aave v3") is None
+
+
+def test_cached_search_embeds_only_on_an_exact_miss(monkeypatch, tmp_path):
+    from tools.search_cache import SearchCache
+
+    cache = SearchCache(tmp_path / "cache.sqlite3")
+    cache.put("What is Aave v3?", "a lending protocol", embedding=[1.0, 0.0])
+    embedded = []
+
+    async def fake_embed(query):
+        embedded.append(query)
+        return [0.99, 0.05]
+
+    monkeypatch.setattr(web_search, "get_search_cache", lambda: cache)
+    monkeypatch.setattr(web_search, "embed_query", fake_embed)
+
+    assert asyncio.run(web_search.cached_search("what is aave v3")) == "a lending protocol"
+    assert embedded == []
+    assert asyncio.run(web_search.cached_search("explain aave 3")) == "a lending protocol"
+    assert embedded == ["explain aave 3"]
@@ -1,6 +1,34 @@
-from .aave import fetch_aave_info
-from .fraud import check_scam_address
-from .search_memory import get_search_memory_tool
-from .web_search import web_search_preview
+"""
+Agent tools, loaded lazily.
 
-__all__ = [fetch_aave_info, check_scam_address, get_search_memory_tool, web_search_preview]
\ No newline at end of file
+Each tool's module (and its heavy dependencies such as web3 or the OpenAI
+client) is only imported the first time the tool is accessed, which keeps
+API worker start-up fast. Tools with a policy in tools/memoize.py are
+returned memoized, so repeated calls within a run or session reuse results.
+"""
+import importlib
+from typing import Any
+
+# Export names must differ from submodule names, or importing the submodule
+# would shadow the lazily loaded tool (and vice versa)
+_REGISTRY = {
+    "fetch_aave_info": ".aave",
+    "fetch_aave_portfolio": ".portfolio",
+    "fetch_aave_history": ".aave_indexer",
+    "check_scam_address": ".fraud",
+    "check_scam_addresses": ".fraud",
+    "search_memory": ".memory_search",
+    "web_search_preview": ".web_search",
+}
+
+__all__ = list(_REGISTRY)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _REGISTRY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .memoize import memoize_registered_tool
+
+    value = memoize_registered_tool(name, getattr(importlib.import_module(_REGISTRY[name], __name__), name))
+    globals()[name] = value
+    return value
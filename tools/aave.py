@@ -1,97 +1,274 @@
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 from agents import function_tool
+from src.metrics import instrument_tool
+from src.utils import get_config
 from dotenv import load_dotenv
 import os
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from os.path import join, dirname
+from .cache import AsyncTTLCache
+from .rpc import call_with_retry, get_web3
 
 dotenv_path = join(dirname(__file__), '.env')
 load_dotenv(dotenv_path)
 
-@function_tool
-def fetch_aave_info() -> Dict[str, float]:
+# Multicall3 is deployed at the same address on every major EVM chain, Base included
+MULTICALL3_ADDRESS = os.environ.get("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+
+POOL_ABI = [
+{
+    "inputs": [{"internalType": "address", "name": "user", "type": "address"}],
+    "name": "getUserAccountData",
+    "outputs": [
+        {"internalType": "uint256", "name": "totalCollateralBase", "type": "uint256"},
+        {"internalType": "uint256", "name": "totalDebtBase", "type": "uint256"},
+        {"internalType": "uint256", "name": "availableBorrowsBase", "type": "uint256"},
+        {"internalType": "uint256", "name": "currentLiquidationThreshold", "type": "uint256"},
+        {"internalType": "uint256", "name": "ltv", "type": "uint256"},
+        {"internalType": "uint256", "name": "healthFactor", "type": "uint256"}
+    ],
+    "stateMutability": "view",
+    "type": "function"
+}
+]
+
+# ERC20 minimal ABI
+ERC20_ABI = [
+    {"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},
+    {"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},
+    {"constant":True,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"}
+]
+
+MULTICALL3_ABI = [
+{
+    "inputs": [{
+        "components": [
+            {"internalType": "address", "name": "target", "type": "address"},
+            {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+            {"internalType": "bytes", "name": "callData", "type": "bytes"}
+        ],
+        "internalType": "struct Multicall3.Call3[]",
+        "name": "calls",
+        "type": "tuple[]"
+    }],
+    "name": "aggregate3",
+    "outputs": [{
+        "components": [
+            {"internalType": "bool", "name": "success", "type": "bool"},
+            {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+        ],
+        "internalType": "struct Multicall3.Result[]",
+        "name": "returnData",
+        "type": "tuple[]"
+    }],
+    "stateMutability": "payable",
+    "type": "function"
+},
+{
+    "inputs": [],
+    "name": "getBlockNumber",
+    "outputs": [{"internalType": "uint256", "name": "blockNumber", "type": "uint256"}],
+    "stateMutability": "view",
+    "type": "function"
+}
+]
+
+# Default token registry, used when config.yaml has no aave.tokens section
+TOKEN_ADDRESSES = {
+    "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+    "WBTC": "0xcbB7C0000aB88B473b1f5aFd9ef808440eed33Bf",
+    "WETH": "0x4200000000000000000000000000000000000006"
+}
+
+# ERC-20 decimals never change, so they are fetched once per token address
+_decimals_cache: Dict[str, int] = {}
+
+
+def get_token_registry() -> Dict[str, str]:
     """
-    Fetch Aave V3 user account data from Base chain
+    Return the tracked tokens as {symbol: address}, from `aave.tokens` in config.yaml.
     """
-    web3 = Web3(Web3.HTTPProvider(os.environ.get("BASE_RPC_URL")))
-    if not web3.is_connected(): 
-        raise Exception("Web3 is not connected")
-    
-    wallet_address = Web3.to_checksum_address(os.environ.get("WALLET_ADDRESS"))
-    POOL_ADDRESS = Web3.to_checksum_address(os.environ.get("POOL_ADDRESS"))
-    POOL_ABI = [ 
-    { 
-        "inputs": [{"internalType": "address", "name": "user", "type": "address"}], 
-        "name": "getUserAccountData", 
-        "outputs": [
-            {"internalType": "uint256", "name": "totalCollateralBase", "type": "uint256"}, 
-            {"internalType": "uint256", "name": "totalDebtBase", "type": "uint256"}, 
-            {"internalType": "uint256", "name": "availableBorrowsBase", "type": "uint256"}, 
-            {"internalType": "uint256", "name": "currentLiquidationThreshold", "type": "uint256"}, 
-            {"internalType": "uint256", "name": "ltv", "type": "uint256"}, 
-            {"internalType": "uint256", "name": "healthFactor", "type": "uint256"}
-        ],
-        "stateMutability": "view", 
-        "type": "function"
-    }
-    ]
+    return dict((get_config().get("aave") or {}).get("tokens") or TOKEN_ADDRESSES)
 
-    pool_contract = web3.eth.contract(address=POOL_ADDRESS, abi=POOL_ABI)
-    data = pool_contract.functions.getUserAccountData(wallet_address).call()
-    asset_breakdown = fetch_user_assets(wallet_address)
+# Account snapshots keyed by (wallet, tokens) and reused for AAVE_CACHE_TTL seconds, so
+# follow-up questions within that window are answered without any RPC. Each snapshot
+# records the block it was read at. The latest block number, used by portfolio scans,
+# is cached for about one block interval (Base produces a block every ~2s).
+_snapshot_cache = AsyncTTLCache(
+    maxsize=int(os.environ.get("AAVE_CACHE_SIZE", 1024)),
+    ttl=float(os.environ.get("AAVE_CACHE_TTL", 30)),
+)
+_block_cache = AsyncTTLCache(maxsize=1, ttl=float(os.environ.get("AAVE_BLOCK_TTL", 2)))
 
-    return {
-        "collateral_usd": round(data[0] / 1e8, 4),
-        "debt_usd": round(data[1] / 1e8, 4),
-        "available_borrow_usd": round(data[2] / 1e8, 4),
-        "health_factor": round(data[5] / 1e18, 4),
-        "wallet_asset_breakdown": asset_breakdown
-    }
 
-def fetch_user_assets(wallet_address: str) -> List[Dict[str, any]]:
+async def aggregate3(
+    web3: AsyncWeb3,
+    calls: List[Tuple[str, bool, bytes]],
+    block_identifier: Optional[int] = None,
+) -> List[Tuple[bool, bytes]]:
     """
-    Fetch user's per-asset balances and approximate USD values.
+    Execute many read-only calls in a single eth_call through Multicall3.
+
+    Args:
+        web3: AsyncWeb3 instance to use.
+        calls: (target, allow_failure, call_data) triples.
+        block_identifier: Optional block to read at; defaults to latest.
+
+    Returns:
+        (success, return_data) for each call, in order.
     """
+    multicall = web3.eth.contract(address=Web3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI)
+    return await call_with_retry(
+        lambda: multicall.functions.aggregate3(calls).call(block_identifier=block_identifier or "latest")
+    )
 
-    # Simulated: in real use, you'd get the token contracts dynamically
-    token_addresses = {
-        "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
-        "WBTC": "0xcbB7C0000aB88B473b1f5aFd9ef808440eed33Bf",
-        "WETH": "0x4200000000000000000000000000000000000006"
-    }
 
-    # ERC20 minimal ABI
-    erc20_abi = [
-        {"constant":True,"inputs":[{"name":"_owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"balance","type":"uint256"}],"type":"function"},
-        {"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},
-        {"constant":True,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"}
-    ]
+async def get_block_number() -> int:
+    """
+    Return the latest block number, cached for roughly one block interval.
+    """
+    web3 = await get_web3()
 
-    web3 = Web3(Web3.HTTPProvider(os.environ.get("BASE_RPC_URL")))
-    assets = []
+    async def fetch() -> int:
+        return await call_with_retry(lambda: web3.eth.block_number)
+
+    return await _block_cache.get_or_fetch("latest", fetch)
+
+
+async def ensure_decimals(web3: AsyncWeb3, token_addresses: List[str]) -> Dict[str, int]:
+    """
+    Fetch the decimals of tokens not seen before in one Multicall3 round trip.
 
+    Args:
+        web3: AsyncWeb3 instance to use.
+        token_addresses: Checksummed ERC-20 addresses.
+
+    Returns:
+        {address: decimals} for every token whose decimals are known.
+    """
+    missing = [address for address in dict.fromkeys(token_addresses) if address not in _decimals_cache]
+    if missing:
+        calls = [
+            (address, True, web3.eth.contract(address=address, abi=ERC20_ABI).encode_abi("decimals"))
+            for address in missing
+        ]
+        for address, (ok, data) in zip(missing, await aggregate3(web3, calls)):
+            if ok and data:
+                _decimals_cache[address] = web3.codec.decode(["uint8"], data)[0]
+    return {address: _decimals_cache[address] for address in token_addresses if address in _decimals_cache}
+
+
+async def fetch_account_snapshot(
+    wallet_address: str,
+    token_addresses: Dict[str, str],
+    block_identifier: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Read Aave account data and every token balance in one Multicall3 round trip.
+
+    Args:
+        wallet_address: Wallet to inspect.
+        token_addresses: Mapping of token symbol to ERC-20 address.
+        block_identifier: Optional block to read at; defaults to latest.
+
+    Returns:
+        A dict with the raw `account_data` tuple, the per-asset `assets` list
+        and the `block_number` the values were read at.
+    """
+    web3 = await get_web3()
+    wallet_address = Web3.to_checksum_address(wallet_address)
+    pool_address = Web3.to_checksum_address(os.environ.get("POOL_ADDRESS"))
+    pool_contract = web3.eth.contract(address=pool_address, abi=POOL_ABI)
+
+    multicall_address = Web3.to_checksum_address(MULTICALL3_ADDRESS)
+    multicall = web3.eth.contract(address=multicall_address, abi=MULTICALL3_ABI)
+    calls = [
+        (pool_address, False, pool_contract.encode_abi("getUserAccountData", args=[wallet_address])),
+        # The block the batch executes in, without a separate eth_blockNumber round trip
+        (multicall_address, False, multicall.encode_abi("getBlockNumber")),
+    ]
+    tokens = []
     for symbol, address in token_addresses.items():
-        contract = web3.eth.contract(address=Web3.to_checksum_address(address), abi=erc20_abi)
+        address = Web3.to_checksum_address(address)
+        token = web3.eth.contract(address=address, abi=ERC20_ABI)
+        calls.append((address, True, token.encode_abi("balanceOf", args=[wallet_address])))
+        fetch_decimals = address not in _decimals_cache
+        if fetch_decimals:
+            calls.append((address, True, token.encode_abi("decimals")))
+        tokens.append((symbol, address, fetch_decimals))
 
-        try:
-            balance = contract.functions.balanceOf(wallet_address).call()
-            decimals = contract.functions.decimals().call()
-            human_balance = balance / (10 ** decimals)
+    results = iter(await aggregate3(web3, calls, block_identifier))
+    _, account_data = next(results)
+    account_data = web3.codec.decode(
+        ["uint256", "uint256", "uint256", "uint256", "uint256", "uint256"], account_data
+    )
+    _, block_number = next(results)
+    block_number = web3.codec.decode(["uint256"], block_number)[0]
 
-            assets.append({
-                "symbol": symbol,
-                "balance": round(human_balance, 6),
-            })
+    assets = []
+    for symbol, address, fetch_decimals in tokens:
+        balance_ok, balance_data = next(results)
+        if fetch_decimals:
+            decimals_ok, decimals_data = next(results)
+            if decimals_ok and decimals_data:
+                _decimals_cache[address] = web3.codec.decode(["uint8"], decimals_data)[0]
+        if not balance_ok or not balance_data or address not in _decimals_cache:
+            print(f"Error fetching {symbol}: call reverted")
+            continue
+        balance = web3.codec.decode(["uint256"], balance_data)[0]
+        assets.append({
+            "symbol": symbol,
+            "balance": round(balance / (10 ** _decimals_cache[address]), 6),
+        })
 
-        except Exception as e:
-            print(f"Error fetching {symbol}: {e}")
+    return {"account_data": account_data, "assets": assets, "block_number": block_number}
 
-    return assets
-    
 
+async def fetch_cached_account_snapshot(wallet_address: str, token_addresses: Dict[str, str]) -> Dict[str, Any]:
+    """
+    fetch_account_snapshot through the (wallet, tokens) cache, so a miss costs one
+    round trip. Concurrent sessions asking about the same wallet share a single
+    in-flight fetch.
+    """
+    key = (wallet_address.lower(), tuple(token_addresses.values()))
+    return await _snapshot_cache.get_or_fetch(key, lambda: fetch_account_snapshot(wallet_address, token_addresses))
 
 
+def aave_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters of the account snapshot cache, reported by /api/stats.
+    """
+    return _snapshot_cache.stats()
 
 
+async def account_summary(wallet_address: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Summarize the Aave V3 account of a wallet (default WALLET_ADDRESS) on Base:
+    USD collateral, debt and borrowing power, health factor and wallet balances.
+    """
+    snapshot = await fetch_cached_account_snapshot(
+        wallet_address or os.environ.get("WALLET_ADDRESS"), get_token_registry()
+    )
+    data = snapshot["account_data"]
 
+    return {
+        "collateral_usd": round(data[0] / 1e8, 4),
+        "debt_usd": round(data[1] / 1e8, 4),
+        "available_borrow_usd": round(data[2] / 1e8, 4),
+        "health_factor": round(data[5] / 1e18, 4),
+        "wallet_asset_breakdown": snapshot["assets"]
+    }
 
+@function_tool
+@instrument_tool
+async def fetch_aave_info() -> Dict[str, float]:
+    """
+    Fetch Aave V3 user account data from Base chain
+    """
+    return await account_summary()
+
+async def fetch_user_assets(wallet_address: str) -> List[Dict[str, any]]:
+    """
+    Fetch user's per-asset balances and approximate USD values.
+    """
+    return (await fetch_account_snapshot(wallet_address, get_token_registry()))["assets"]
@@ -0,0 +1,414 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from agents import function_tool
+from eth_abi import decode
+from pydantic import BaseModel
+from web3 import Web3
+from web3.exceptions import Web3RPCError
+
+from src.metrics import instrument_tool
+from .aave import ensure_decimals
+from .portfolio import scan_portfolio
+from .rpc import call_with_retry, get_web3
+
+AAVE_INDEX_PATH = os.environ.get("AAVE_INDEX_PATH", ".cache/aave_index.sqlite3")
+# Blocks per eth_getLogs request; halved automatically when a node rejects a range
+AAVE_INDEXER_BLOCK_RANGE = int(os.environ.get("AAVE_INDEXER_BLOCK_RANGE", 2000))
+# Blocks behind the head that are not indexed yet, so short reorgs never reach the store
+AAVE_INDEXER_CONFIRMATIONS = int(os.environ.get("AAVE_INDEXER_CONFIRMATIONS", 5))
+# Where newly tracked wallets start, in blocks before the head (~1 day of Base blocks)
+AAVE_INDEXER_LOOKBACK = int(os.environ.get("AAVE_INDEXER_LOOKBACK", 43200))
+AAVE_INDEXER_INTERVAL = float(os.environ.get("AAVE_INDEXER_INTERVAL", 30))
+
+
+def _topic(signature: str) -> str:
+    return "0x" + Web3.keccak(text=signature).hex().removeprefix("0x")
+
+
+# Aave V3 Pool events: (signature, topic holding the position owner,
+# non-indexed field names and types, field reported as the amount)
+POOL_EVENTS: Dict[str, Tuple[str, int, List[Tuple[str, str]], str]] = {
+    "Supply": (
+        "Supply(address,address,address,uint256,uint16)",
+        2, [("user", "address"), ("amount", "uint256")], "amount",
+    ),
+    "Withdraw": (
+        "Withdraw(address,address,address,uint256)",
+        2, [("amount", "uint256")], "amount",
+    ),
+    "Borrow": (
+        "Borrow(address,address,address,uint256,uint8,uint256,uint16)",
+        2, [("user", "address"), ("amount", "uint256"), ("interestRateMode", "uint8"), ("borrowRate", "uint256")],
+        "amount",
+    ),
+    "Repay": (
+        "Repay(address,address,address,uint256,bool)",
+        2, [("amount", "uint256"), ("useATokens", "bool")], "amount",
+    ),
+    "LiquidationCall": (
+        "LiquidationCall(address,address,address,uint256,uint256,address,bool)",
+        3,
+        [("debtToCover", "uint256"), ("liquidatedCollateralAmount", "uint256"),
+         ("liquidator", "address"), ("receiveAToken", "bool")],
+        "liquidatedCollateralAmount",
+    ),
+}
+EVENT_TOPICS = {_topic(signature): name for name, (signature, *_) in POOL_EVENTS.items()}
+
+
+def wallet_topic(wallet: str) -> str:
+    return "0x" + "0" * 24 + Web3.to_checksum_address(wallet)[2:].lower()
+
+
+class AaveEventStore:
+    """
+    Local SQLite store (WAL mode) of indexed Aave events, per-wallet
+    checkpoints and account snapshots, indexed by wallet and block.
+    """
+
+    def __init__(self, path: Union[str, Path] = AAVE_INDEX_PATH):
+        """
+        Initialize the AaveEventStore.
+
+        Args:
+            path: SQLite database file, or ":memory:".
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    wallet TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    log_index INTEGER NOT NULL,
+                    tx_hash TEXT NOT NULL,
+                    event TEXT NOT NULL,
+                    reserve TEXT,
+                    amount REAL,
+                    details TEXT,
+                    PRIMARY KEY (tx_hash, log_index)
+                );
+                CREATE INDEX IF NOT EXISTS events_wallet_block ON events (wallet, block_number);
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    wallet TEXT PRIMARY KEY,
+                    block_number INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    wallet TEXT NOT NULL,
+                    block_number INTEGER NOT NULL,
+                    recorded_at REAL NOT NULL,
+                    collateral_usd REAL,
+                    debt_usd REAL,
+                    available_borrow_usd REAL,
+                    health_factor REAL,
+                    PRIMARY KEY (wallet, block_number)
+                );
+                """
+            )
+
+    async def _run(self, func, *args):
+        def locked():
+            with self._lock, self._conn:
+                return func(*args)
+
+        return await asyncio.to_thread(locked)
+
+    async def checkpoints(self, wallets: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Return the last indexed block of each wallet, None if it was never indexed.
+        """
+        wallets = [wallet.lower() for wallet in wallets]
+
+        def read():
+            rows = dict(self._conn.execute("SELECT wallet, block_number FROM checkpoints").fetchall())
+            return {wallet: rows.get(wallet) for wallet in wallets}
+
+        return await self._run(read)
+
+    async def save(self, events: List[Dict[str, Any]], wallets: Iterable[str], block_number: int) -> None:
+        """
+        Store events and advance the wallets' checkpoint in one transaction.
+        """
+        wallets = [wallet.lower() for wallet in wallets]
+
+        def write():
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO events "
+                "(wallet, block_number, log_index, tx_hash, event, reserve, amount, details) "
+                "VALUES (:wallet, :block_number, :log_index, :tx_hash, :event, :reserve, :amount, :details)",
+                [{**event, "details": json.dumps(event["details"])} for event in events],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (wallet, block_number) VALUES (?, ?)",
+                [(wallet, block_number) for wallet in wallets],
+            )
+
+        await self._run(write)
+
+    async def save_snapshots(self, rows: List[Tuple[str, int, float, float, float, float]]) -> None:
+        """
+        Store (wallet, block, collateral_usd, debt_usd, available_borrow_usd, health_factor) rows.
+        """
+        now = time.time()
+
+        def write():
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshots "
+                "(wallet, block_number, recorded_at, collateral_usd, debt_usd, available_borrow_usd, health_factor) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(wallet.lower(), block, now, *values) for wallet, block, *values in rows],
+            )
+
+        await self._run(write)
+
+    async def history(self, wallet: str, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Return the wallet's most recent events and account snapshots, newest first.
+        """
+        wallet = wallet.lower()
+
+        def read():
+            self._conn.row_factory = sqlite3.Row
+            try:
+                events = self._conn.execute(
+                    "SELECT block_number, tx_hash, event, reserve, amount, details FROM events "
+                    "WHERE wallet = ? ORDER BY block_number DESC, log_index DESC LIMIT ?",
+                    (wallet, limit),
+                ).fetchall()
+                snapshots = self._conn.execute(
+                    "SELECT block_number, recorded_at, collateral_usd, debt_usd, available_borrow_usd, health_factor "
+                    "FROM snapshots WHERE wallet = ? ORDER BY block_number DESC LIMIT ?",
+                    (wallet, limit),
+                ).fetchall()
+            finally:
+                self._conn.row_factory = None
+            return (
+                [{**dict(row), "details": json.loads(row["details"])} for row in events],
+                [dict(row) for row in snapshots],
+            )
+
+        events, snapshots = await self._run(read)
+        return {"events": events, "snapshots": snapshots}
+
+
+class AaveEventIndexer:
+    """
+    Follows Aave Pool events for tracked wallets from a per-wallet checkpoint.
+
+    Each cycle fetches Supply/Withdraw/Borrow/Repay/LiquidationCall logs for
+    the tracked wallets (filtered by topic on the node) up to the head minus
+    `confirmations`, stores them with the new checkpoint, and records an
+    account snapshot of every wallet at that block, so history and trend
+    questions are answered from the local store.
+    """
+
+    def __init__(
+        self,
+        store: AaveEventStore,
+        wallets: Iterable[str] = (),
+        pool_address: Optional[str] = None,
+        block_range: int = AAVE_INDEXER_BLOCK_RANGE,
+        confirmations: int = AAVE_INDEXER_CONFIRMATIONS,
+        lookback: int = AAVE_INDEXER_LOOKBACK,
+        interval: float = AAVE_INDEXER_INTERVAL,
+    ):
+        """
+        Initialize the AaveEventIndexer.
+
+        Args:
+            store: Where events, checkpoints and snapshots are kept.
+            wallets: Wallets to track.
+            pool_address: Aave Pool address; defaults to POOL_ADDRESS.
+            block_range: Blocks per eth_getLogs request.
+            confirmations: Blocks behind the head left unindexed.
+            lookback: Blocks before the head where a new wallet's history starts.
+            interval: Seconds between cycles in run_forever().
+        """
+        self.store = store
+        self.wallets: List[str] = []
+        self.pool_address = Web3.to_checksum_address(pool_address or os.environ.get("POOL_ADDRESS"))
+        self.block_range = block_range
+        self.confirmations = confirmations
+        self.lookback = lookback
+        self.interval = interval
+        self.track(wallets)
+
+    def track(self, wallets: Iterable[str]) -> None:
+        """
+        Start following more wallets; their history is backfilled on the next cycle.
+        """
+        for wallet in wallets:
+            wallet = Web3.to_checksum_address(wallet)
+            if wallet not in self.wallets:
+                self.wallets.append(wallet)
+
+    async def _get_logs(self, web3, topics: List[Any], from_block: int, to_block: int) -> List[Any]:
+        query = {"address": self.pool_address, "fromBlock": from_block, "toBlock": to_block, "topics": topics}
+        try:
+            return await call_with_retry(lambda: web3.eth.get_logs(query))
+        except Web3RPCError:
+            # Nodes cap results per request; split the range and try again
+            if to_block <= from_block:
+                raise
+            middle = (from_block + to_block) // 2
+            return (
+                await self._get_logs(web3, topics, from_block, middle)
+                + await self._get_logs(web3, topics, middle + 1, to_block)
+            )
+
+    async def fetch_events(self, wallets: List[str], from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """
+        Fetch and decode the Pool events of `wallets` in [from_block, to_block].
+        """
+        web3 = await get_web3()
+        owners = [wallet_topic(wallet) for wallet in wallets]
+        # The owner is topic 2 of most events and topic 3 of LiquidationCall
+        by_position: Dict[int, List[str]] = {}
+        for topic, name in EVENT_TOPICS.items():
+            by_position.setdefault(POOL_EVENTS[name][1], []).append(topic)
+
+        logs = []
+        for start in range(from_block, to_block + 1, self.block_range):
+            end = min(start + self.block_range - 1, to_block)
+            for position, event_topics in by_position.items():
+                topics = [event_topics] + [None] * (position - 1) + [owners]
+                logs.extend(await self._get_logs(web3, topics, start, end))
+
+        events = [self._decode(log) for log in logs]
+        reserves = sorted({event["reserve"] for event in events if event["reserve"]})
+        decimals = await ensure_decimals(web3, reserves) if reserves else {}
+        for event in events:
+            raw = event.pop("raw_amount")
+            scale = decimals.get(event["reserve"])
+            event["amount"] = raw / 10 ** scale if scale is not None else float(raw)
+        return events
+
+    @staticmethod
+    def _decode(log: Any) -> Dict[str, Any]:
+        topics = ["0x" + bytes(topic).hex() for topic in log["topics"]]
+        name = EVENT_TOPICS[topics[0]]
+        _, owner_position, fields, amount_field = POOL_EVENTS[name]
+        values = decode([kind for _, kind in fields], bytes(log["data"]))
+        details = {
+            field: (Web3.to_checksum_address(value) if kind == "address" else value)
+            for (field, kind), value in zip(fields, values)
+        }
+        # Amounts are kept as strings in details: uint256 does not fit SQLite integers
+        raw_amount = details[amount_field]
+        details = {key: str(value) if isinstance(value, int) and not isinstance(value, bool) else value
+                   for key, value in details.items()}
+        return {
+            "wallet": Web3.to_checksum_address("0x" + topics[owner_position][-40:]).lower(),
+            "block_number": log["blockNumber"],
+            "log_index": log["logIndex"],
+            "tx_hash": "0x" + bytes(log["transactionHash"]).hex().removeprefix("0x"),
+            "event": name,
+            "reserve": Web3.to_checksum_address("0x" + topics[1][-40:]),
+            "raw_amount": raw_amount,
+            "details": details,
+        }
+
+    async def sync_once(self) -> int:
+        """
+        Index every tracked wallet up to the confirmed head and snapshot its account.
+
+        Returns:
+            The number of new events stored.
+        """
+        if not self.wallets:
+            return 0
+        web3 = await get_web3()
+        head = await call_with_retry(lambda: web3.eth.block_number) - self.confirmations
+        checkpoints = await self.store.checkpoints(self.wallets)
+
+        # Wallets at the same checkpoint are fetched together
+        groups: Dict[int, List[str]] = {}
+        for wallet in self.wallets:
+            last = checkpoints[wallet.lower()]
+            start = last + 1 if last is not None else max(0, head - self.lookback)
+            if start <= head:
+                groups.setdefault(start, []).append(wallet)
+
+        stored = 0
+        for start, wallets in groups.items():
+            events = await self.fetch_events(wallets, start, head)
+            await self.store.save(events, wallets, head)
+            stored += len(events)
+
+        frame = await scan_portfolio(self.wallets, token_addresses={}, block_identifier=head)
+        await self.store.save_snapshots([
+            (wallet, head, row.collateral_usd, row.debt_usd, row.available_borrow_usd, row.health_factor)
+            for wallet, row in frame.iterrows()
+        ])
+        return stored
+
+    async def run_forever(self) -> None:
+        """
+        Run sync_once() every `interval` seconds until cancelled.
+        """
+        while True:
+            try:
+                stored = await self.sync_once()
+                if stored:
+                    print(f"Aave indexer stored {stored} new events")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error indexing Aave events: {e}")
+            await asyncio.sleep(self.interval)
+
+
+_store: Optional[AaveEventStore] = None
+
+
+def get_event_store() -> AaveEventStore:
+    """
+    Return the process-wide event store at AAVE_INDEX_PATH.
+    """
+    global _store
+    if _store is None:
+        _store = AaveEventStore(AAVE_INDEX_PATH)
+    return _store
+
+
+def tracked_wallets() -> List[str]:
+    """
+    Wallets from AAVE_INDEXER_WALLETS (comma-separated) plus WALLET_ADDRESS.
+    """
+    wallets = [w.strip() for w in os.environ.get("AAVE_INDEXER_WALLETS", "").split(",") if w.strip()]
+    if os.environ.get("WALLET_ADDRESS"):
+        wallets.append(os.environ["WALLET_ADDRESS"])
+    return wallets
+
+
+class HistoryInput(BaseModel):
+    wallet: Optional[str] = None
+    limit: int = 20
+
+
+@function_tool
+@instrument_tool
+async def fetch_aave_history(query: HistoryInput) -> Dict[str, Any]:
+    """
+    Position history of a wallet on Aave V3 (Base) from the local event index:
+    recent Supply/Withdraw/Borrow/Repay/LiquidationCall events and health factor snapshots.
+    Defaults to the user's own wallet.
+    """
+    wallet = query.wallet or os.environ.get("WALLET_ADDRESS")
+    if not wallet:
+        raise ValueError("No wallet address given.")
+    history = await get_event_store().history(wallet, limit=max(1, min(query.limit, 200)))
+    if not history["events"] and not history["snapshots"]:
+        history["note"] = "This wallet is not indexed yet; add it to AAVE_INDEXER_WALLETS."
+    return history
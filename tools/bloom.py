@@ -0,0 +1,109 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+# Keys are raw EVM addresses
+KEY_SIZE = 20
+_MASK = (1 << 64) - 1
+# Odd 64-bit multipliers (from splitmix64) used to mix the address words
+_K1 = 0x9E3779B97F4A7C15
+_K2 = 0xBF58476D1CE4E5B9
+_K3 = 0x94D049BB133111EB
+
+
+def _words(raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Three little-endian 64-bit words covering all 20 bytes of each address
+    a = raw[:, 0:8].copy().view("<u8")[:, 0]
+    b = raw[:, 8:16].copy().view("<u8")[:, 0]
+    c = raw[:, 12:20].copy().view("<u8")[:, 0]
+    return a, b, c
+
+
+class BloomFilter:
+    """
+    Bloom filter over 20-byte addresses.
+
+    Answers "definitely absent" or "maybe present": there are no false
+    negatives, and false positives occur at about the configured rate. The
+    bit array size is a power of two and positions come from double hashing
+    of mixed address words, so membership of many addresses is tested with a
+    few vectorized numpy operations.
+    """
+
+    def __init__(self, bits: np.ndarray, hashes: int):
+        """
+        Initialize the BloomFilter.
+
+        Args:
+            bits: Packed bit array (little bit order); its length in bits must be a power of two.
+            hashes: Number of bit positions per address.
+        """
+        # Kept as bytes for fast scalar lookups, viewed as an array for batches
+        self._packed = bytes(bits)
+        self.bits = np.frombuffer(self._packed, dtype=np.uint8)
+        self.size = len(self._packed) * 8
+        self.hashes = hashes
+        self._offsets = np.arange(hashes, dtype=np.uint64)
+
+    @classmethod
+    def from_records(cls, records: bytes, fp_rate: float = 0.001) -> "BloomFilter":
+        """
+        Build a filter holding every address of a blob of 20-byte records.
+
+        Args:
+            records: Concatenated 20-byte addresses (bytes or a memory map).
+            fp_rate: Target false positive rate.
+        """
+        raw = np.frombuffer(records, dtype=np.uint8)
+        raw = raw[:len(raw) - len(raw) % KEY_SIZE].reshape(-1, KEY_SIZE)
+        count = max(1, len(raw))
+        wanted = -count * math.log(fp_rate) / math.log(2) ** 2
+        size = max(64, 1 << math.ceil(math.log2(wanted)))
+        hashes = max(1, min(16, round(size / count * math.log(2))))
+
+        flags = np.zeros(size, dtype=bool)
+        bloom = cls(np.zeros(size // 8, dtype=np.uint8), hashes)
+        # Chunked so huge databases don't need a (count x hashes) array at once
+        for start in range(0, len(raw), 65536):
+            flags[bloom._positions(raw[start:start + 65536]).ravel()] = True
+        return cls(np.packbits(flags, bitorder="little"), hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._packed)
+
+    def _positions(self, raw: np.ndarray) -> np.ndarray:
+        a, b, c = _words(raw)
+        # uint64 arithmetic wraps around, which is what the mixing relies on
+        with np.errstate(over="ignore"):
+            h1 = (a ^ (c * np.uint64(_K1))) * np.uint64(_K2)
+            h2 = ((b ^ (a * np.uint64(_K3))) * np.uint64(_K1)) | np.uint64(1)
+            positions = h1[:, None] + self._offsets[None, :] * h2[:, None]
+        return positions & np.uint64(self.size - 1)
+
+    def might_contain(self, raw: bytes) -> bool:
+        """
+        Check one 20-byte address; False means it is definitely not in the set.
+        """
+        a = int.from_bytes(raw[0:8], "little")
+        b = int.from_bytes(raw[8:16], "little")
+        c = int.from_bytes(raw[12:20], "little")
+        h1 = ((a ^ ((c * _K1) & _MASK)) * _K2) & _MASK
+        h2 = (((b ^ ((a * _K3) & _MASK)) * _K1) & _MASK) | 1
+        bits, mask = self._packed, self.size - 1
+        for i in range(self.hashes):
+            position = ((h1 + i * h2) & _MASK) & mask
+            if not bits[position >> 3] >> (position & 7) & 1:
+                return False
+        return True
+
+    def might_contain_many(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Check an (n, 20) uint8 array of addresses; returns a boolean array.
+        """
+        if not len(raw):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(raw)
+        hits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return hits.all(axis=1)
@@ -0,0 +1,120 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class AsyncTTLCache:
+    """
+    Size-bounded LRU cache with per-entry TTL and single-flight fetches.
+
+    Concurrent callers asking for the same missing key share one in-flight
+    fetch instead of each hitting the backend.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 10.0):
+        """
+        Initialize the AsyncTTLCache.
+
+        Args:
+            maxsize: Maximum number of entries kept; least recently used entries are evicted first.
+            ttl: Default number of seconds an entry stays valid.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a key without fetching.
+
+        Returns:
+            (found, value) where found is False for missing or expired entries.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value for key, or run fetch() once and cache its result.
+
+        Args:
+            key: Cache key.
+            fetch: Zero-argument function returning the coroutine that produces the value.
+            ttl: Optional TTL override for this entry.
+
+        Returns:
+            The cached or freshly fetched value.
+        """
+        found, value = self.get(key)
+        if found:
+            self.hits += 1
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            # The fetch runs as its own task so cancelling any caller, including
+            # the one that started it, never cancels it for the other waiters
+            task = asyncio.ensure_future(self._fetch(key, fetch, ttl))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._fetched(key, done))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        value = await fetch()
+        self.set(key, value, ttl)
+        return value
+
+    def _fetched(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark errors retrieved so a fetch whose callers all left doesn't warn
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and occupancy, for sizing the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
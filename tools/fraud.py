@@ -1,34 +1,46 @@
-import requests
 from dotenv import load_dotenv
-import os
 from os.path import join, dirname
 from agents import function_tool
-from typing import Dict
+from src.metrics import instrument_tool
+from typing import Any, Dict, List
 from pydantic import BaseModel
+from .scam_index import get_scam_index
+from .scam_limits import SCAM_SCREEN_MAX_ADDRESSES
 
 class ScamInput(BaseModel):
     address: str
 
+class ScamBatchInput(BaseModel):
+    addresses: List[str]
+
 dotenv_path = join(dirname(__file__), '.env')
 load_dotenv(dotenv_path)
 
 @function_tool
+@instrument_tool
 def check_scam_address(wallet_info: ScamInput) -> Dict[str, bool]:
     """
     Check if crypto address is scam or not
     
     """
-    scam_db_url = os.environ.get("SCAM_DATABASE_URL")
-    if not scam_db_url:
-        raise ValueError("SCAM_DATABASE_URL is not set in environment variables.")
-
-    response = requests.get(scam_db_url)
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch scam database: {response.status_code}")
-
-    scam_data = response.json()
-    scam_addresses = {addr.lower() for addr in scam_data.get("address", [])}
-
-    return {"is_scam": wallet_info.address.lower() in scam_addresses}
+    # The index is loaded once per process and refreshed in the background,
+    # so a lookup is a binary search with no network I/O.
+    return {"is_scam": get_scam_index().contains(wallet_info.address)}
 
 
+@function_tool
+@instrument_tool
+def check_scam_addresses(batch: ScamBatchInput) -> Dict[str, Any]:
+    """
+    Check a list of crypto addresses against the scam database in one call.
+    Returns how many were checked and which ones are scams or invalid.
+    """
+    if len(batch.addresses) > SCAM_SCREEN_MAX_ADDRESSES:
+        raise ValueError(f"At most {SCAM_SCREEN_MAX_ADDRESSES} addresses can be checked at once.")
+    verdicts = get_scam_index().screen(batch.addresses)
+    # Only the exceptions are listed, so the reply stays small for long lists
+    return {
+        "checked": len(verdicts),
+        "scam": [address for address, verdict in zip(batch.addresses, verdicts) if verdict],
+        "invalid": [address for address, verdict in zip(batch.addresses, verdicts) if verdict is None],
+    }
@@ -0,0 +1,148 @@
+import copy
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from agents import FunctionTool
+from agents.tool import default_tool_error_function
+from src.metrics import TOOL_CACHE_LOOKUPS
+from .cache import AsyncTTLCache
+from .search_cache import normalize_query
+
+TOOL_MEMOIZE = os.environ.get("TOOL_MEMOIZE", "true").lower() == "true"
+TOOL_CACHE_SIZE = int(os.environ.get("TOOL_CACHE_SIZE", 4096))
+
+# What the SDK returns to the model when a tool raises; such results are never cached
+TOOL_ERROR_MESSAGE = default_tool_error_function(None, Exception())
+
+
+def normalize_arguments(value: Any) -> Any:
+    """
+    Normalize tool arguments so trivially different calls share a cache key:
+    strings are lowercased with punctuation and extra whitespace removed.
+    """
+    if isinstance(value, str):
+        return normalize_query(value)
+    if isinstance(value, dict):
+        return {key: normalize_arguments(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [normalize_arguments(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """
+    How long a tool's results are reused and by whom.
+
+    Attributes:
+        ttl: Seconds a result stays valid.
+        scope: "run" to share results within one Runner run only, or "session"
+            to share them across the turns of a chat session.
+        normalize: Maps the parsed JSON arguments to the value the cache key is built from.
+    """
+    ttl: float
+    scope: str = "run"
+    normalize: Callable[[Any], Any] = normalize_arguments
+
+
+TOOL_CACHE_POLICIES: Dict[str, ToolCachePolicy] = {
+    # The scam index changes at most every few minutes
+    "check_scam_address": ToolCachePolicy(ttl=300, scope="session"),
+    "check_scam_addresses": ToolCachePolicy(ttl=300, scope="session"),
+    # On-chain state should be fresh each turn; tools/aave.py caches per block across sessions
+    "fetch_aave_info": ToolCachePolicy(ttl=30, scope="run"),
+    "fetch_aave_portfolio": ToolCachePolicy(ttl=30, scope="run"),
+    "fetch_aave_history": ToolCachePolicy(ttl=30, scope="run"),
+    # New facts can be written between turns
+    "search_memory": ToolCachePolicy(ttl=60, scope="run"),
+    "web_search_preview": ToolCachePolicy(ttl=600, scope="session"),
+}
+
+_tool_cache = AsyncTTLCache(maxsize=TOOL_CACHE_SIZE, ttl=60)
+
+
+class _ToolFailed(Exception):
+    # Carries the SDK's error message out of the cache so the failure isn't stored
+    def __init__(self, output: Any):
+        super().__init__("tool failed")
+        self.output = output
+
+
+def _scope_id(context: Any, scope: str) -> Optional[str]:
+    if scope == "session":
+        manager = getattr(context, "memory_manager", None)
+        return getattr(manager, "session_id", None)
+    return getattr(context, "run_id", None)
+
+
+def _cache_key(tool_name: str, policy: ToolCachePolicy, context: Any, input_json: str) -> Optional[Hashable]:
+    scope_id = _scope_id(context, policy.scope)
+    if scope_id is None:
+        return None
+    try:
+        arguments = policy.normalize(json.loads(input_json or "{}"))
+    except ValueError:
+        return None
+    return (policy.scope, scope_id, tool_name, json.dumps(arguments, sort_keys=True))
+
+
+def memoize_tool(tool: FunctionTool, policy: ToolCachePolicy, cache: AsyncTTLCache = _tool_cache) -> FunctionTool:
+    """
+    Return a copy of the tool whose results are reused for identical calls.
+
+    Calls are keyed by the run or session (from the ChatContext of the run) and
+    the normalized arguments. Concurrent identical calls share one invocation,
+    and failed invocations are not cached. Calls without a ChatContext go
+    straight to the tool.
+
+    Args:
+        tool: The function tool to wrap.
+        policy: TTL, scope and argument normalization for this tool.
+        cache: Cache holding the results; shared by all tools by default.
+
+    Returns:
+        The memoized tool.
+    """
+    invoke = tool.on_invoke_tool
+
+    async def on_invoke_tool(ctx: Any, input_json: str) -> Any:
+        key = _cache_key(tool.name, policy, getattr(ctx, "context", None), input_json)
+        if key is None:
+            return await invoke(ctx, input_json)
+
+        missed = False
+
+        async def fetch() -> Any:
+            nonlocal missed
+            missed = True
+            output = await invoke(ctx, input_json)
+            if output == TOOL_ERROR_MESSAGE:
+                raise _ToolFailed(output)
+            return output
+
+        try:
+            return await cache.get_or_fetch(key, fetch, ttl=policy.ttl)
+        except _ToolFailed as failed:
+            return failed.output
+        finally:
+            TOOL_CACHE_LOOKUPS.labels(tool.name, "miss" if missed else "hit").inc()
+
+    memoized = copy.copy(tool)
+    memoized.on_invoke_tool = on_invoke_tool
+    return memoized
+
+
+def memoize_registered_tool(name: str, tool: Any) -> Any:
+    """
+    Apply the tool's policy from TOOL_CACHE_POLICIES, if any and if TOOL_MEMOIZE is on.
+    """
+    policy = TOOL_CACHE_POLICIES.get(name)
+    if not TOOL_MEMOIZE or policy is None or not isinstance(tool, FunctionTool):
+        return tool
+    return memoize_tool(tool, policy)
+
+
+def tool_cache_stats() -> Dict[str, Any]:
+    return _tool_cache.stats()
@@ -0,0 +1,23 @@
+from agents import RunContextWrapper, function_tool
+from src.metrics import PROMPT_TOKENS, PROMPT_TRUNCATIONS, instrument_tool
+from src.prompt import SEARCH_MEMORY_TOKEN_BUDGET, count_tokens, fit_lines
+from typing import Any
+
+@function_tool
+@instrument_tool
+async def search_memory(ctx: RunContextWrapper[Any], query: str) -> str:
+    """Search for relevant information facts about the user."""
+    # The memory manager of the session running this turn comes from the run context
+    # (src.agent.ChatContext), so the tool itself is shared by every session.
+    results = await ctx.context.memory_manager.search_memory(query)
+    if not results:
+        return "I couldn't find any relevant facts about the user."
+
+    lines = [f"- {r['role']}: {r['content']}" for r in results]
+    # Results come back most relevant first; keep the best ones that fit the budget
+    kept = fit_lines(lines, SEARCH_MEMORY_TOKEN_BUDGET, query)
+    if len(kept) < len(lines):
+        PROMPT_TRUNCATIONS.labels("search_memory").inc()
+    formatted = "\n".join(kept)
+    PROMPT_TOKENS.labels("search_memory").observe(count_tokens(formatted))
+    return f"Facts about the user:\n{formatted}"
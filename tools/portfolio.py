@@ -0,0 +1,184 @@
+import asyncio
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from agents import function_tool
+from pydantic import BaseModel
+from web3 import Web3
+
+from src.metrics import instrument_tool
+from .aave import POOL_ABI, aggregate3, ensure_decimals, get_block_number, get_token_registry
+from .rpc import get_web3
+
+# Calls per Multicall3 eth_call; large enough that 100 wallets x 4 calls fit in one round trip
+PORTFOLIO_CALLS_PER_BATCH = int(os.environ.get("PORTFOLIO_CALLS_PER_BATCH", 500))
+PORTFOLIO_MAX_CONCURRENCY = int(os.environ.get("PORTFOLIO_MAX_CONCURRENCY", 4))
+PORTFOLIO_MAX_WALLETS = int(os.environ.get("PORTFOLIO_MAX_WALLETS", 500))
+
+ACCOUNT_COLUMNS = [
+    "collateral_usd",
+    "debt_usd",
+    "available_borrow_usd",
+    "liquidation_threshold",
+    "ltv",
+    "health_factor",
+]
+# getUserAccountData returns USD values with 8 decimals, ratios in basis points
+# and the health factor with 18 decimals
+ACCOUNT_SCALES = np.array([1e8, 1e8, 1e8, 1e4, 1e4, 1e18])
+
+BALANCE_OF_SELECTOR = Web3.keccak(text="balanceOf(address)")[:4]
+
+
+class PortfolioInput(BaseModel):
+    wallets: List[str]
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def scan_portfolio(
+    wallets: List[str],
+    token_addresses: Optional[Dict[str, str]] = None,
+    calls_per_batch: int = PORTFOLIO_CALLS_PER_BATCH,
+    max_concurrency: int = PORTFOLIO_MAX_CONCURRENCY,
+    block_identifier: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Read Aave account data and token balances for many wallets at one block.
+
+    Each wallet needs one getUserAccountData call plus one balanceOf call per
+    token. The calls are packed into Multicall3 batches of `calls_per_batch`,
+    and at most `max_concurrency` batches are in flight at once.
+
+    Args:
+        wallets: Wallet addresses; duplicates are scanned once.
+        token_addresses: {symbol: address} registry; defaults to get_token_registry().
+        calls_per_batch: Maximum calls per eth_call.
+        max_concurrency: Maximum batches in flight.
+        block_identifier: Block to read at; defaults to the latest block.
+
+    Returns:
+        A frame indexed by checksummed wallet with the ACCOUNT_COLUMNS (USD
+        values, ratios and health factor as floats; health factor is inf without
+        debt) and one balance column per token symbol. Wallets whose calls
+        reverted have NaN values.
+
+    Raises:
+        ValueError: If an address is invalid.
+    """
+    if token_addresses is None:
+        token_addresses = get_token_registry()
+    wallets = list(dict.fromkeys(Web3.to_checksum_address(wallet) for wallet in wallets))
+    symbols = list(token_addresses)
+    tokens = [Web3.to_checksum_address(address) for address in token_addresses.values()]
+
+    web3 = await get_web3()
+    # Pin every batch to the same block so the portfolio is a consistent snapshot
+    if block_identifier is None:
+        block, decimals = await asyncio.gather(get_block_number(), ensure_decimals(web3, tokens))
+    else:
+        block, decimals = block_identifier, await ensure_decimals(web3, tokens)
+    pool_address = Web3.to_checksum_address(os.environ.get("POOL_ADDRESS"))
+    pool = web3.eth.contract(address=pool_address, abi=POOL_ABI)
+
+    calls_per_wallet = 1 + len(tokens)
+    calls: List[Tuple[str, bool, bytes]] = []
+    for wallet in wallets:
+        calls.append((pool_address, True, pool.encode_abi("getUserAccountData", args=[wallet])))
+        encoded_wallet = web3.codec.encode(["address"], [wallet])
+        calls.extend((token, True, BALANCE_OF_SELECTOR + encoded_wallet) for token in tokens)
+
+    # Never split a wallet's calls across batches
+    wallets_per_batch = max(1, calls_per_batch // calls_per_wallet)
+    gate = asyncio.Semaphore(max_concurrency)
+
+    async def run_batch(batch: List[Tuple[str, bool, bytes]]) -> List[Tuple[bool, bytes]]:
+        async with gate:
+            return await aggregate3(web3, batch, block)
+
+    batches = _chunks(calls, wallets_per_batch * calls_per_wallet)
+    results = [result for batch in await asyncio.gather(*(run_batch(b) for b in batches)) for result in batch]
+
+    account = np.full((len(wallets), len(ACCOUNT_COLUMNS)), np.nan)
+    balances = np.full((len(wallets), len(tokens)), np.nan)
+    for row in range(len(wallets)):
+        ok, data = results[row * calls_per_wallet]
+        if ok and data:
+            # uint256 values can exceed int64 (e.g. the no-debt health factor), so go through float
+            account[row] = [float(value) for value in web3.codec.decode(["uint256"] * 6, data)]
+        for column, token in enumerate(tokens):
+            ok, data = results[row * calls_per_wallet + 1 + column]
+            if ok and data and token in decimals:
+                balances[row, column] = web3.codec.decode(["uint256"], data)[0] / 10 ** decimals[token]
+
+    account /= ACCOUNT_SCALES
+    # Aave reports type(uint256).max as the health factor of accounts without debt
+    account[account[:, 1] == 0, 5] = np.inf
+
+    frame = pd.DataFrame(account, index=pd.Index(wallets, name="wallet"), columns=ACCOUNT_COLUMNS)
+    for column, symbol in enumerate(symbols):
+        frame[symbol] = balances[:, column]
+    frame.attrs["block"] = block
+    return frame
+
+
+def portfolio_totals(frame: pd.DataFrame, at_risk_threshold: float = 1.1) -> Dict[str, Any]:
+    """
+    Aggregate a scan_portfolio() frame.
+
+    Returns:
+        Summed USD values and token balances, the lowest health factor, the
+        portfolio-wide health factor (sum of collateral x liquidation threshold
+        over total debt) and the number of wallets below `at_risk_threshold`.
+    """
+    collateral = frame["collateral_usd"].sum()
+    debt = frame["debt_usd"].sum()
+    weighted_collateral = (frame["collateral_usd"] * frame["liquidation_threshold"]).sum()
+    token_columns = [c for c in frame.columns if c not in ACCOUNT_COLUMNS]
+    return {
+        "wallets": int(len(frame)),
+        "block": frame.attrs.get("block"),
+        "collateral_usd": round(float(collateral), 2),
+        "debt_usd": round(float(debt), 2),
+        "available_borrow_usd": round(float(frame["available_borrow_usd"].sum()), 2),
+        "portfolio_health_factor": round(float(weighted_collateral / debt), 4) if debt else math.inf,
+        "min_health_factor": round(float(frame["health_factor"].min()), 4) if len(frame) else math.inf,
+        "wallets_at_risk": int((frame["health_factor"] < at_risk_threshold).sum()),
+        "balances": {symbol: round(float(frame[symbol].sum()), 6) for symbol in token_columns},
+    }
+
+
+def to_columns(frame: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Compact JSON-friendly columnar form of a frame: one list per column.
+    Infinite and missing values become None.
+    """
+    clean = frame.round(4).replace([np.inf, -np.inf], np.nan).astype(object)
+    clean = clean.where(pd.notna(clean), None)
+    return {"wallet": list(frame.index), **{column: clean[column].tolist() for column in frame.columns}}
+
+
+@function_tool
+@instrument_tool
+async def fetch_aave_portfolio(portfolio: PortfolioInput) -> Dict[str, Any]:
+    """
+    Scan Aave V3 positions and token balances of many wallets on Base.
+    Returns per-wallet columns and portfolio totals.
+    """
+    if not portfolio.wallets:
+        raise ValueError("Provide at least one wallet address.")
+    if len(portfolio.wallets) > PORTFOLIO_MAX_WALLETS:
+        raise ValueError(f"At most {PORTFOLIO_MAX_WALLETS} wallets can be scanned at once.")
+
+    frame = await scan_portfolio(portfolio.wallets)
+    totals = portfolio_totals(frame)
+    if math.isinf(totals["portfolio_health_factor"]):
+        totals["portfolio_health_factor"] = None
+    if math.isinf(totals["min_health_factor"]):
+        totals["min_health_factor"] = None
+    return {"totals": totals, "columns": to_columns(frame)}
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from dotenv import load_dotenv
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+load_dotenv()
+
+RPC_MAX_CONCURRENCY = int(os.environ.get("RPC_MAX_CONCURRENCY", 16))
+RPC_TIMEOUT = float(os.environ.get("RPC_TIMEOUT", 10))
+RPC_RETRIES = int(os.environ.get("RPC_RETRIES", 3))
+RPC_BACKOFF = float(os.environ.get("RPC_BACKOFF", 0.25))
+
+T = TypeVar("T")
+
+_web3: Optional[AsyncWeb3] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_init_lock = asyncio.Lock()
+
+
+async def get_web3() -> AsyncWeb3:
+    """
+    Return the module-level AsyncWeb3 for the Base RPC.
+
+    All on-chain tools share one provider backed by a keep-alive aiohttp
+    session, so calls reuse pooled TCP/TLS connections instead of opening
+    a new one per tool invocation.
+    """
+    global _web3, _semaphore
+    if _web3 is not None:
+        return _web3
+    async with _init_lock:
+        if _web3 is None:
+            provider = AsyncHTTPProvider(
+                os.environ.get("BASE_RPC_URL"),
+                request_kwargs={"timeout": ClientTimeout(total=RPC_TIMEOUT)},
+                # Retries are handled by call_with_retry so they respect the concurrency limit
+                exception_retry_configuration=None,
+            )
+            await provider.cache_async_session(
+                ClientSession(connector=TCPConnector(limit=RPC_MAX_CONCURRENCY, keepalive_timeout=60))
+            )
+            _semaphore = asyncio.Semaphore(RPC_MAX_CONCURRENCY)
+            web3 = AsyncWeb3(provider)
+            # The tools only issue read-only calls; transaction validation and ENS
+            # resolution would add an eth_chainId round trip before every eth_call
+            web3.middleware_onion.remove("validation")
+            web3.middleware_onion.remove("ens_name_to_address")
+            _web3 = web3
+    return _web3
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    retries: int = RPC_RETRIES,
+    timeout: float = RPC_TIMEOUT,
+) -> T:
+    """
+    Run an RPC coroutine under the shared concurrency limit, with a per-call
+    timeout and retries using exponential backoff with full jitter.
+
+    Args:
+        call: Zero-argument function returning the coroutine to run. It is called again on each attempt.
+        retries: Number of retries after the first attempt.
+        timeout: Seconds allowed for each attempt.
+
+    Returns:
+        The result of the first successful attempt.
+    """
+    await get_web3()
+    for attempt in range(retries + 1):
+        try:
+            async with _semaphore:
+                return await asyncio.wait_for(call(), timeout=timeout)
+        except (asyncio.TimeoutError, ClientError, OSError) as e:
+            if attempt == retries:
+                raise
+            delay = random.uniform(0, RPC_BACKOFF * 2 ** attempt)
+            print(f"RPC call failed ({e!r}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def close_web3() -> None:
+    """
+    Close the pooled RPC session. The next get_web3() call opens a new one.
+    """
+    global _web3, _semaphore
+    if _web3 is not None:
+        await _web3.provider.disconnect()
+    _web3 = None
+    _semaphore = None
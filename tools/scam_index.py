@@ -0,0 +1,306 @@
+import json
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import requests
+from dotenv import load_dotenv
+
+from .bloom import BloomFilter
+
+load_dotenv()
+
+ADDRESS_SIZE = 20
+DEFAULT_SNAPSHOT_PATH = ".cache/scam_index.bin"
+DEFAULT_REFRESH_INTERVAL = 15 * 60
+DEFAULT_BLOOM_FP_RATE = 0.001
+
+
+def address_to_bytes(address: str) -> Optional[bytes]:
+    """
+    Convert a hex EVM address to its 20 raw bytes.
+    Returns None if the value is not a valid address.
+    """
+    value = address.strip().lower()
+    if value.startswith("0x"):
+        value = value[2:]
+    if len(value) != ADDRESS_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(value)
+    except ValueError:
+        return None
+
+
+def build_records(addresses: Iterable[str]) -> bytes:
+    """
+    Build the sorted, de-duplicated 20-byte record blob used by the index.
+    """
+    unique = {raw for raw in map(address_to_bytes, addresses) if raw is not None}
+    return b"".join(sorted(unique))
+
+
+class ScamIndex:
+    """
+    Process-wide index of known scam addresses.
+
+    Addresses are kept as a sorted blob of 20-byte records, memory-mapped from an
+    on-disk snapshot so that new workers start warm. A Bloom filter built with
+    each snapshot rejects most clean addresses without touching the records;
+    the rest are confirmed by binary search. Lookups never touch the network; a
+    background thread refreshes the snapshot with conditional requests
+    (ETag / If-Modified-Since) and swaps it in atomically.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        snapshot_path: Union[str, Path] = DEFAULT_SNAPSHOT_PATH,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        bloom_fp_rate: float = DEFAULT_BLOOM_FP_RATE,
+    ):
+        """
+        Initialize the ScamIndex.
+
+        Args:
+            url: URL of the scam database JSON (ScamSniffer format).
+            snapshot_path: Where the binary snapshot is stored.
+            refresh_interval: Seconds between background refreshes.
+            bloom_fp_rate: Target false positive rate of the Bloom filter.
+        """
+        self.url = url
+        self.snapshot_path = Path(snapshot_path)
+        self.meta_path = self.snapshot_path.with_suffix(".meta.json")
+        self.refresh_interval = refresh_interval
+        self.bloom_fp_rate = bloom_fp_rate
+        # (records, count, bloom) is replaced as a whole so readers never see a half-built index
+        self._state: Tuple[Union[bytes, mmap.mmap], int, Optional[BloomFilter]] = (b"", 0, None)
+        # (inode, mtime, size) of the mapped snapshot, to notice files written by other workers
+        self._mapped: Optional[Tuple[int, int, int]] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_refresh: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._state[1]
+
+    def contains(self, address: str) -> bool:
+        """
+        Check whether the address is in the index.
+        """
+        raw = address_to_bytes(address)
+        if raw is None:
+            return False
+        return self.contains_raw(raw)
+
+    def contains_raw(self, raw: bytes) -> bool:
+        """
+        Check a 20-byte address: Bloom filter first, then binary search in the sorted records.
+        """
+        records, count, bloom = self._state
+        if bloom is None or not bloom.might_contain(raw):
+            return False
+        return self._search(records, count, raw)
+
+    @staticmethod
+    def _search(records: Union[bytes, mmap.mmap], count: int, raw: bytes) -> bool:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = mid * ADDRESS_SIZE
+            current = records[offset:offset + ADDRESS_SIZE]
+            if current < raw:
+                lo = mid + 1
+            elif current > raw:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def screen(self, addresses: Iterable[str]) -> List[Optional[bool]]:
+        """
+        Check many addresses at once.
+
+        The Bloom filter is applied to the whole batch in one vectorized pass,
+        and only the addresses it cannot rule out are binary searched.
+
+        Returns:
+            One verdict per address, in order: True for scam, False for clean,
+            None if the value is not a valid address.
+        """
+        raws = [address_to_bytes(address) for address in addresses]
+        verdicts: List[Optional[bool]] = [None if raw is None else False for raw in raws]
+        records, count, bloom = self._state
+        valid = [i for i, raw in enumerate(raws) if raw is not None]
+        if bloom is None or not valid:
+            return verdicts
+        batch = np.frombuffer(b"".join(raws[i] for i in valid), dtype=np.uint8).reshape(-1, ADDRESS_SIZE)
+        for position in np.flatnonzero(bloom.might_contain_many(batch)):
+            i = valid[position]
+            verdicts[i] = self._search(records, count, raws[i])
+        return verdicts
+
+    def _swap(self, records: Union[bytes, mmap.mmap], count: int) -> None:
+        bloom = BloomFilter.from_records(records, self.bloom_fp_rate) if count else None
+        self._state = (records, count, bloom)
+
+    def stats(self) -> dict:
+        _, count, bloom = self._state
+        return {
+            "addresses": count,
+            "records_bytes": count * ADDRESS_SIZE,
+            "bloom_bytes": bloom.nbytes if bloom else 0,
+            "bloom_hashes": bloom.hashes if bloom else 0,
+            "last_refresh": self.last_refresh,
+        }
+
+    def ensure_loaded(self) -> None:
+        """
+        Load the index on first use: from the snapshot if present, else from the network.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if not self.load_snapshot():
+                if not self.url:
+                    raise ValueError("SCAM_DATABASE_URL is not set in environment variables.")
+                self.refresh()
+            self._loaded = True
+
+    @staticmethod
+    def _identity(stat: os.stat_result) -> Tuple[int, int, int]:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def load_snapshot(self) -> bool:
+        """
+        Memory-map the on-disk snapshot. Returns False if there is none.
+        """
+        try:
+            with self.snapshot_path.open("rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_size == 0 or stat.st_size % ADDRESS_SIZE:
+                    return False
+                records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return False
+        self._swap(records, stat.st_size // ADDRESS_SIZE)
+        self._mapped = self._identity(stat)
+        return True
+
+    def _snapshot_changed(self) -> bool:
+        try:
+            return self._identity(self.snapshot_path.stat()) != self._mapped
+        except FileNotFoundError:
+            return False
+
+    def _read_meta(self) -> dict:
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def refresh(self) -> bool:
+        """
+        Re-download the scam database if it changed upstream.
+
+        Returns:
+            True if a new snapshot was swapped in (downloaded here or by another
+            worker sharing the snapshot), False if it was unchanged.
+        """
+        with self._refresh_lock:
+            meta = self._read_meta() if self.snapshot_path.exists() else {}
+            headers = {}
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+            self.last_refresh = time.time()
+            response = requests.get(self.url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                # The validators are shared with the other workers: a 304 can mean one of
+                # them already downloaded this version, so map its snapshot if it's newer
+                return self._snapshot_changed() and self.load_snapshot()
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch scam database: {response.status_code}")
+
+            records = build_records(response.json().get("address", []))
+            self._write_snapshot(
+                records,
+                {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+            )
+            if not self.load_snapshot():
+                self._swap(records, len(records) // ADDRESS_SIZE)
+            return True
+
+    def _write_snapshot(self, records: bytes, meta: dict) -> None:
+        """
+        Write the snapshot next to the target and rename it into place, so
+        concurrent workers only ever map a complete file.
+        """
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        tmp_snapshot = self.snapshot_path.with_name(self.snapshot_path.name + suffix)
+        tmp_meta = self.meta_path.with_name(self.meta_path.name + suffix)
+        tmp_snapshot.write_bytes(records)
+        tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_snapshot, self.snapshot_path)
+        os.replace(tmp_meta, self.meta_path)
+
+    def start(self) -> None:
+        """
+        Start the background refresh thread (idempotent).
+        """
+        if not self.url or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scam-index-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        # A snapshot loaded from disk may be stale, so revalidate it right away
+        while not self._stop.wait(0 if self.last_refresh is None else self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing scam index: {e}")
+
+
+_index: Optional[ScamIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_scam_index() -> ScamIndex:
+    """
+    Return the process-wide ScamIndex, loading it and starting the refresher on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ScamIndex(
+                    url=os.environ.get("SCAM_DATABASE_URL"),
+                    snapshot_path=os.environ.get("SCAM_INDEX_PATH", DEFAULT_SNAPSHOT_PATH),
+                    refresh_interval=float(
+                        os.environ.get("SCAM_INDEX_REFRESH_SECONDS", DEFAULT_REFRESH_INTERVAL)
+                    ),
+                    bloom_fp_rate=float(os.environ.get("SCAM_BLOOM_FP_RATE", DEFAULT_BLOOM_FP_RATE)),
+                )
+    _index.ensure_loaded()
+    _index.start()
+    return _index
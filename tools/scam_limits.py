@@ -0,0 +1,13 @@
+"""
+Limits of bulk scam screening, shared by the check_scam_addresses tool and the
+/api/scam/screen endpoint. Kept apart from scam_index so the API can validate
+requests without importing numpy.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCAM_SCREEN_MAX_ADDRESSES = int(os.environ.get("SCAM_SCREEN_MAX_ADDRESSES", 100_000))
+SCAM_SCREEN_CHUNK_SIZE = int(os.environ.get("SCAM_SCREEN_CHUNK_SIZE", 5_000))
@@ -0,0 +1,130 @@
+import asyncio
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so trivially different phrasings share a cache key.
+    """
+    query = re.sub(r"[^\w\s.$-]", " ", query.lower())
+    query = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", query)
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """
+    Persistent cache of web search answers.
+
+    Entries live in a SQLite database (WAL mode) so they survive restarts and
+    are shared by every worker on the host. Lookups first try the normalized
+    query exactly and then, when embeddings are stored, the most similar
+    cached query above a cosine-similarity threshold.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl: float = 3600,
+        max_entries: int = 2000,
+        similarity_threshold: float = 0.92,
+    ):
+        """
+        Initialize the SearchCache.
+
+        Args:
+            path: SQLite database file.
+            ttl: Seconds an answer stays valid.
+            max_entries: Maximum number of answers kept; least recently used are evicted.
+            similarity_threshold: Minimum cosine similarity for a semantic hit.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    answer TEXT NOT NULL,
+                    embedding BLOB,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, query: str, embedding: Optional[List[float]] = None) -> Optional[str]:
+        """
+        Return a cached answer for the query, or None.
+
+        Args:
+            query: The raw user query.
+            embedding: Optional embedding of the normalized query, enabling similarity lookup.
+        """
+        key = normalize_query(query)
+        now = time.time()
+        min_created = now - self.ttl
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT key, answer FROM search_cache WHERE key = ? AND created_at >= ?",
+                (key, min_created),
+            ).fetchone()
+            if row is None and embedding is not None:
+                row = self._most_similar(conn, embedding, min_created)
+            if row is None:
+                return None
+            conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, row[0]))
+            return row[1]
+
+    def _most_similar(self, conn: sqlite3.Connection, embedding: List[float], min_created: float):
+        rows = conn.execute(
+            "SELECT key, answer, embedding FROM search_cache "
+            "WHERE embedding IS NOT NULL AND created_at >= ?",
+            (min_created,),
+        ).fetchall()
+        if not rows:
+            return None
+        matrix = np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        return rows[best][:2]
+
+    def put(self, query: str, answer: str, embedding: Optional[List[float]] = None) -> None:
+        """
+        Store an answer and evict expired and least recently used entries.
+        """
+        now = time.time()
+        blob = np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, answer, embedding, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_query(query), answer, blob, now, now),
+            )
+            conn.execute("DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    async def aget(self, query: str, embedding: Optional[List[float]] = None) -> Optional[str]:
+        return await asyncio.to_thread(self.get, query, embedding)
+
+    async def aput(self, query: str, answer: str, embedding: Optional[List[float]] = None) -> None:
+        await asyncio.to_thread(self.put, query, answer, embedding)
@@ -1,47 +1,170 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
 import os
+import re
 from dotenv import load_dotenv
 from agents import function_tool
+from src.metrics import instrument_tool
+from functools import lru_cache
+from pathlib import Path
 from pydantic import BaseModel
-from src.utils import load_yaml
-from typing import Dict
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from .search_cache import SearchCache, normalize_query
 
 class UserInput(BaseModel):
     query: str
 
 load_dotenv()
 
-config = load_yaml("config.yaml")
+@lru_cache(maxsize=1)
+def get_client() -> AsyncOpenAI:
+    """
+    Return the shared AsyncOpenAI client, created on first use.
+    """
+    return AsyncOpenAI()
 
-client = OpenAI()
 
-@function_tool
-def web_search_preview(text: UserInput) -> Dict[str, str]:
+@lru_cache(maxsize=1)
+def get_search_cache() -> SearchCache:
     """
-    Perform a web search using OpenAI's web_search_preview tool.
+    Return the shared web search answer cache, opened on first use.
     """
+    return SearchCache(
+        path=os.environ.get("WEB_SEARCH_CACHE_PATH", ".cache/web_search.sqlite3"),
+        ttl=float(os.environ.get("WEB_SEARCH_CACHE_TTL", 3600)),
+        max_entries=int(os.environ.get("WEB_SEARCH_CACHE_SIZE", 2000)),
+        similarity_threshold=float(os.environ.get("WEB_SEARCH_CACHE_SIMILARITY", 0.92)),
+    )
 
-    if not text:
-        raise ValueError("Query must be a non-empty string.")
-    
+# Similarity lookup is opt-in: it costs one embeddings call per uncached query
+EMBEDDING_MODEL = os.environ.get("WEB_SEARCH_CACHE_EMBEDDING_MODEL")
+
+VOCABULARY_PATH = Path(__file__).parent / "data" / "crypto_vocabulary.txt"
+ADDRESS_PATTERN = re.compile(r"\b0x[0-9a-fA-F]{40}\b")
+
+
+@lru_cache(maxsize=1)
+def load_vocabulary() -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    Load the bundled crypto vocabulary as (single words, multi-word phrases).
+    """
+    words, phrases = set(), []
+    for line in VOCABULARY_PATH.read_text(encoding="utf-8").splitlines():
+        term = line.strip().lower()
+        if not term or term.startswith("#"):
+            continue
+        if " " in term:
+            phrases.append(term)
+        else:
+            words.add(term)
+    return frozenset(words), tuple(phrases)
+
+
+def is_obviously_blockchain(query: str) -> bool:
+    """
+    Local relevance pre-filter: True if the query mentions an on-chain address
+    or a term from the bundled crypto vocabulary, so the LLM classifier can be skipped.
+    """
+    if ADDRESS_PATTERN.search(query):
+        return True
+    words, phrases = load_vocabulary()
+    lowered = query.lower()
+    if words.intersection(re.findall(r"[a-z0-9-]+", lowered)):
+        return True
+    return any(phrase in lowered for phrase in phrases)
+
+
+async def is_blockchain_related(query: str) -> bool:
+    """
+    Ask the web search model whether the query is related to blockchain.
+    """
     validation_prompt = (
-        f"Analyze if this input related to blockchain topic: '{text}'. "
+        f"Analyze if this input related to blockchain topic: '{query}'. "
         "Reply ONLY with 'YES' if it is related, or 'No' if it is not related, "
     )
-    validation_response = client.chat.completions.create(
+    validation_response = await get_client().chat.completions.create(
         model=os.environ.get("WEB_SEARCH_MODEL"),
         messages=[{"role": "user", "content": validation_prompt}]
     )
-
     decision = validation_response.choices[0].message.content.strip().upper()
-    if decision == "NO":
-        raise ValueError("Blocked query: Input was flagged as not related to blockchain")
-    response = client.responses.create(
+    return not decision.startswith("NO")
+
+
+async def search(query: str) -> str:
+    """
+    Perform the web search through the Responses API web_search_preview tool.
+    """
+    response = await get_client().responses.create(
         model=os.environ.get("WEB_SEARCH_MODEL"),
         tools=[{
             "type": "web_search_preview",
             "search_context_size": "medium",
         }],
-        input=text
+        input=query
     )
-    return {"Answer" : response.output_text}
+    return response.output_text
+
+
+async def guarded_search(query: str) -> str:
+    """
+    Run the web search behind the blockchain-relevance guardrail.
+
+    Obvious crypto queries skip the classifier. Otherwise the classifier and the
+    search run speculatively in parallel and the search is cancelled if the
+    classifier rejects the query.
+    """
+    if is_obviously_blockchain(query):
+        return await search(query)
+
+    search_task = asyncio.create_task(search(query))
+    try:
+        related = await is_blockchain_related(query)
+    except BaseException:
+        search_task.cancel()
+        raise
+    if not related:
+        search_task.cancel()
+        raise ValueError("Blocked query: Input was flagged as not related to blockchain")
+    return await search_task
+
+
+async def embed_query(query: str) -> Optional[List[float]]:
+    """
+    Embed the normalized query for similarity lookup, if an embedding model is configured.
+    """
+    if not EMBEDDING_MODEL:
+        return None
+    response = await get_client().embeddings.create(model=EMBEDDING_MODEL, input=normalize_query(query))
+    return response.data[0].embedding
+
+
+async def cached_search(query: str) -> str:
+    """
+    guarded_search behind the persistent answer cache. Only answers that
+    passed the guardrail are ever stored. The query is only embedded when its
+    normalized form misses, for the similarity lookup and the stored entry.
+    """
+    cache = get_search_cache()
+    answer = await cache.aget(query)
+    if answer is not None:
+        return answer
+    embedding = await embed_query(query)
+    if embedding is not None:
+        answer = await cache.aget(query, embedding)
+    if answer is None:
+        answer = await guarded_search(query)
+        await cache.aput(query, answer, embedding)
+    return answer
+
+
+@function_tool
+@instrument_tool
+async def web_search_preview(text: UserInput) -> Dict[str, str]:
+    """
+    Perform a web search using OpenAI's web_search_preview tool.
+    """
+
+    if not text or not text.query.strip():
+        raise ValueError("Query must be a non-empty string.")
+
+    return {"Answer": await cached_search(text.query)}